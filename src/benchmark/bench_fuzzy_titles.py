@@ -0,0 +1,129 @@
+"""
+Benchmarks the typo tolerant matching of the title index on synthetic libraries of 10k, 100k
+and 1M titles. Titles of the library are misspelled by one or two random edits, i.e. deletions,
+insertions, substitutions and transpositions of letters, measuring for several similarity
+thresholds how often the original movie is the best match or among the five best matches and
+the latency of the lookups. Titles missing from the library are matched too, measuring how
+often a search would wrongly skip the OMDB API.
+
+Run from the src directory:
+    python -m benchmark.bench_fuzzy_titles
+"""
+import random
+import string
+from statistics import mean, quantiles
+from time import perf_counter
+from main.repository.title_index import TitleIndex
+
+SIZES = (10_000, 100_000, 1_000_000)
+THRESHOLDS = (0.3, 0.4, 0.5, 0.6)
+QUERIES = 1_000
+CONSONANTS = "bcdfghjklmnprstvwz"
+VOWELS = "aeiouy"
+COMMON_WORDS = ["the", "of", "a", "in", "and", "to", "man", "love", "night", "war"]
+
+
+def create_vocabulary(count, rng):
+    """Creates distinct pseudo words of 2 to 4 syllables of a consonant and a vowel each."""
+    words = set()
+
+    while len(words) < count:
+        words.add("".join(rng.choice(CONSONANTS) + rng.choice(VOWELS)
+                          for _ in range(rng.randint(2, 4))))
+
+    return sorted(words)
+
+
+def create_titles(count, seed=42):
+    """
+    Creates distinct synthetic titles of 1 to 4 words, mixing common words into a shuffled
+    vocabulary of pseudo words with a skewed word frequency.
+
+    Args:
+        count (int): The number of titles.
+        seed (int): The seed of the random generator. Defaults to 42.
+
+    Returns:
+        list[tuple[int, str, int]]: The IDs, titles and popularity.
+    """
+    rng = random.Random(seed)
+    vocabulary = create_vocabulary(max(1_000, count // 2), rng)
+    rng.shuffle(vocabulary)
+    titles = {}
+
+    while len(titles) < count:
+        words = [rng.choice(COMMON_WORDS) if rng.random() < 0.2
+                 else vocabulary[int(len(vocabulary) * rng.random() ** 2)]
+                 for _ in range(rng.randint(1, 4))]
+        titles.setdefault(" ".join(words).title(), len(titles) + 1)
+
+    return [(movie_id, title, 0) for title, movie_id in titles.items()]
+
+
+def misspell(title, edits, rng):
+    """Applies random deletions, insertions, substitutions and transpositions to a title."""
+    letters = list(title)
+
+    for _ in range(edits):
+        position = rng.randrange(len(letters))
+        edit = rng.choice(("delete", "insert", "substitute", "transpose"))
+
+        if edit == "delete" and len(letters) > 1:
+            del letters[position]
+        elif edit == "insert":
+            letters.insert(position, rng.choice(string.ascii_lowercase))
+        elif edit == "substitute":
+            letters[position] = rng.choice(string.ascii_lowercase)
+        elif position + 1 < len(letters):
+            letters[position], letters[position + 1] = letters[position + 1], letters[position]
+
+    return "".join(letters)
+
+
+def percentiles(latencies):
+    """Returns the mean, p50 and p95 of latencies in milliseconds."""
+    cuts = quantiles(latencies, n=20)
+    return mean(latencies), cuts[9], cuts[18]
+
+
+def main():
+    for size in SIZES:
+        titles = create_titles(size)
+        index = TitleIndex(load_titles=lambda: titles)
+
+        start = perf_counter()
+        index.rebuild()
+        print(f"{size} titles, built in {perf_counter() - start:.2f}s")
+
+        rng = random.Random(7)
+        sample = rng.sample(titles, QUERIES)
+        queries = [(movie_id, misspell(title, rng.randint(1, 2), rng))
+                   for movie_id, title, _ in sample]
+        library = {title.casefold() for _, title, _ in titles}
+        unknown = [title for _, title, _ in create_titles(QUERIES * 5, seed=99)
+                   if title.casefold() not in library][:QUERIES]
+
+        for threshold in THRESHOLDS:
+            top_1 = top_5 = false_positives = 0
+            latencies = []
+
+            for movie_id, query in queries:
+                start = perf_counter()
+                matches = [match_id for match_id, _ in
+                           index.find_similar(query, limit=5, threshold=threshold)]
+                latencies.append((perf_counter() - start) * 1000)
+                top_1 += bool(matches) and matches[0] == movie_id
+                top_5 += movie_id in matches
+
+            for query in unknown:
+                false_positives += bool(index.find_similar(query, limit=5, threshold=threshold))
+
+            average, p50, p95 = percentiles(latencies)
+            print(f"  threshold {threshold}: recall@1 {top_1 / QUERIES:.1%}, "
+                  f"recall@5 {top_5 / QUERIES:.1%}, "
+                  f"unknown titles matched {false_positives / len(unknown):.1%}, "
+                  f"latency mean/p50/p95 {average:.3f}/{p50:.3f}/{p95:.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
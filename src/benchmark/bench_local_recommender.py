@@ -0,0 +1,77 @@
+"""
+Benchmarks the local recommender on a synthetic library, measuring the time of a full model
+rebuild and the latency of top-k queries including the incremental refresh of the user.
+
+Run from the src directory:
+    python -m benchmark.bench_local_recommender
+"""
+import random
+from statistics import mean, quantiles
+from time import perf_counter
+from main.recommendations.local_recommender import LocalRecommender
+
+MOVIES = 20_000
+USERS = 2_000
+FAVOURITES_PER_USER = 50
+GENRES = 25
+CREW_MEMBERS = 30_000
+QUERIES = 200
+
+
+def create_library(seed=42):
+    """
+    Creates a synthetic library with popularity-skewed favourites.
+
+    Args:
+        seed (int): The seed of the random generator. Defaults to 42.
+
+    Returns:
+        tuple[list, list, list]: The favourites, genres and crew members rows.
+    """
+    rng = random.Random(seed)
+    favourites = [
+        (user_id, int(rng.paretovariate(1.2) * 10) % MOVIES, rng.choice([None, 6.0, 8.0, 10.0]))
+        for user_id in range(USERS) for _ in range(FAVOURITES_PER_USER)
+    ]
+    favourites = list({(user_id, movie_id): (user_id, movie_id, rating)
+                       for user_id, movie_id, rating in favourites}.values())
+    genres = [(movie_id, genre_id) for movie_id in range(MOVIES)
+              for genre_id in rng.sample(range(GENRES), rng.randint(1, 3))]
+    crew_members = [(movie_id, rng.randrange(CREW_MEMBERS), member_type)
+                    for movie_id in range(MOVIES)
+                    for member_type in ("director", "writer", "actor", "actor", "actor")]
+    return favourites, genres, crew_members
+
+
+def main():
+    favourites, genres, crew_members = create_library()
+    favourites_by_user = {}
+
+    for row in favourites:
+        favourites_by_user.setdefault(row[0], []).append(row)
+
+    recommender = LocalRecommender(
+        load_favourites=lambda user_id: favourites if user_id is None
+        else favourites_by_user.get(user_id, []),
+        load_features=lambda movie_ids: (genres, crew_members) if movie_ids is None
+        else ([row for row in genres if row[0] in movie_ids],
+              [row for row in crew_members if row[0] in movie_ids])
+    )
+
+    start = perf_counter()
+    recommender.rebuild()
+    print(f"rebuild {len(favourites)} favourites, {MOVIES} movies: "
+          f"{(perf_counter() - start) * 1000:.0f}ms")
+
+    latencies = []
+    for user_id in random.Random(7).sample(range(USERS), QUERIES):
+        start = perf_counter()
+        recommender.recommend(user_id, k=5)
+        latencies.append((perf_counter() - start) * 1000)
+
+    p50, p95 = quantiles(latencies, n=20)[9], quantiles(latencies, n=20)[18]
+    print(f"recommend top-5   mean={mean(latencies):6.2f}ms p50={p50:6.2f}ms p95={p95:6.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Benchmarks OMDb lookups against a local stub server, once creating a new client per call like the
+routes used to do and once sharing a single pooled keep-alive client.
+
+Run from the src directory:
+    python -m benchmark.bench_omdb_client
+"""
+from statistics import mean, quantiles
+from time import perf_counter
+from main.omdb.omdb_client import OmdbClient
+from .omdb_stub_server import start_stub_server, stub_url
+
+CALLS = 500
+
+
+def measure(get_client):
+    """
+    Measures the latency of title lookups.
+
+    Args:
+        get_client (Callable[[], OmdbClient]): Returns the client to use for the next call.
+
+    Returns:
+        list[float]: The latency of every call in milliseconds.
+    """
+    latencies = []
+
+    for i in range(CALLS):
+        start = perf_counter()
+        client = get_client()
+        client.find_movie_by_title(f"Movie {i}")
+        latencies.append((perf_counter() - start) * 1000)
+
+    return latencies
+
+
+def main():
+    server = start_stub_server()
+    url = stub_url(server)
+
+    shared_client = OmdbClient(api_key="bench", base_url=url)
+    results = {
+        "client_per_call": measure(lambda: OmdbClient(api_key="bench", base_url=url)),
+        "shared_client": measure(lambda: shared_client),
+    }
+
+    for name, latencies in results.items():
+        p50, p95 = quantiles(latencies, n=20)[9], quantiles(latencies, n=20)[18]
+        print(f"{name:<16} mean={mean(latencies):6.2f}ms p50={p50:6.2f}ms p95={p95:6.2f}ms")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
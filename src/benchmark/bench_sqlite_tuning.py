@@ -0,0 +1,104 @@
+"""
+Benchmarks read throughput of SQLite while a writer continuously commits, once with the default
+rollback journal settings and once with the WAL profile applied.
+
+Run from the src directory:
+    python -m benchmark.bench_sqlite_tuning
+"""
+import os
+import tempfile
+import threading
+from time import perf_counter
+from sqlalchemy import create_engine, select, insert, func
+from sqlalchemy.exc import OperationalError
+from main.repository import Base
+from main.repository.entities import Movie
+from main.repository.sqlite_tuning import WAL_PROFILE, apply_pragmas
+
+SEED_MOVIES = 10_000
+READERS = 4
+DURATION = 3  # Seconds
+
+
+def run(pragmas):
+    """
+    Runs the benchmark against a fresh database file.
+
+    Args:
+        pragmas (dict or None): The pragmas to apply to every connection.
+
+    Returns:
+        tuple[int, int, int]: The number of reads, failed reads and writes.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'bench.sqlite')}",
+                               pool_size=READERS + 1)
+        apply_pragmas(engine, pragmas)
+        Base.metadata.create_all(engine)
+
+        with engine.begin() as connection:
+            connection.execute(insert(Movie), [{"title": f"Movie {i}", "imdb_id": f"tt{i}"}
+                                               for i in range(SEED_MOVIES)])
+
+        stop = threading.Event()
+        counts = {"reads": 0, "failed_reads": 0, "writes": 0}
+        lock = threading.Lock()
+
+        def read():
+            reads = failed_reads = 0
+            with engine.connect() as connection:
+                while not stop.is_set():
+                    try:
+                        connection.execute(select(func.count()).select_from(Movie).where(
+                            Movie.title.like(f"Movie {reads % 100}%"))).scalar()
+                        connection.rollback()
+                        reads += 1
+                    except OperationalError:
+                        connection.rollback()
+                        failed_reads += 1
+
+            with lock:
+                counts["reads"] += reads
+                counts["failed_reads"] += failed_reads
+
+        def write():
+            writes = 0
+            while not stop.is_set():
+                try:
+                    with engine.begin() as connection:
+                        connection.execute(insert(Movie), [
+                            {"title": f"New Movie {writes}-{i}", "imdb_id": f"new{writes}-{i}"}
+                            for i in range(50)])
+                    writes += 1
+                except OperationalError:
+                    pass
+
+            counts["writes"] = writes
+
+        threads = [threading.Thread(target=read) for _ in range(READERS)]
+        threads.append(threading.Thread(target=write))
+
+        for thread in threads:
+            thread.start()
+
+        stop.wait(DURATION)
+        stop.set()
+
+        for thread in threads:
+            thread.join()
+
+        engine.dispose()
+        return counts["reads"], counts["failed_reads"], counts["writes"]
+
+
+def main():
+    for name, pragmas in (("default", None), ("wal_profile", WAL_PROFILE)):
+        start = perf_counter()
+        reads, failed_reads, writes = run(pragmas)
+        elapsed = perf_counter() - start
+        print(f"{name:<12} reads/s={reads / DURATION:>10.1f} failed_reads={failed_reads:>6} "
+              f"writes/s={writes / DURATION:>8.1f} total={elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Benchmarks the in-memory title index on synthetic libraries of 10k, 100k and 1M titles,
+measuring the build time, the latency of prefix searches of 1 to 8 characters and of adding a
+movie incrementally.
+
+Run from the src directory:
+    python -m benchmark.bench_title_index
+"""
+import random
+from statistics import mean, quantiles
+from time import perf_counter
+from main.repository.title_index import TitleIndex
+
+SIZES = (10_000, 100_000, 1_000_000)
+QUERIES = 2_000
+ADDS = 200
+WORDS = ["the", "dark", "knight", "return", "of", "star", "wars", "love", "city", "night",
+         "amélie", "lost", "in", "space", "spider-man", "story", "last", "day", "king", "war",
+         "blade", "runner", "alien", "heat", "home", "alone", "big", "little", "red", "blue"]
+
+
+def create_titles(count, seed=42):
+    """
+    Creates synthetic titles of 1 to 5 words with popularity-skewed favourite counts.
+
+    Args:
+        count (int): The number of titles.
+        seed (int): The seed of the random generator. Defaults to 42.
+
+    Returns:
+        list[tuple[int, str, int]]: The IDs, titles and popularity.
+    """
+    rng = random.Random(seed)
+    return [(movie_id, " ".join(rng.choices(WORDS, k=rng.randint(1, 5))).title()
+             + f" {rng.randrange(count)}", int(rng.paretovariate(1.5)) - 1)
+            for movie_id in range(1, count + 1)]
+
+
+def percentiles(latencies):
+    """Returns the mean, p50 and p95 of latencies in milliseconds."""
+    cuts = quantiles(latencies, n=20)
+    return mean(latencies), cuts[9], cuts[18]
+
+
+def main():
+    for size in SIZES:
+        titles = create_titles(size)
+        index = TitleIndex(load_titles=lambda: titles)
+
+        start = perf_counter()
+        index.rebuild()
+        build = perf_counter() - start
+
+        rng = random.Random(7)
+        prefixes = [title[:rng.randint(1, 8)] for _, title, _ in rng.sample(titles, QUERIES)]
+        latencies = []
+
+        for prefix in prefixes:
+            start = perf_counter()
+            index.search(prefix, limit=10)
+            latencies.append((perf_counter() - start) * 1000)
+
+        adds = []
+
+        for movie_id in range(size + 1, size + ADDS + 1):
+            start = perf_counter()
+            index.add(movie_id, f"{rng.choice(WORDS)} {rng.choice(WORDS)}")
+            adds.append((perf_counter() - start) * 1000)
+
+        print(f"{size:>9} titles: build {build:6.2f}s | "
+              "search mean={:.3f}ms p50={:.3f}ms p95={:.3f}ms | ".format(*percentiles(latencies))
+              + "add mean={:.3f}ms p95={:.3f}ms".format(*percentiles(adds)[::2]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""A local HTTP/1.1 keep-alive server answering like the OMDb API, for benchmarks."""
+import json
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+MOVIE = {
+    "Title": "Stub Movie", "Year": "2000", "imdbRating": "7.5", "Poster": "N/A",
+    "imdbID": "tt0000001", "Genre": "Drama, Comedy", "Director": "Jane Doe",
+    "Writer": "Jane Doe, John Doe", "Actors": "Actor One, Actor Two", "Response": "True"
+}
+
+
+class OmdbStubHandler(BaseHTTPRequestHandler):
+    """Answers every title lookup with MOVIE and every search with a single result."""
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        # Headers and body are written separately, avoid stalling on delayed ACKs
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)
+
+        if "s" in query:
+            body = {"Search": [MOVIE], "totalResults": "1", "Response": "True"}
+        else:
+            body = {**MOVIE, "Title": query.get("t", ["Stub Movie"])[0]}
+
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server():
+    """
+    Starts the stub server on a free local port in a daemon thread.
+
+    Returns:
+        ThreadingHTTPServer: The running server, stop it with shutdown().
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), OmdbStubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def stub_url(server):
+    """Returns the base URL of a running stub server."""
+    host, port = server.server_address
+    return f"http://{host}:{port}"
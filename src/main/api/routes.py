@@ -1,9 +1,18 @@
-from flask import Blueprint, jsonify, request, current_app as app
-from repository.sqlite_repository import repo
-from omdb.omdb_client import OmdbClient
-from gemini.gemini_client import GeminiClient
+import json
+import math
+from flask import Blueprint, Response, jsonify, request, stream_with_context, current_app as app
+from requests import RequestException
+from repository.caching_repository import repo
+from repository.sqlite_projections import projections
+from repository.title_index import title_index
+from repository.sqlite_job_queue import job_queue
+from repository.sqlite_recommendation_cache import recommendation_cache, favourites_fingerprint
+from recommendations.gemini_recommendations import recommend_with_gemini, \
+    find_gemini_recommendations
 from gemini.rate_limit_error import RateLimitError
-from environment import omdb_api_key, gemini_api_key
+from omdb.upstream_error import UpstreamError
+from concurrency.rate_control import CircuitOpenError, retry_after_seconds
+from concurrency.deadline import DeadlineExceededError, current_deadline, deadline_scope
 
 bp = Blueprint("api", __name__)
 
@@ -14,22 +23,57 @@ def get_movies():
     Retrieves a list of movies from the local repository.
 
     Query Parameters:
-        title (str, optional): If provided, filters movies whose title contains the given string
+        title (str, optional): If provided, searches movies by the given string. Finds the movies
+        whose title or one of its words starts with the string in the in-memory title index. If
+        there are none, uses the ranked full-text search over titles, genres and crew members if
+        available, otherwise filters movies whose title contains the given string
         (case-insensitive).
+        limit (int, optional): The page size when listing all movies. Defaults to the configured
+        MOVIES_PAGE_SIZE and is capped at MAX_MOVIES_PAGE_SIZE.
+        cursor (int, optional): The next_cursor of the previous page when listing all movies.
+        stream (bool, optional): If 'true', streams all movies as newline-delimited JSON instead
+        of returning a page.
 
     Returns:
         jsonify: A JSON response containing a list of movies.
-                 If a 'title' query parameter is provided, returns movies matching the title.
-                 Otherwise, returns all movies in the repository.
+                 If a 'title' query parameter is provided, returns up to 10 movies matching the
+                 title.
+                 Otherwise, returns a page of movies together with the next_cursor, which is null
+                 on the last page.
+        Response: A newline-delimited JSON stream of all movies if 'stream' is 'true'.
+        tuple: A tuple containing a "Bad Request" message and a 400 status code if limit or cursor
+        are not integers.
     """
     title = request.args.get("title")
 
     if title:
-        movies = repo.find_movies_like(title=title, limit=10)
+        movie_ids = title_index.search(title, limit=10)
+
+        if movie_ids:
+            movies = projections.find_movies_by_ids(movie_ids)
+        elif repo.has_full_text_search():
+            movies = projections.search_movies(title, limit=10)
+        else:
+            movies = projections.find_movies_like(title=title, limit=10)
+
         return __jsonify_entities(movies)
 
-    movies = repo.find_all_movies()
-    return __jsonify_entities(movies)
+    if request.args.get("stream") == "true":
+        batch_size = app.config.get("MOVIES_STREAM_BATCH_SIZE")
+        movies = projections.stream_all_movies(batch_size=batch_size)
+        lines = (json.dumps(movie.to_dict()) + "\n" for movie in movies)
+        return Response(stream_with_context(lines), mimetype="application/x-ndjson")
+
+    try:
+        limit = int(request.args.get("limit", app.config.get("MOVIES_PAGE_SIZE")))
+        cursor = request.args.get("cursor")
+        cursor = int(cursor) if cursor else None
+    except ValueError:
+        return "Bad Request", 400
+
+    limit = max(1, min(limit, app.config.get("MAX_MOVIES_PAGE_SIZE")))
+    movies, next_cursor = projections.find_movies_page(after_id=cursor, limit=limit)
+    return __jsonify_entities(movies, next_cursor=next_cursor)
 
 
 @bp.route("/omdb-movies")
@@ -45,8 +89,12 @@ def get_omdb_movies():
                  Returns a list of movies matching the title, including total results.
         tuple: A tuple containing a "Bad Request" message and a 400 status code if no title is
         provided.
+        tuple: A tuple containing a "Service Unavailable" message and a 503 status code if the
+        OMDB API is down.
+        tuple: A tuple containing a "Gateway Timeout" message and a 504 status code if the OMDB
+        API doesn't answer before the deadline of the request.
     """
-    omdb_client = OmdbClient(api_key=omdb_api_key())
+    omdb_client = app.extensions["omdb_client"]
     title = request.args.get("title")
 
     if title:
@@ -55,20 +103,97 @@ def get_omdb_movies():
             return jsonify(movies)
         except ValueError:
             return jsonify({"total_results": 0, "results": []})
+        except CircuitOpenError as e:
+            return __retry_later("Service Unavailable", 503, e.retry_after)
 
     return "Bad Request", 400
 
 
+@bp.route("/search")
+def search_movies():
+    """
+    Searches movies in the local repository and on the OMDB API concurrently. Local movies are
+    listed first and OMDB movies already stored locally are left out.
+
+    Query Parameters:
+        title (str, required): The title of the movie to search for.
+
+    Returns:
+        jsonify: A JSON response containing the total number of results, the movies found and
+                 whether the results are partial because the OMDB API missed the deadline of the
+                 search or the request or failed, in which case only local movies are returned.
+        tuple: A tuple containing a "Bad Request" message and a 400 status code if no title is
+        provided.
+    """
+    title = request.args.get("title")
+
+    if not title:
+        return "Bad Request", 400
+
+    return jsonify(app.extensions["movie_search"].search(title))
+
+
+@bp.route("/jobs/<int:job_id>")
+def get_job(job_id):
+    """
+    Retrieves the status of a background job, e.g. adding a movie to a user's favourites.
+
+    Path Parameters:
+        job_id (int): The ID of the job.
+
+    Returns:
+        jsonify: A JSON response containing the job with its kind, payload, status, number of
+                 attempts and the error of the last failed attempt.
+        tuple: A tuple containing a "Not Found" message and a 404 status code if the job with
+        the given ID does not exist.
+    """
+    job = job_queue.find_job_by_id(job_id)
+
+    if job is None:
+        return "Not Found", 404
+
+    return jsonify(job.to_dict())
+
+
+@bp.route("/stats")
+def get_stats():
+    """
+    Retrieves the operational statistics of the application, e.g. to check the hit ratio of the
+    caches or how close the upstream services are to their rate limits.
+
+    Returns:
+        jsonify: A JSON response containing the size and latency metrics of the Gemini prompts,
+                 the counters and circuit states of the rate controllers per upstream service,
+                 the OMDB cache and coalescing statistics, the Gemini coalescing statistics and
+                 the statistics of the repository caches.
+    """
+    omdb_client = app.extensions["omdb_client"]
+
+    return jsonify({
+        "gemini_prompts": app.extensions["gemini_prompt_metrics"].stats(),
+        "gemini_coalescing": app.extensions["gemini_single_flight"].stats(),
+        "rate_controllers": {service: rate_controller.stats() for service, rate_controller
+                             in app.extensions["rate_controllers"].items()},
+        "omdb": omdb_client.stats() if hasattr(omdb_client, "stats") else {},
+        "repository_caches": repo.stats()
+    })
+
+
 @bp.route("/users/<int:user_id>/recommendations")
 def get_recommendations(user_id):
     """
-    Retrieves movie recommendations for a specific user based on their favorite movies.
+    Retrieves movie recommendations for a specific user based on their favorite movies. The
+    resolved recommendations are cached per user until their favourites change. If Gemini is
+    disabled, rate limited, down or too slow for the deadline of the request, the
+    recommendations of the local recommender are returned. Movies which aren't resolved before
+    the deadline or whose OMDB lookup failed are left out.
 
     Path Parameters:
         user_id (int): The ID of the user to get recommendations for.
 
     Returns:
-        jsonify: A JSON response containing a list of recommended movie details fetched from OMDB.
+        jsonify: A JSON response containing a list of recommended movie details, taken from the
+                 local repository if stored there and fetched from OMDB otherwise.
                  Returns an empty list if the user has fewer than the required number of favorite
                  movies
                  to generate recommendations.
@@ -77,47 +202,234 @@ def get_recommendations(user_id):
         tuple: A tuple containing an error message and a 401 status code if there is a permission
         error with the Gemini API.
         tuple: A tuple containing a "Too Many Requests" message and a 429 status code if the
-        Gemini API rate limit is exceeded.
+        Gemini API rate limit is still exceeded after retrying and the local recommender has no
+        recommendations.
+        tuple: A tuple containing a "Service Unavailable" message and a 503 status code if the
+        Gemini or OMDB API is down or unreachable and the local recommender has no
+        recommendations.
+        tuple: A tuple containing a "Gateway Timeout" message and a 504 status code if Gemini
+        doesn't answer before the deadline of the request and the local recommender has no
+        recommendations.
     """
-    user = repo.find_user_by_id(user_id)
-
-    if not user:
+    if not repo.has_user(user_id):
         return "Not Found", 404
 
-    user_movies = user.movies
-    if len(user_movies) < app.config.get("START_RECOMMENDATIONS"):
+    favourites = projections.find_favourites(user_id)
+    if len(favourites) < app.config.get("START_RECOMMENDATIONS"):
         return jsonify([])
 
+    if not app.config.get("RECOMMENDATIONS_USE_GEMINI"):
+        return jsonify(__recommend_locally(user_id))
+
+    fingerprint = favourites_fingerprint(movie_id for movie_id, _ in favourites)
+    cached_movies = recommendation_cache.get(user_id, fingerprint)
+
+    if cached_movies is not None:
+        return jsonify(cached_movies)
+
     try:
-        gemini_client = GeminiClient(api_key=gemini_api_key())
-        omdb_client = OmdbClient(api_key=omdb_api_key())
-        recommendations = gemini_client.find_recommendations([movie.title for movie in user_movies])
-
-        movies = []
-        for title in recommendations:
-            try:
-                movies.append(omdb_client.find_movie_by_title(title))
-            except ValueError:
-                continue  # Go on if movie not found
-
-        return jsonify(movies)
+        return jsonify(recommend_with_gemini(user_id, fingerprint))
     except PermissionError as e:
         return str(e), 401
-    except RateLimitError:
-        return "Too Many Requests", 429
+    except (RateLimitError, CircuitOpenError, DeadlineExceededError, UpstreamError,
+            RequestException) as e:
+        movies = __recommend_locally(user_id)
+
+        if movies:
+            return jsonify(movies)
+
+        if isinstance(e, RateLimitError):
+            return __retry_later("Too Many Requests", 429, e.retry_after)
+
+        if isinstance(e, DeadlineExceededError):
+            return "Gateway Timeout", 504
+
+        return __retry_later("Service Unavailable", 503, getattr(e, "retry_after", None))
+
+
+@bp.route("/users/<int:user_id>/recommendations/stream")
+def stream_recommendations(user_id):
+    """
+    Streams movie recommendations for a specific user as Server-Sent Events, sending every
+    recommended movie as soon as it is resolved instead of waiting for the slowest OMDB lookup.
+    Behaves like get_recommendations otherwise.
+
+    Path Parameters:
+        user_id (int): The ID of the user to get recommendations for.
+
+    Returns:
+        Response: An event stream sending a 'movie' event with the details of every recommended
+                  movie, followed by a 'done' event with the number of sent movies and whether
+                  they are partial because the deadline of the request passed or OMDB lookups
+                  failed, or an 'error'
+                  event with the message, status code and retry_after in seconds of the failure.
+        tuple: A tuple containing a "Not Found" message and a 404 status code if the user with
+        the given ID does not exist.
+    """
+    if not repo.has_user(user_id):
+        return "Not Found", 404
+
+    events = __recommendation_events(user_id, projections.find_favourites(user_id))
+    events = __within_deadline(events, current_deadline())
+    return Response(stream_with_context(events), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+def __recommendation_events(user_id, favourites):
+    """
+    Helper function generating the Server-Sent Events of the recommendations of a user. The
+    resolved recommendations are cached like in get_recommendations.
+
+    Args:
+        user_id (int): The ID of the user.
+        favourites (list[tuple[int, str]]): The IDs and titles of the user's favourite movies.
+
+    Yields:
+        str: The next event.
+    """
+    if len(favourites) < app.config.get("START_RECOMMENDATIONS"):
+        yield __sse_event("done", {"total_results": 0})
+        return
+
+    if not app.config.get("RECOMMENDATIONS_USE_GEMINI"):
+        movies = __recommend_locally(user_id)
+        yield from (__sse_event("movie", movie) for movie in movies)
+        yield __sse_event("done", {"total_results": len(movies)})
+        return
+
+    fingerprint = favourites_fingerprint(movie_id for movie_id, _ in favourites)
+    cached_movies = recommendation_cache.get(user_id, fingerprint)
+
+    if cached_movies is not None:
+        yield from (__sse_event("movie", movie) for movie in cached_movies)
+        yield __sse_event("done", {"total_results": len(cached_movies)})
+        return
+
+    try:
+        recommendations = find_gemini_recommendations(user_id)
+        resolved, failed = [], False
+
+        for index, movie in app.extensions["recommendation_resolver"].resolve_as_completed(
+                recommendations):
+            if movie is None:
+                failed = True
+                continue
+
+            resolved.append((index, movie))
+            yield __sse_event("movie", movie)
+
+        movies = [movie for _, movie in sorted(resolved, key=lambda result: result[0])]
+        deadline = current_deadline()
+        partial = failed or deadline is not None and deadline.expired
+
+        if not partial:
+            recommendation_cache.set(user_id, fingerprint, movies)
+
+        yield __sse_event("done", {"total_results": len(movies), "partial": partial})
+    except PermissionError as e:
+        yield __sse_event("error", {"message": str(e), "status": 401})
+    except (RateLimitError, CircuitOpenError, DeadlineExceededError, UpstreamError,
+            RequestException) as e:
+        movies = __recommend_locally(user_id)
+
+        if movies:
+            yield from (__sse_event("movie", movie) for movie in movies)
+            yield __sse_event("done", {"total_results": len(movies)})
+        elif isinstance(e, RateLimitError):
+            yield __sse_event("error", {"message": "Too Many Requests", "status": 429,
+                                        "retry_after": retry_after_seconds(e.retry_after)})
+        elif isinstance(e, DeadlineExceededError):
+            yield __sse_event("error", {"message": "Gateway Timeout", "status": 504})
+        else:
+            yield __sse_event("error", {
+                "message": "Service Unavailable", "status": 503,
+                "retry_after": retry_after_seconds(getattr(e, "retry_after", None))
+            })
+    except RuntimeError as e:
+        app.logger.error(e)
+        yield __sse_event("error", {"message": "Internal Server Error", "status": 500})
+
+
+def __within_deadline(events, deadline):
+    """
+    Helper function iterating the events of a streamed response within the deadline of the
+    request, which already ended when the response is sent.
+
+    Args:
+        events (Iterator[str]): The events.
+        deadline (Deadline or None): The deadline of the request.
+
+    Yields:
+        str: The next event.
+    """
+    with deadline_scope(None if deadline is None else deadline.remaining()):
+        yield from events
+
+
+def __sse_event(event, data):
+    """
+    Helper function to format a Server-Sent Event.
+
+    Args:
+        event (str): The name of the event.
+        data (dict): The JSON serializable data of the event.
+
+    Returns:
+        str: The event in the text/event-stream format.
+    """
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def __recommend_locally(user_id):
+    """
+    Helper function to recommend movies with the local recommender instead of Gemini. As a
+    fallback it runs without the deadline of the request, which may have passed already.
+
+    Args:
+        user_id (int): The ID of the user.
+
+    Returns:
+        list[dict]: The details of the recommended movies, shaped like the movies returned by
+                    OmdbClient.find_movie_by_title.
+    """
+    with deadline_scope(None):
+        movie_ids = app.extensions["local_recommender"].recommend(
+            user_id, k=app.config.get("RECOMMENDATIONS_COUNT"))
+        return projections.find_movie_details_by_ids(movie_ids)
+
+
+def __retry_later(message, status_code, retry_after):
+    """
+    Helper function to build an error response telling the client when to retry.
+
+    Args:
+        message (str): The error message.
+        status_code (int): The HTTP status code.
+        retry_after (float or str): The number of seconds or Retry-After header value of the
+                                    upstream service, or None if unknown.
+
+    Returns:
+        tuple: A tuple containing the message, the status code and a Retry-After header in whole
+        seconds if known.
+    """
+    seconds = retry_after_seconds(retry_after)
+    headers = {"Retry-After": str(math.ceil(seconds))} if seconds is not None else {}
+    return message, status_code, headers
 
 
-def __jsonify_entities(entities):
+def __jsonify_entities(entities, **extra):
     """
-    Helper function to jsonify a list of SQLAlchemy entities.
+    Helper function to jsonify a list of SQLAlchemy entities or projections.
 
     Args:
-        entities (list): A list of SQLAlchemy entity objects.
+        entities (list): A list of objects providing a to_dict method.
+        **extra: Additional top-level fields of the response.
 
     Returns:
         jsonify: A JSON response containing a list of dictionaries representing the entities.
     """
     return jsonify({
         "total_results": len(entities),
-        "results": [entity.to_dict() for entity in entities]
+        "results": [entity.to_dict() for entity in entities],
+        **extra
     })
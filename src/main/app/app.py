@@ -1,8 +1,33 @@
-from flask import Flask
+from concurrent.futures import ThreadPoolExecutor
+from flask import Flask, current_app, g, request
+from sqlalchemy.exc import OperationalError
 from repository import db
 import repository.entities
+from repository.migrations import migrate
+from repository.sqlite_tuning import apply_pragmas, interrupt_on_deadline
+from repository.query_profiler import QueryProfiler
+from repository.sqlite_projections import projections
+from repository.title_index import title_index
 from api.routes import bp as api
+from omdb.omdb_client import OmdbClient
+from omdb.omdb_cache import OmdbCache
+from omdb.caching_omdb_client import CachingOmdbClient
+from omdb.coalescing_omdb_client import CoalescingOmdbClient
+from concurrency.single_flight import SingleFlight
+from concurrency.rate_control import RateController
+from concurrency.deadline import DeadlineExceededError, current_deadline, start_deadline, \
+    end_deadline
+from gemini.prompt_builder import PromptBuilder
+from gemini.prompt_metrics import PromptMetrics
+from recommendations.recommendation_resolver import RecommendationResolver
+from recommendations.local_recommender import LocalRecommender
+from search.movie_search import MovieSearch
+from repository.sqlite_job_queue import job_queue
+from jobs.job_workers import JobWorkers
+from jobs.movie_jobs import ADD_USER_MOVIE, add_user_movie
+from environment import omdb_api_key
 from .config import Config
+from .commands import precompute_recommendations
 from .routes import bp as main
 
 
@@ -21,12 +46,215 @@ def create_app(flask_config=Config):
                 static_folder=flask_config.STATIC_FOLDER)
     app.config.from_object(flask_config)
 
+    app.extensions["rate_controllers"] = {
+        service: RateController(**settings)
+        for service, settings in app.config.get("RATE_LIMITS").items()
+    }
+    app.extensions["omdb_client"] = __create_omdb_client(app.config,
+                                                         app.extensions["rate_controllers"])
+    app.extensions["gemini_single_flight"] = SingleFlight()
+    app.extensions["gemini_prompt_builder"] = PromptBuilder(**app.config.get("GEMINI_PROMPT"))
+    app.extensions["gemini_prompt_metrics"] = PromptMetrics()
+    app.extensions["omdb_executor"] = ThreadPoolExecutor(
+        max_workers=app.config.get("OMDB_MAX_WORKERS"), thread_name_prefix="omdb")
+    app.extensions["recommendation_resolver"] = RecommendationResolver(
+        omdb_client=app.extensions["omdb_client"],
+        executor=app.extensions["omdb_executor"],
+        find_local_movies=projections.find_movie_details_by_titles,
+        current_deadline=current_deadline,
+        logger=app.logger
+    )
+    search_limit = app.config.get("SEARCH_LOCAL_LIMIT")
+    fuzzy_threshold = app.config.get("SEARCH_FUZZY_THRESHOLD")
+    app.extensions["movie_search"] = MovieSearch(
+        find_local_movies=lambda title: __find_local_movies(title, search_limit),
+        omdb_client=app.extensions["omdb_client"],
+        executor=app.extensions["omdb_executor"],
+        timeout=app.config.get("SEARCH_TIMEOUT"),
+        find_close_movies=None if fuzzy_threshold is None else
+        lambda title: __find_close_movies(title, fuzzy_threshold, search_limit),
+        current_deadline=current_deadline,
+        logger=app.logger
+    )
+    app.extensions["local_recommender"] = LocalRecommender(
+        load_favourites=projections.find_favourite_ratings,
+        load_features=projections.find_movie_features,
+        weights=app.config.get("LOCAL_RECOMMENDER_WEIGHTS"),
+        max_age=app.config.get("LOCAL_RECOMMENDER_MAX_AGE")
+    )
+
     app.register_blueprint(main)
     app.register_blueprint(api, url_prefix="/api")
+    app.cli.add_command(precompute_recommendations)
+    app.extensions["query_profiler"] = QueryProfiler(
+        slow_threshold=app.config.get("SLOW_QUERY_THRESHOLD"), logger=app.logger)
+    app.before_request(__start_request_deadline)
+    app.before_request(__start_query_profiling)
+    app.after_request(__add_server_timing)
+    app.teardown_request(__end_request_deadline)
+    app.teardown_request(__end_query_profiling)
+    app.register_error_handler(DeadlineExceededError, __deadline_exceeded)
+    app.register_error_handler(OperationalError, __database_error)
 
     db.init_app(app)
 
     with app.app_context():
+        apply_pragmas(db.engine, app.config.get("SQLITE_PRAGMAS"))
+        interrupt_on_deadline(db.engine, current_deadline)
+        app.extensions["query_profiler"].install(db.engine)
         db.create_all()
+        migrate(db.engine)
+        title_index.rebuild()
+
+    app.extensions["job_workers"] = JobWorkers(
+        queue=job_queue,
+        handlers={ADD_USER_MOVIE: add_user_movie},
+        context=app.app_context,
+        threads=app.config.get("JOB_WORKERS"),
+        poll_interval=app.config.get("JOB_POLL_INTERVAL"),
+        max_attempts=app.config.get("JOB_MAX_ATTEMPTS"),
+        backoff_base=app.config.get("JOB_BACKOFF_BASE"),
+        logger=app.logger
+    )
+
+    if app.config.get("JOB_WORKERS"):
+        app.extensions["job_workers"].start()
 
     return app
+
+
+def __create_omdb_client(config, rate_controllers):
+    """
+    Creates the application-wide OMDb client, wrapped in a persistent response cache if a cache
+    path is configured and coalescing concurrent identical lookups.
+
+    Args:
+        config (flask.Config): The application configuration.
+        rate_controllers (dict[str, RateController]): The rate controllers per service.
+
+    Returns:
+        CoalescingOmdbClient: The configured client.
+    """
+    client = OmdbClient(api_key=omdb_api_key(),
+                        timeout=config.get("OMDB_TIMEOUT"),
+                        pool_size=config.get("OMDB_POOL_SIZE"),
+                        retries=config.get("OMDB_RETRIES"),
+                        rate_controller=rate_controllers.get("omdb"),
+                        current_deadline=current_deadline)
+
+    if config.get("OMDB_CACHE_PATH"):
+        cache = OmdbCache(config.get("OMDB_CACHE_PATH"),
+                          ttls=config.get("OMDB_CACHE_TTLS"),
+                          max_bytes=config.get("OMDB_CACHE_MAX_BYTES"))
+        client = CachingOmdbClient(client=client, cache=cache)
+
+    return CoalescingOmdbClient(client=client, single_flight=SingleFlight())
+
+
+def __find_local_movies(title, limit):
+    """
+    Finds local movies for the unified search, from the title index if any title or one of its
+    words starts with the given string, otherwise by titles containing it.
+
+    Args:
+        title (str): The title to search for.
+        limit (int): The maximum number of movies.
+
+    Returns:
+        list[MovieSummary]: The matching movies.
+    """
+    return (projections.find_movies_by_ids(title_index.search(title, limit=limit))
+            or projections.find_movies_like(title, limit=limit))
+
+
+def __find_close_movies(title, threshold, limit):
+    """
+    Finds local movies whose titles are similar enough to a possibly misspelled title to skip
+    the OMDB search. Movies of the same series, like "Heat" for "Heat 2" or "Aliens" for
+    "Alien", are ignored, as the searched movie is rather missing locally, see
+    TitleIndex.find_corrections.
+
+    Args:
+        title (str): The title to search for.
+        threshold (float): The minimum trigram similarity between 0 and 1.
+        limit (int): The maximum number of movies.
+
+    Returns:
+        list[MovieSummary]: The close movies, most similar first.
+    """
+    ids = [movie_id for movie_id, _ in title_index.find_corrections(title, limit, threshold)]
+    return projections.find_movies_by_ids(ids)
+
+
+def __start_request_deadline():
+    """
+    Starts the deadline of the current request if one is configured for its endpoint in
+    REQUEST_DEADLINES, which clips the timeouts of the OMDB and Gemini calls and interrupts
+    long database queries.
+    """
+    seconds = current_app.config.get("REQUEST_DEADLINES", {}).get(request.endpoint)
+
+    if seconds is not None:
+        g.deadline_token = start_deadline(seconds)
+
+
+def __end_request_deadline(error=None):
+    """Ends the deadline of the current request, if any."""
+    token = g.pop("deadline_token", None)
+
+    if token is not None:
+        end_deadline(token)
+
+
+def __start_query_profiling():
+    """Starts counting and timing the SQL statements of the current request."""
+    g.query_profiling_token = current_app.extensions["query_profiler"].start()
+
+
+def __add_server_timing(response):
+    """
+    Adds the number and total duration of the SQL statements of the current request to the
+    response as Server-Timing header, if enabled by SERVER_TIMING. Statements of streamed
+    responses executed while sending the body aren't included.
+
+    Args:
+        response (flask.Response): The response.
+
+    Returns:
+        flask.Response: The response.
+    """
+    stats = current_app.extensions["query_profiler"].current_stats()
+
+    if current_app.config.get("SERVER_TIMING") and stats is not None:
+        response.headers.add("Server-Timing", stats.server_timing())
+
+    return response
+
+
+def __end_query_profiling(error=None):
+    """Stops counting and timing the SQL statements of the current request."""
+    token = g.pop("query_profiling_token", None)
+
+    if token is not None:
+        current_app.extensions["query_profiler"].stop(token)
+
+
+def __deadline_exceeded(e):
+    """Handles requests which used up their deadline without a result to degrade to."""
+    return "Gateway Timeout", 504
+
+
+def __database_error(e):
+    """
+    Handles database errors, answering queries interrupted by the deadline of the request with
+    504 Gateway Timeout.
+
+    Raises:
+        OperationalError: If the deadline of the request didn't pass.
+    """
+    deadline = current_deadline()
+
+    if deadline is None or not deadline.expired:
+        raise e
+
+    return "Gateway Timeout", 504
@@ -0,0 +1,33 @@
+import click
+from flask import current_app as app
+from flask.cli import with_appcontext
+from repository.sqlite_projections import projections
+from repository.sqlite_recommendation_cache import recommendation_cache, favourites_fingerprint
+from recommendations.gemini_recommendations import recommend_with_gemini
+from recommendations.recommendation_precomputer import RecommendationPrecomputer
+
+
+@click.command("precompute-recommendations")
+@click.option("--budget", type=int, default=None,
+              help="Maximum number of Gemini requests, defaults to PRECOMPUTE_GEMINI_BUDGET.")
+@click.option("--workers", type=int, default=None,
+              help="Number of users computed concurrently, defaults to PRECOMPUTE_MAX_WORKERS.")
+@with_appcontext
+def precompute_recommendations(budget, workers):
+    """
+    Precomputes the recommendations of all users with enough favourites whose favourites changed
+    since the last run, so the API serves them instantly.
+    """
+    precomputer = RecommendationPrecomputer(
+        load_favourites=projections.find_favourite_ratings,
+        load_fingerprints=recommendation_cache.find_fingerprints,
+        fingerprint=favourites_fingerprint,
+        recommend=recommend_with_gemini,
+        context=app.app_context,
+        min_favourites=app.config.get("START_RECOMMENDATIONS"),
+        budget=budget if budget is not None else app.config.get("PRECOMPUTE_GEMINI_BUDGET"),
+        max_workers=workers or app.config.get("PRECOMPUTE_MAX_WORKERS"),
+        logger=app.logger
+    )
+    stats = precomputer.run()
+    click.echo(", ".join(f"{name.replace('_', ' ')}: {count}" for name, count in stats.items()))
@@ -1,14 +1,70 @@
+import os
 from environment import database_uri
-from definitions import TEMPLATES_DIR, STATIC_DIR, UPLOADS_DIR
+from definitions import TEMPLATES_DIR, STATIC_DIR, UPLOADS_DIR, DATA_DIR
+from repository.sqlite_tuning import WAL_PROFILE
 
 
 class Config:
     """Configuration class for the Flask application."""
 
     SQLALCHEMY_DATABASE_URI = database_uri()
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        "pool_size": 10,
+        "max_overflow": 10,
+        "pool_timeout": 10,  # Seconds to wait for a free connection
+    }
+    SQLITE_PRAGMAS = WAL_PROFILE
+    SERVER_TIMING = True  # Number and duration of SQL statements as Server-Timing header
+    SLOW_QUERY_THRESHOLD = 0.1  # Seconds from which statements are logged, None disables the log
     TEMPLATE_FOLDER = TEMPLATES_DIR
     STATIC_FOLDER = STATIC_DIR
     UPLOADS_FOLDER = UPLOADS_DIR
     ALLOWED_FILE_TYPES = ("png", "jpg", "jpeg", "gif")
     MAX_FILE_SIZE = 2 * 1024 * 1024  # 2MB
     START_RECOMMENDATIONS = 3
+    RECOMMENDATIONS_COUNT = 5
+    RECOMMENDATIONS_USE_GEMINI = True  # False recommends with the local recommender only
+    GEMINI_PROMPT = {  # Caps the favourites sent to Gemini, see PromptBuilder
+        "max_favourites": 50,
+        "rating_share": 0.4,  # Highest personal ratings
+        "recent_share": 0.2,  # Most recent additions, the rest is sampled by genre
+    }
+    GEMINI_OVERFETCH = 3  # Extra suggestions asked for if favourites are omitted from the prompt
+    PRECOMPUTE_GEMINI_BUDGET = 100  # Gemini requests per run of precompute-recommendations
+    PRECOMPUTE_MAX_WORKERS = 2  # Users computed concurrently by precompute-recommendations
+    LOCAL_RECOMMENDER_WEIGHTS = {"co_favourites": 0.5, "genres": 0.2, "crew": 0.3}
+    LOCAL_RECOMMENDER_MAX_AGE = 10 * 60  # Seconds until the model is rebuilt
+    OMDB_TIMEOUT = (3.05, 10)  # Connect and read timeout in seconds
+    OMDB_POOL_SIZE = 10
+    OMDB_RETRIES = 2
+    OMDB_MAX_WORKERS = 5  # Concurrent OMDB lookups when resolving recommendations and searching
+    REQUEST_DEADLINES = {  # Time budget in seconds per endpoint, other endpoints have none
+        "api.search_movies": 3,
+        "api.get_omdb_movies": 5,
+        "api.get_recommendations": 15,
+        "api.stream_recommendations": 30,
+    }
+    GEMINI_TIMEOUT = 20  # Seconds per Gemini request, clipped to the request deadline
+    SEARCH_TIMEOUT = 1.5  # Seconds until /api/search returns the local results only
+    SEARCH_LOCAL_LIMIT = 10
+    SEARCH_FUZZY_THRESHOLD = 0.6  # Trigram similarity of local titles skipping OMDB, None disables
+    OMDB_CACHE_PATH = os.path.join(DATA_DIR, "omdb_cache.sqlite")  # None disables the cache
+    OMDB_CACHE_MAX_BYTES = 50 * 1024 * 1024  # 50MB
+    OMDB_CACHE_TTLS = {
+        "movie": 7 * 24 * 60 * 60,  # 7 days
+        "search": 24 * 60 * 60,  # 1 day
+        "not_found": 6 * 60 * 60,  # 6 hours
+    }
+    RATE_LIMITS = {  # Outbound rate control per upstream service, see RateController
+        "omdb": {"rate": 10, "capacity": 20, "retries": 2, "failure_threshold": 5,
+                 "reset_timeout": 30},
+        "gemini": {"rate": 0.25, "capacity": 5, "retries": 2, "failure_threshold": 3,
+                   "reset_timeout": 60},  # Free tier allows 15 requests per minute
+    }
+    JOB_WORKERS = 2  # Background worker threads, 0 disables them
+    JOB_POLL_INTERVAL = 5  # Seconds
+    JOB_MAX_ATTEMPTS = 5
+    JOB_BACKOFF_BASE = 2  # Seconds before the first retry, doubled for every further retry
+    MOVIES_PAGE_SIZE = 100
+    MAX_MOVIES_PAGE_SIZE = 1000
+    MOVIES_STREAM_BATCH_SIZE = 500
@@ -1,9 +1,10 @@
 import os
 from uuid import uuid4
 from flask import Blueprint, render_template, request, redirect, url_for, abort, current_app as app
-from repository.sqlite_repository import repo
-from omdb.omdb_client import OmdbClient
-from environment import omdb_api_key
+from repository.caching_repository import repo
+from repository.sqlite_projections import projections
+from repository.sqlite_job_queue import job_queue
+from jobs.movie_jobs import ADD_USER_MOVIE
 
 bp = Blueprint("main", __name__)
 
@@ -13,7 +14,7 @@ def index():
     """Renders the index page, displaying a list of users."""
     msg = request.args.get("msg")
     msg_lvl = request.args.get("msg_lvl")
-    users = repo.find_all_users()
+    users = projections.find_all_users()
     return render_template("index.html", users=users, msg=msg, msg_lvl=msg_lvl)
 
 
@@ -25,7 +26,7 @@ def user_movies(user_id):
     movie_to_update = request.args.get("movie_to_update")
     current_rating = request.args.get("current_rating")
 
-    user = repo.find_user_by_id(user_id)
+    user = repo.find_user_library(user_id)
 
     if not user:
         return abort(404)
@@ -34,6 +35,7 @@ def user_movies(user_id):
         "user_movies.html",
         user=user,
         user_movies=user.movie_associations,
+        pending_jobs=job_queue.find_unfinished_jobs(user_id, ADD_USER_MOVIE),
         start_recommendations=app.config.get("START_RECOMMENDATIONS"),
         movie_to_update=movie_to_update,
         current_rating=current_rating,
@@ -44,7 +46,10 @@ def user_movies(user_id):
 
 @bp.route("/users/<int:user_id>", methods=["POST"])
 def add_user_movie(user_id):
-    """Adds a movie to a user's favorites."""
+    """
+    Adds a movie to a user's favorites. Movies which are not stored yet are added in the
+    background by a job fetching their details from OMDB, which is pending until then.
+    """
     json = request.json
     movie_id = json.get("id")
     movie_title = json.get("title")
@@ -72,21 +77,18 @@ def add_user_movie(user_id):
         if movie_in_db:
             repo.add_user_movie(user_id, movie_id or movie.id)
         else:
-            omdb_client = OmdbClient(api_key=omdb_api_key())
-            movie = omdb_client.find_movie_by_title(movie_title)
-
-            new_movie = repo.add_movie(
-                movie.get("title"),
-                movie.get("release_year"),
-                movie.get("rating"),
-                movie.get("poster_url"),
-                movie.get("imdb_id"),
-                movie.get("genres"),
-                movie.get("directors"),
-                movie.get("writers"),
-                movie.get("actors")
+            pending_jobs = job_queue.find_unfinished_jobs(user_id, ADD_USER_MOVIE)
+
+            if not any(job.payload.get("title") == movie_title for job in pending_jobs):
+                job_queue.enqueue(ADD_USER_MOVIE, {"user_id": user_id, "title": movie_title},
+                                  user_id=user_id)
+                app.extensions["job_workers"].wake_up()
+
+            return __redirect(
+                "main.user_movies",
+                ("Movie is being added...", "success"),
+                user_id=user_id
             )
-            repo.add_user_movie(user_id, new_movie.id)
 
         return __redirect(
             "main.user_movies",
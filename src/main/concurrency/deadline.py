@@ -0,0 +1,142 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import monotonic
+
+
+class DeadlineExceededError(TimeoutError):
+    """Exception raised when the time budget of the current request is used up."""
+
+    def __init__(self):
+        """Initializes a DeadlineExceededError."""
+        super().__init__("Deadline exceeded")
+
+
+class Deadline:
+    """A point in time by which a request must be answered, leaving a shrinking time budget."""
+
+    def __init__(self, seconds, clock=monotonic):
+        """
+        Initializes a Deadline.
+
+        Args:
+            seconds (float): The time budget in seconds from now.
+            clock (Callable[[], float]): The time source in seconds. Defaults to time.monotonic.
+        """
+        self._clock = clock
+        self._expires_at = clock() + seconds
+
+    @property
+    def expired(self):
+        """bool: Whether the time budget is used up."""
+        return self._clock() >= self._expires_at
+
+    def remaining(self):
+        """
+        Returns the remaining time budget.
+
+        Returns:
+            float: The number of seconds left, at least 0.
+        """
+        return max(0.0, self._expires_at - self._clock())
+
+    def check(self):
+        """
+        Checks that the time budget isn't used up yet.
+
+        Raises:
+            DeadlineExceededError: If the deadline has passed.
+        """
+        if self.expired:
+            raise DeadlineExceededError()
+
+    def clip(self, timeout):
+        """
+        Clips a timeout to the remaining time budget.
+
+        Args:
+            timeout (float or tuple[float, float] or None): The timeout in seconds, a tuple of
+                timeouts like the connect and read timeouts of requests, or None for no timeout.
+
+        Returns:
+            float or tuple[float, float]: The timeout, each part at most the remaining time.
+
+        Raises:
+            DeadlineExceededError: If the deadline has passed.
+        """
+        self.check()
+        remaining = self.remaining()
+
+        if timeout is None:
+            return remaining
+
+        if isinstance(timeout, tuple):
+            return tuple(min(part, remaining) for part in timeout)
+
+        return min(timeout, remaining)
+
+
+__current = ContextVar("deadline", default=None)
+
+
+def current_deadline():
+    """
+    Gets the deadline of the current context, e.g. of the request being handled.
+
+    Returns:
+        Deadline or None: The current deadline, or None if there is no time budget.
+    """
+    return __current.get()
+
+
+def start_deadline(seconds, clock=monotonic):
+    """
+    Sets the deadline of the current context, which can only be shortened, not extended.
+
+    Args:
+        seconds (float or None): The time budget in seconds, or None to lift the deadline, e.g.
+                                 for a fallback which must run even if the budget is used up.
+        clock (Callable[[], float]): The time source in seconds. Defaults to time.monotonic.
+
+    Returns:
+        contextvars.Token: The token restoring the previous deadline, see end_deadline.
+    """
+    deadline = None
+
+    if seconds is not None:
+        deadline = Deadline(seconds, clock)
+        outer = __current.get()
+
+        if outer is not None and outer.remaining() < deadline.remaining():
+            deadline = outer
+
+    return __current.set(deadline)
+
+
+def end_deadline(token):
+    """
+    Restores the deadline of the current context before start_deadline was called.
+
+    Args:
+        token (contextvars.Token): The token returned by start_deadline.
+    """
+    __current.reset(token)
+
+
+@contextmanager
+def deadline_scope(seconds, clock=monotonic):
+    """
+    Sets the deadline of the current context within a with block, see start_deadline.
+
+    Args:
+        seconds (float or None): The time budget in seconds, or None to lift the deadline.
+        clock (Callable[[], float]): The time source in seconds. Defaults to time.monotonic.
+
+    Yields:
+        Deadline or None: The deadline in effect.
+    """
+    token = start_deadline(seconds, clock)
+
+    try:
+        yield __current.get()
+    finally:
+        end_deadline(token)
@@ -0,0 +1,364 @@
+from email.utils import parsedate_to_datetime
+from random import random
+from threading import Lock
+from time import monotonic, sleep, time
+from .deadline import DeadlineExceededError, current_deadline
+
+
+class CircuitOpenError(RuntimeError):
+    """Exception raised instead of calling an upstream service while its circuit is open."""
+
+    def __init__(self, retry_after):
+        """
+        Initializes a CircuitOpenError.
+
+        Args:
+            retry_after (float): The number of seconds until the circuit lets a trial call pass.
+        """
+        super().__init__("Upstream service unavailable")
+        self.retry_after = retry_after
+
+
+def retry_after_seconds(retry_after, now=time):
+    """
+    Converts a Retry-After value to seconds.
+
+    Args:
+        retry_after (float or str or None): The number of seconds, or the value of a Retry-After
+                                            header in seconds or as an HTTP date.
+        now (Callable[[], float]): The current unix time, used for HTTP dates.
+                                   Defaults to time.time.
+
+    Returns:
+        float or None: The number of seconds to wait, or None if the value is missing or invalid.
+    """
+    if retry_after is None:
+        return None
+
+    try:
+        return max(0.0, float(retry_after))
+    except ValueError:
+        pass
+
+    try:
+        return max(0.0, parsedate_to_datetime(retry_after).timestamp() - now())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """
+    A thread-safe token bucket limiting the rate of calls, allowing bursts up to its capacity.
+    Tokens are reserved up front, so concurrent callers wait in turn instead of racing.
+    """
+
+    def __init__(self, *, rate, capacity, clock=monotonic, sleep=sleep):
+        """
+        Initializes a full TokenBucket.
+
+        Args:
+            rate (float): The number of tokens added per second.
+            capacity (float): The maximum number of tokens, i.e. the largest burst.
+            clock (Callable[[], float]): The time source in seconds. Defaults to time.monotonic.
+            sleep (Callable[[float], None]): Waits for a number of seconds. Defaults to time.sleep.
+        """
+        self._rate = rate
+        self._capacity = capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = capacity
+        self._updated_at = clock()
+        self._lock = Lock()
+
+    def acquire(self, timeout=None):
+        """
+        Takes a token, waiting until one is available.
+
+        Args:
+            timeout (float): The maximum number of seconds to wait, e.g. the time left until the
+                             deadline of the request. Defaults to None, waiting as long as needed.
+
+        Returns:
+            float: The number of seconds waited.
+
+        Raises:
+            DeadlineExceededError: If no token is available within the timeout, in which case
+                                   the reserved token is given back without waiting.
+        """
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self._capacity,
+                               self._tokens + (now - self._updated_at) * self._rate)
+            self._updated_at = now
+            self._tokens -= 1
+            wait = -self._tokens / self._rate if self._tokens < 0 else 0.0
+
+            if wait and timeout is not None and wait >= timeout:
+                self._tokens += 1
+                raise DeadlineExceededError()
+
+        if wait:
+            self._sleep(wait)
+
+        return wait
+
+
+class CircuitBreaker:
+    """
+    A thread-safe circuit breaker. It opens after a number of consecutive failures and then fails
+    fast until a reset timeout has passed, after which a single trial call is let through. The
+    circuit closes again if the trial succeeds and reopens if it fails.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, *, failure_threshold=5, reset_timeout=30, clock=monotonic):
+        """
+        Initializes a closed CircuitBreaker.
+
+        Args:
+            failure_threshold (int): The number of consecutive failures opening the circuit.
+                                     Defaults to 5.
+            reset_timeout (float): The number of seconds the circuit stays open before a trial
+                                   call. Defaults to 30.
+            clock (Callable[[], float]): The time source in seconds. Defaults to time.monotonic.
+        """
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._clock = clock
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._lock = Lock()
+
+    @property
+    def state(self):
+        """str: The current state, one of CLOSED, OPEN and HALF_OPEN."""
+        with self._lock:
+            return self.__state()
+
+    def before_call(self):
+        """
+        Checks if a call may pass, claiming the trial call if the circuit is half open.
+
+        Raises:
+            CircuitOpenError: If the circuit is open or the trial call is already in flight.
+        """
+        with self._lock:
+            state = self.__state()
+
+            if state == CircuitBreaker.CLOSED:
+                return
+
+            if state == CircuitBreaker.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return
+
+            retry_after = self._opened_at + self._reset_timeout - self._clock()
+            raise CircuitOpenError(max(0.0, retry_after))
+
+    def record_success(self):
+        """Records a successful call, closing the circuit."""
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def cancel_call(self):
+        """Records a call which wasn't made after all, releasing the trial call if claimed."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        """Records a failed call, opening the circuit at the threshold or after a failed trial."""
+        with self._lock:
+            self._failures += 1
+
+            if self._trial_in_flight or self._failures >= self._failure_threshold:
+                self._opened_at = self._clock()
+
+            self._trial_in_flight = False
+
+    def __state(self):
+        """
+        Determines the current state. Must be called holding the lock.
+
+        Returns:
+            str: The current state.
+        """
+        if self._opened_at is None:
+            return CircuitBreaker.CLOSED
+
+        if self._clock() - self._opened_at >= self._reset_timeout:
+            return CircuitBreaker.HALF_OPEN
+
+        return CircuitBreaker.OPEN
+
+
+def is_retryable(error):
+    """
+    Checks if a failed call may succeed when retried, which is the case for network errors and
+    errors flagged as retryable, e.g. rate limits and server errors, unless the deadline of the
+    request has passed.
+
+    Args:
+        error (Exception): The error raised by the call.
+
+    Returns:
+        bool: True if the call should be retried, otherwise False.
+    """
+    if isinstance(error, DeadlineExceededError):
+        return False
+
+    return isinstance(error, OSError) or getattr(error, "retryable", False)
+
+
+class RateController:
+    """
+    Controls the outbound calls to one upstream service. Every attempt takes a token from a
+    token bucket, retryable failures are retried with jittered exponential backoff honoring
+    Retry-After, and a circuit breaker fails fast while the service keeps failing.
+
+    Errors may provide a retry_after attribute in seconds or as Retry-After header value.
+    Errors which are not retryable, like a movie that is not found, neither open nor close the
+    circuit, so they can't hide failures interleaved with them.
+    Calls cut short by the deadline of the request count as failures, as the service is too slow,
+    and calls are neither attempted nor retried once the deadline would pass.
+    """
+
+    def __init__(self, *, rate, capacity, retries=2, backoff_base=0.5, max_backoff=30,
+                 failure_threshold=5, reset_timeout=30, clock=monotonic, sleep=sleep,
+                 random=random):
+        """
+        Initializes a RateController.
+
+        Args:
+            rate (float): The number of calls allowed per second.
+            capacity (float): The number of calls allowed in a burst.
+            retries (int): The number of retries of a failed call. Defaults to 2.
+            backoff_base (float): The maximum backoff in seconds before the first retry, doubled
+                                  for every further retry. Defaults to 0.5.
+            max_backoff (float): The maximum backoff in seconds. Calls asking to retry later than
+                                 that are not retried. Defaults to 30.
+            failure_threshold (int): The number of consecutive failures opening the circuit.
+                                     Defaults to 5.
+            reset_timeout (float): The number of seconds the circuit stays open. Defaults to 30.
+            clock (Callable[[], float]): The time source in seconds. Defaults to time.monotonic.
+            sleep (Callable[[float], None]): Waits for a number of seconds. Defaults to time.sleep.
+            random (Callable[[], float]): Returns a random number in [0, 1) for the jitter.
+                                          Defaults to random.random.
+        """
+        self._bucket = TokenBucket(rate=rate, capacity=capacity, clock=clock, sleep=sleep)
+        self._breaker = CircuitBreaker(failure_threshold=failure_threshold,
+                                       reset_timeout=reset_timeout, clock=clock)
+        self._retries = retries
+        self._backoff_base = backoff_base
+        self._max_backoff = max_backoff
+        self._sleep = sleep
+        self._random = random
+        self._lock = Lock()
+        self.calls = 0
+        self.retried = 0
+        self.rejected = 0
+
+    def call(self, call):
+        """
+        Executes a call to the upstream service under rate control.
+
+        Args:
+            call (Callable[[], object]): The call to execute.
+
+        Returns:
+            object: The result of the call.
+
+        Raises:
+            CircuitOpenError: If the circuit is open.
+            DeadlineExceededError: If the deadline of the request has passed.
+            Exception: The error of the last attempt if the call failed.
+        """
+        deadline = current_deadline()
+
+        for attempt in range(self._retries + 1):
+            if deadline is not None:
+                deadline.check()
+
+            try:
+                self._breaker.before_call()
+            except CircuitOpenError:
+                self.__count("rejected")
+                raise
+
+            try:
+                self._bucket.acquire(deadline.remaining() if deadline is not None else None)
+
+                if deadline is not None:
+                    deadline.check()
+            except DeadlineExceededError:
+                self._breaker.cancel_call()
+                raise
+
+            self.__count("calls")
+
+            try:
+                result = call()
+            except Exception as e:
+                if isinstance(e, DeadlineExceededError):
+                    self._breaker.record_failure()
+                    raise
+
+                if not is_retryable(e):
+                    self._breaker.cancel_call()
+                    raise
+
+                self._breaker.record_failure()
+                delay = self.__backoff(attempt, e)
+
+                if attempt == self._retries or delay is None:
+                    raise
+
+                if deadline is not None and delay >= deadline.remaining():
+                    raise
+
+                self.__count("retried")
+                self._sleep(delay)
+            else:
+                self._breaker.record_success()
+                return result
+
+    def stats(self):
+        """
+        Returns the call counters and the state of the circuit.
+
+        Returns:
+            dict: The number of attempted, retried and rejected calls and the circuit state.
+        """
+        with self._lock:
+            return {"calls": self.calls, "retried": self.retried, "rejected": self.rejected,
+                    "circuit": self._breaker.state}
+
+    def __backoff(self, attempt, error):
+        """
+        Determines the backoff before retrying a failed call, using full jitter on an
+        exponentially growing interval or the Retry-After of the error.
+
+        Args:
+            attempt (int): The number of the failed attempt, starting at 0.
+            error (Exception): The error raised by the call.
+
+        Returns:
+            float or None: The number of seconds to wait, or None if the call should not be
+                           retried because the service asks to wait longer than the maximum.
+        """
+        retry_after = retry_after_seconds(getattr(error, "retry_after", None))
+
+        if retry_after is not None:
+            return retry_after if retry_after <= self._max_backoff else None
+
+        return self._random() * min(self._max_backoff, self._backoff_base * 2 ** attempt)
+
+    def __count(self, counter):
+        """Increments a call counter."""
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
@@ -0,0 +1,101 @@
+from threading import Event, Lock
+from .deadline import DeadlineExceededError, current_deadline
+
+
+class Flight:
+    """An in-flight call whose outcome is shared by all callers with the same key."""
+
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        """Initializes a Flight which is not done yet."""
+        self.done = Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key across threads: the first caller executes the
+    call while later callers wait for it and receive the same result or exception. Once the call
+    has finished, the next call with that key executes again. Counts calls and coalesced calls.
+    Waiting callers give up once the deadline of their request has passed, and call again if
+    the call was cut short by the deadline of another request.
+    """
+
+    def __init__(self):
+        """Initializes a SingleFlight without calls in flight."""
+        self._flights = {}
+        self._lock = Lock()
+        self.calls = 0
+        self.coalesced = 0
+
+    def do(self, key, call):
+        """
+        Executes a call, or waits for the call with the same key which is already in flight.
+
+        Args:
+            key (Hashable): The key identifying equivalent calls.
+            call (Callable[[], object]): The call to execute.
+
+        Returns:
+            object: The result of the call, which is shared by all coalesced callers and must not
+                    be mutated.
+
+        Raises:
+            DeadlineExceededError: If the deadline of the request passes while waiting or calling.
+            Exception: Any exception raised by the call, raised to all coalesced callers.
+        """
+        deadline = current_deadline()
+
+        with self._lock:
+            self.calls += 1
+
+        waited = False
+
+        while True:
+            with self._lock:
+                flight = self._flights.get(key)
+
+                if flight is None:
+                    flight = self._flights[key] = Flight()
+                    break
+
+                if not waited:
+                    self.coalesced += 1  # Once per call, even if it waits for several leaders
+                    waited = True
+
+            if not flight.done.wait(None if deadline is None else deadline.remaining()):
+                raise DeadlineExceededError()
+
+            if isinstance(flight.error, DeadlineExceededError) \
+                    and (deadline is None or not deadline.expired):
+                continue  # Only the leader's request ran out of time, so call again
+
+            if flight.error is not None:
+                raise flight.error
+
+            return flight.result
+
+        try:
+            flight.result = call()
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+
+            flight.done.set()
+
+    def stats(self):
+        """
+        Returns the call counters and the number of calls in flight.
+
+        Returns:
+            dict: The number of calls, coalesced calls and calls in flight.
+        """
+        with self._lock:
+            return {"calls": self.calls, "coalesced": self.coalesced,
+                    "in_flight": len(self._flights)}
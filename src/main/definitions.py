@@ -6,3 +6,4 @@ ROOT_DIR = os.path.abspath(os.path.join(SOURCES_DIR, os.pardir))
 TEMPLATES_DIR = os.path.join(ROOT_DIR, "templates")
 STATIC_DIR = os.path.join(ROOT_DIR, "static")
 UPLOADS_DIR = os.path.join(STATIC_DIR, "uploads")
+DATA_DIR = os.path.join(ROOT_DIR, "data")
@@ -0,0 +1,26 @@
+class CoalescingGeminiClient:
+    """
+    A decorator for GeminiClient sharing one in-flight request between concurrent recommendation
+    requests for the same favourites, e.g. when a user double-clicks "Recommendations".
+    """
+
+    def __init__(self, *, client, single_flight):
+        """
+        Initializes a CoalescingGeminiClient.
+
+        Args:
+            client (GeminiClient): The client to delegate to.
+            single_flight (SingleFlight): The coalescing calls in flight, which must be shared
+                                          across requests to coalesce them.
+        """
+        self._client = client
+        self._single_flight = single_flight
+
+    def find_recommendations(self, favourite_titles, count=5):
+        """
+        Finds movie recommendations, sharing concurrent requests for the same favourites and
+        count regardless of the order of the favourites. See GeminiClient.find_recommendations.
+        """
+        key = ("recommendations", tuple(sorted(favourite_titles)), count)
+        return self._single_flight.do(
+            key, lambda: self._client.find_recommendations(favourite_titles, count))
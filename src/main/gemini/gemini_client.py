@@ -1,7 +1,12 @@
+from math import ceil
+from time import perf_counter
+from httpx import TimeoutException
 from google.genai import Client
-from google.genai.types import Content, Part, GenerateContentConfig, Schema, Type
-from google.genai.errors import ClientError
+from google.genai.types import Content, Part, GenerateContentConfig, HttpOptions, Schema, Type
+from google.genai.errors import ClientError, ServerError
+from .prompt_builder import PromptBuilder
 from .rate_limit_error import RateLimitError
+from .upstream_error import UpstreamError
 
 
 class GeminiClient:
@@ -9,40 +14,52 @@ class GeminiClient:
 
     model = "gemini-2.0-flash"
 
-    recommendation_restrictions = [
-        "Give me exactly 5 suggestions for movies based on the list of favourite movies.",
-        "Each suggestion should only contain the english movie title.",
-        "Only reference real and existing movies.",
-        "None of the movies from the favourites list should appear in the suggestions."
-    ]
-
-    def __init__(self, *, api_key):
+    def __init__(self, *, api_key, timeout=30, rate_controller=None, prompt_builder=None,
+                 metrics=None, current_deadline=None):
         """
         Initializes a GeminiClient object.
 
         Args:
             api_key (str): The API key for accessing the Gemini API.
+            timeout (float): The timeout of a request in seconds. Defaults to 30.
+            rate_controller (RateController): Limits the rate of requests and retries rate
+                                              limited or failed ones. Defaults to None.
+            prompt_builder (PromptBuilder): Builds the prompts. Defaults to a PromptBuilder with
+                                            the default settings.
+            metrics (PromptMetrics): Tracks the prompt size and latency of the requests.
+                                     Defaults to None.
+            current_deadline (Callable[[], Deadline or None]): Gets the deadline of the current
+                request, which the timeout is clipped to, see
+                concurrency.deadline.current_deadline. Defaults to None.
         """
         self._client = Client(api_key=api_key)
+        self._timeout = timeout
+        self._current_deadline = current_deadline
+        self._rate_controller = rate_controller
+        self._prompt_builder = prompt_builder or PromptBuilder()
+        self._metrics = metrics
 
-    def find_recommendations(self, favourite_titles):
+    def find_recommendations(self, favourite_titles, count=5):
         """
         Finds movie recommendations based on a list of favourite movie titles using the Gemini API.
 
         Args:
-            favourite_titles (list[str]): A list of the user's favourite movie titles.
+            favourite_titles (list[str]): A list of the user's favourite movie titles, which
+                                          should be capped by PromptBuilder.select_favourites.
+            count (int): The number of recommendations to ask for. Defaults to 5.
 
         Returns:
             list[str]: A list of recommended movie titles.
 
         Raises:
             RateLimitError: If the API rate limit is exceeded.
+            UpstreamError: If the API is failing, overloaded or times out.
+            CircuitOpenError: If the rate controller fails fast because the API is down.
+            DeadlineExceededError: If the deadline of the current request passes.
             PermissionError: If the API key is invalid or there are access issues.
             ClientError: For other errors encountered during the API call.
         """
-        favourite_list = "\n".join([f"- {title}" for title in favourite_titles])
-        restrictions = "\n".join(GeminiClient.recommendation_restrictions)
-        prompt = f"Favourite movies:\n{favourite_list}\n\n{restrictions}"
+        prompt = self._prompt_builder.build(favourite_titles, count)
 
         contents = [
             Content(role="user", parts=[Part.from_text(text=prompt)])
@@ -62,16 +79,69 @@ class GeminiClient:
             )
         )
 
-        try:
-            response = self._client.models.generate_content(
-                model=GeminiClient.model, contents=contents, config=content_config
-            )
-            return response.parsed.get("titles", [])
-        except ClientError as e:
-            if e.code == 429:
-                raise RateLimitError()
+        def generate():
+            deadline = self._current_deadline() if self._current_deadline else None
+            timeout = deadline.clip(self._timeout) if deadline is not None else self._timeout
+            http_options = HttpOptions(timeout=ceil(timeout * 1000))  # In milliseconds
+
+            try:
+                return self._client.models.generate_content(
+                    model=GeminiClient.model, contents=contents,
+                    config=content_config.model_copy(update={"http_options": http_options})
+                )
+            except TimeoutException as e:
+                if deadline is not None:
+                    deadline.check()
+
+                raise UpstreamError(str(e))
+            except ClientError as e:
+                if e.code == 429:
+                    raise RateLimitError(self.__retry_after(e))
+
+                if e.code == 400:
+                    raise PermissionError(e.message)
+
+                raise e
+            except ServerError as e:
+                raise UpstreamError(e.message)
+
+        started_at = perf_counter()
+
+        if self._rate_controller:
+            response = self._rate_controller.call(generate)
+        else:
+            response = generate()
+
+        if self._metrics:
+            usage = getattr(response, "usage_metadata", None)
+            self._metrics.record_request(len(prompt), perf_counter() - started_at,
+                                         getattr(usage, "prompt_token_count", None))
+
+        return response.parsed.get("titles", [])
+
+    def __retry_after(self, error):
+        """
+        Extracts how long to wait before retrying a rate limited request, from the Retry-After
+        header or the retry delay in the error details.
+
+        Args:
+            error (ClientError): The rate limit error of the Gemini API.
+
+        Returns:
+            str or None: The Retry-After header value or the retry delay in seconds, or None if
+                         the error doesn't tell.
+        """
+        headers = getattr(error.response, "headers", None)
+
+        if headers and headers.get("Retry-After"):
+            return headers.get("Retry-After")
+
+        details = error.details.get("error", {}) if isinstance(error.details, dict) else {}
+
+        for detail in details.get("details", []):
+            retry_delay = detail.get("retryDelay") if isinstance(detail, dict) else None
 
-            if e.code == 400:
-                raise PermissionError(e.message)
+            if retry_delay:
+                return retry_delay.rstrip("s")
 
-            raise e
+        return None
@@ -0,0 +1,138 @@
+from collections import Counter, defaultdict
+from math import floor
+
+
+class PromptBuilder:
+    """
+    Builds the recommendation prompts for the Gemini API. The favourites sent are capped to a
+    representative subset, so users with thousands of favourites don't cause huge, slow and
+    expensive prompts which eventually exceed the context window.
+
+    The subset is selected deterministically: the favourites with the highest personal ratings,
+    then the most recently added ones, and the remaining slots are sampled from every genre in
+    proportion to its share of the favourites.
+    """
+
+    recommendation_restrictions = [
+        "Give me exactly {count} suggestions for movies based on the list of favourite movies.",
+        "Each suggestion should only contain the english movie title.",
+        "Only reference real and existing movies.",
+        "None of the movies from the favourites list should appear in the suggestions."
+    ]
+
+    def __init__(self, *, max_favourites=50, rating_share=0.4, recent_share=0.2):
+        """
+        Initializes a PromptBuilder.
+
+        Args:
+            max_favourites (int): The maximum number of favourites sent. Defaults to 50.
+            rating_share (float): The share of the favourites selected by the highest personal
+                                  ratings. Defaults to 0.4.
+            recent_share (float): The share of the favourites selected by the most recent
+                                  additions. Defaults to 0.2.
+        """
+        self._max_favourites = max_favourites
+        self._rating_share = rating_share
+        self._recent_share = recent_share
+
+    def select_favourites(self, favourites):
+        """
+        Selects a representative subset of favourites to send, or all of them if they don't
+        exceed the maximum.
+
+        Args:
+            favourites (list[FavouriteSummary]): The user's favourites in the order they were
+                added, see SQLiteProjections.find_favourite_summaries.
+
+        Returns:
+            list[str]: The titles of the selected favourites.
+        """
+        if len(favourites) <= self._max_favourites:
+            return [favourite.title for favourite in favourites]
+
+        selected = {}
+        rated = sorted((favourite for favourite in favourites
+                        if favourite.personal_rating is not None),
+                       key=lambda favourite: (-favourite.personal_rating, favourite.id))
+
+        self.__take(rated, round(self._max_favourites * self._rating_share), selected)
+        self.__take(reversed(favourites), round(self._max_favourites * self._recent_share),
+                    selected)
+        self.__take_stratified(favourites, self._max_favourites - len(selected), selected)
+        return list(selected.values())
+
+    def build(self, favourite_titles, count=5):
+        """
+        Builds the prompt asking for recommendations based on favourite titles.
+
+        Args:
+            favourite_titles (list[str]): The titles of the favourites to send.
+            count (int): The number of recommendations to ask for. Defaults to 5.
+
+        Returns:
+            str: The prompt.
+        """
+        favourite_list = "\n".join([f"- {title}" for title in favourite_titles])
+        restrictions = "\n".join(PromptBuilder.recommendation_restrictions).format(count=count)
+        return f"Favourite movies:\n{favourite_list}\n\n{restrictions}"
+
+    def __take(self, candidates, quota, selected):
+        """
+        Selects the first candidates which are not selected yet.
+
+        Args:
+            candidates (Iterable[FavouriteSummary]): The candidates in order of preference.
+            quota (int): The number of candidates to select.
+            selected (dict[int, str]): The titles of the selected favourites keyed by movie ID,
+                                       which is extended.
+        """
+        for favourite in candidates:
+            if quota <= 0:
+                return
+
+            if favourite.id not in selected:
+                selected[favourite.id] = favourite.title
+                quota -= 1
+
+    def __take_stratified(self, favourites, quota, selected):
+        """
+        Selects favourites which are not selected yet from every genre in proportion to the
+        number of remaining favourites of the genre. Every favourite counts for its genre which
+        is rarest among all favourites, so niche genres are represented, and the favourites of a
+        genre are sampled evenly over the time they were added.
+
+        Args:
+            favourites (list[FavouriteSummary]): The favourites in the order they were added.
+            quota (int): The number of favourites to select.
+            selected (dict[int, str]): The titles of the selected favourites keyed by movie ID,
+                                       which is extended.
+        """
+        remaining = [favourite for favourite in favourites if favourite.id not in selected]
+        quota = min(quota, len(remaining))
+
+        if quota <= 0:
+            return
+
+        genre_counts = Counter(genre.name for favourite in favourites
+                               for genre in favourite.genres)
+        strata = defaultdict(list)
+
+        for favourite in remaining:
+            names = [genre.name for genre in favourite.genres]
+            strata[min(names, key=lambda name: (genre_counts[name], name)) if names else ""] \
+                .append(favourite)
+
+        shares = {name: quota * len(members) / len(remaining) for name, members in strata.items()}
+        quotas = {name: floor(share) for name, share in shares.items()}
+        by_remainder = sorted(shares, key=lambda name: (quotas[name] - shares[name], name))
+
+        for name in by_remainder[:quota - sum(quotas.values())]:
+            quotas[name] += 1
+
+        for name in sorted(strata):
+            members = strata[name]
+            count = min(quotas[name], len(members))
+
+            for i in range(count):
+                favourite = members[floor((i + 0.5) * len(members) / count)]
+                selected[favourite.id] = favourite.title
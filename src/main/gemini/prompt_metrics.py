@@ -0,0 +1,56 @@
+from threading import Lock
+
+
+class PromptMetrics:
+    """
+    Thread-safe metrics of the recommendation prompts sent to the Gemini API, tracking how many
+    favourites were sent, the size of the prompts and the latency of the requests.
+    """
+
+    def __init__(self):
+        """Initializes empty PromptMetrics."""
+        self._lock = Lock()
+        self._metrics = {}  # Name to count, total and maximum
+
+    def record_selection(self, favourites, sent_favourites):
+        """
+        Records the selection of the favourites sent in a prompt.
+
+        Args:
+            favourites (int): The number of favourites of the user.
+            sent_favourites (int): The number of favourites sent.
+        """
+        self.__record(favourites=favourites, sent_favourites=sent_favourites)
+
+    def record_request(self, prompt_chars, latency, prompt_tokens=None):
+        """
+        Records a successful request.
+
+        Args:
+            prompt_chars (int): The number of characters of the prompt.
+            latency (float): The duration of the request in seconds, including rate control.
+            prompt_tokens (int): The number of tokens of the prompt reported by the API, or None
+                                 if unknown. Defaults to None.
+        """
+        self.__record(prompt_chars=prompt_chars, latency=latency, prompt_tokens=prompt_tokens)
+
+    def stats(self):
+        """
+        Returns the metrics.
+
+        Returns:
+            dict: The count, mean and maximum of every recorded metric keyed by its name.
+        """
+        with self._lock:
+            return {name: {"count": count, "mean": total / count, "max": maximum}
+                    for name, (count, total, maximum) in self._metrics.items()}
+
+    def __record(self, **values):
+        """Adds values to their metrics, skipping unknown values."""
+        with self._lock:
+            for name, value in values.items():
+                if value is None:
+                    continue
+
+                count, total, maximum = self._metrics.get(name, (0, 0, value))
+                self._metrics[name] = (count + 1, total + value, max(maximum, value))
@@ -1,6 +1,16 @@
 class RateLimitError(Exception):
     """Custom exception raised when a rate limit is exceeded."""
 
-    def __init__(self):
-        """Initializes a RateLimitError with a default message."""
+    retryable = True
+
+    def __init__(self, retry_after=None):
+        """
+        Initializes a RateLimitError with a default message.
+
+        Args:
+            retry_after (float or str): The number of seconds to wait before retrying or the
+                                        value of a Retry-After header, if known.
+                                        Defaults to None.
+        """
         super().__init__("Rate limit exceeded")
+        self.retry_after = retry_after
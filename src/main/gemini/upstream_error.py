@@ -0,0 +1,16 @@
+class UpstreamError(RuntimeError):
+    """
+    Custom exception raised when the Gemini API is failing or overloaded, which may succeed when
+    retried later.
+    """
+
+    retryable = True
+
+    def __init__(self, message):
+        """
+        Initializes an UpstreamError.
+
+        Args:
+            message (str): The error message of the Gemini API.
+        """
+        super().__init__(message)
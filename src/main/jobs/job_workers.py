@@ -0,0 +1,132 @@
+from threading import Event, Thread
+
+
+class PermanentJobError(Exception):
+    """Custom exception raised by job handlers if retrying a job can't make it succeed."""
+
+
+class JobWorkers:
+    """
+    A pool of worker threads running the jobs of a job queue. Failed jobs are retried with
+    exponential backoff until they run out of attempts, unless they fail permanently.
+    """
+
+    def __init__(self, *, queue, handlers, context, threads=2, poll_interval=5, max_attempts=5,
+                 backoff_base=2, logger=None):
+        """
+        Initializes JobWorkers without starting them.
+
+        Args:
+            queue (SQLiteJobQueue): The queue to take the jobs from.
+            handlers (dict[str, Callable[[dict], None]]): The handlers running the payload of a
+                                                          job, keyed by the kind of job.
+            context (Callable[[], ContextManager]): Creates the context every job runs in, e.g.
+                                                    Flask.app_context.
+            threads (int): The number of worker threads. Defaults to 2.
+            poll_interval (float): The maximum number of seconds an idle worker waits before
+                                   looking for due jobs again. Defaults to 5.
+            max_attempts (int): The number of attempts before a job finally fails. Defaults to 5.
+            backoff_base (float): The delay in seconds before the first retry, doubled for every
+                                  further retry. Defaults to 2.
+            logger (logging.Logger): The logger for failed jobs. Defaults to None.
+        """
+        self._queue = queue
+        self._handlers = handlers
+        self._context = context
+        self._threads = threads
+        self._poll_interval = poll_interval
+        self._max_attempts = max_attempts
+        self._backoff_base = backoff_base
+        self._logger = logger
+        self._wake_up = Event()
+        self._stopped = Event()
+        self._workers = []
+
+    def start(self):
+        """Resumes jobs interrupted by a previous shutdown and starts the worker threads."""
+        with self._context():
+            self._queue.resume_interrupted()
+
+        self._stopped.clear()
+        self._workers = [Thread(target=self.__work, name=f"job-worker-{i}", daemon=True)
+                         for i in range(self._threads)]
+
+        for worker in self._workers:
+            worker.start()
+
+    def stop(self, timeout=None):
+        """
+        Stops the worker threads after their current job.
+
+        Args:
+            timeout (float): The maximum number of seconds to wait for each worker.
+                             Defaults to None.
+        """
+        self._stopped.set()
+        self._wake_up.set()
+
+        for worker in self._workers:
+            worker.join(timeout)
+
+    def wake_up(self):
+        """Wakes up idle workers, e.g. after a job has been enqueued."""
+        self._wake_up.set()
+
+    def run_next(self):
+        """
+        Claims and runs the next due job.
+
+        Returns:
+            bool: True if a job was run, False if no job was due.
+        """
+        with self._context():
+            job = self._queue.claim()
+
+            if job is None:
+                return False
+
+            try:
+                handler = self._handlers.get(job.kind)
+
+                if handler is None:
+                    raise PermanentJobError(f"No handler for jobs of kind '{job.kind}'")
+
+                handler(job.payload)
+            except Exception as e:
+                self.__handle_failure(job, e)
+            else:
+                self._queue.complete(job.id)
+
+            return True
+
+    def __work(self):
+        """Runs due jobs until the workers are stopped, waiting while there are none."""
+        while not self._stopped.is_set():
+            try:
+                if self.run_next():
+                    continue
+            except Exception as e:
+                if self._logger:
+                    self._logger.error(e)
+
+            self._wake_up.wait(self._poll_interval)
+            self._wake_up.clear()
+
+    def __handle_failure(self, job, error):
+        """
+        Retries a failed job with exponential backoff, or fails it if it failed permanently or
+        ran out of attempts.
+
+        Args:
+            job (Job): The failed job.
+            error (Exception): The error raised by the handler.
+        """
+        message = f"{type(error).__name__}: {error}"
+
+        if self._logger:
+            self._logger.warning(f"Job {job.id} ({job.kind}) failed: {message}")
+
+        if isinstance(error, PermanentJobError) or job.attempts >= self._max_attempts:
+            self._queue.fail(job.id, message)
+        else:
+            self._queue.retry(job.id, message, self._backoff_base * 2 ** (job.attempts - 1))
@@ -0,0 +1,47 @@
+from flask import current_app as app
+from repository.caching_repository import repo
+from .job_workers import PermanentJobError
+
+ADD_USER_MOVIE = "add_user_movie"
+
+
+def add_user_movie(payload):
+    """
+    Adds a movie to a user's favourites, fetching its details from OMDB and adding it to the
+    database first if it isn't stored yet.
+
+    Args:
+        payload (dict): The ID of the user as "user_id" and the title of the movie as "title".
+
+    Raises:
+        PermanentJobError: If the user or movie doesn't exist or the OMDB API key is invalid.
+        Exception: Any other error, after which the job is retried.
+    """
+    user_id = payload.get("user_id")
+    title = payload.get("title")
+
+    if not repo.has_user(user_id):
+        raise PermanentJobError(f"User with ID {user_id} not found")
+
+    movie = repo.find_movie_by_title(title)
+
+    if movie is None:
+        try:
+            details = app.extensions["omdb_client"].find_movie_by_title(title)
+        except (ValueError, PermissionError) as e:
+            raise PermanentJobError(str(e))
+
+        movie = repo.add_movie(
+            details.get("title"),
+            details.get("release_year"),
+            details.get("rating"),
+            details.get("poster_url"),
+            details.get("imdb_id"),
+            details.get("genres"),
+            details.get("directors"),
+            details.get("writers"),
+            details.get("actors")
+        )
+
+    if not repo.has_user_movie(user_id, movie.id):
+        repo.add_user_movie(user_id, movie.id)
@@ -0,0 +1,15 @@
+from flask.cli import FlaskGroup
+from app.app import create_app
+from app.config import Config
+
+
+class CommandConfig(Config):
+    """Configuration for running commands next to the web application."""
+
+    JOB_WORKERS = 0  # Jobs are run by the web application, which must not have them resumed
+
+
+cli = FlaskGroup(create_app=lambda: create_app(CommandConfig))
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,88 @@
+import re
+
+
+def normalize_title(title):
+    """
+    Normalizes a title to a lookup key by case folding and collapsing whitespace.
+
+    Args:
+        title (str): The title to normalize.
+
+    Returns:
+        str: The normalized title.
+    """
+    return re.sub(r"\s+", " ", title).strip().casefold()
+
+
+class CachingOmdbClient:
+    """
+    A caching decorator for OmdbClient, answering repeated lookups from an OmdbCache instead of
+    calling the OMDB API. Movies which were not found are cached as well, errors are not.
+    """
+
+    def __init__(self, *, client, cache):
+        """
+        Initializes a CachingOmdbClient.
+
+        Args:
+            client (OmdbClient): The client to delegate cache misses to.
+            cache (OmdbCache): The cache storing the responses.
+        """
+        self._client = client
+        self._cache = cache
+
+    def find_movie_by_title(self, title):
+        """
+        Finds detailed movie information by title, served from the cache if possible.
+        See OmdbClient.find_movie_by_title.
+        """
+        return self.__cached("movie", title, self._client.find_movie_by_title)
+
+    def search_movies(self, title):
+        """
+        Searches for movies by title, served from the cache if possible.
+        See OmdbClient.search_movies.
+        """
+        return self.__cached("search", title, self._client.search_movies)
+
+    def stats(self):
+        """Returns the statistics of the cache, see OmdbCache.stats."""
+        return self._cache.stats()
+
+    def close(self):
+        """Closes the client and the cache."""
+        self._client.close()
+        self._cache.close()
+
+    def __cached(self, kind, title, fetch):
+        """
+        Gets a response from the cache, fetching and caching it on a miss.
+
+        Args:
+            kind (str): The kind of query, e.g. "movie" or "search".
+            title (str): The title to query.
+            fetch (Callable[[str], dict]): Fetches the response from the OMDB API on a miss.
+
+        Returns:
+            dict: The response.
+
+        Raises:
+            ValueError: If the movie is not found, also when served from the cache.
+        """
+        key = normalize_title(title)
+        cached, response = self._cache.get(kind, key)
+
+        if cached:
+            if response is None:
+                raise ValueError(f"Movie with title '{title}' not found")
+
+            return response
+
+        try:
+            response = fetch(title)
+        except ValueError:
+            self._cache.set(kind, key, None)
+            raise
+
+        self._cache.set(kind, key, response)
+        return response
@@ -0,0 +1,51 @@
+from .caching_omdb_client import normalize_title
+
+
+class CoalescingOmdbClient:
+    """
+    A decorator for OmdbClient or CachingOmdbClient sharing one in-flight request between
+    concurrent lookups of the same normalized title, so e.g. many users typing the same popular
+    title only cause a single request to the OMDB API.
+    """
+
+    def __init__(self, *, client, single_flight):
+        """
+        Initializes a CoalescingOmdbClient.
+
+        Args:
+            client (OmdbClient or CachingOmdbClient): The client to delegate to.
+            single_flight (SingleFlight): The coalescing calls in flight.
+        """
+        self._client = client
+        self._single_flight = single_flight
+
+    def find_movie_by_title(self, title):
+        """
+        Finds detailed movie information by title, sharing concurrent identical lookups.
+        See OmdbClient.find_movie_by_title.
+        """
+        return self._single_flight.do(("movie", normalize_title(title)),
+                                      lambda: self._client.find_movie_by_title(title))
+
+    def search_movies(self, title):
+        """
+        Searches for movies by title, sharing concurrent identical searches.
+        See OmdbClient.search_movies.
+        """
+        return self._single_flight.do(("search", normalize_title(title)),
+                                      lambda: self._client.search_movies(title))
+
+    def stats(self):
+        """
+        Returns the statistics of the coalescing and, if available, of the delegate.
+
+        Returns:
+            dict: The statistics of the delegate, see CachingOmdbClient.stats, together with the
+                  coalescing counters under "coalescing", see SingleFlight.stats.
+        """
+        stats = self._client.stats() if hasattr(self._client, "stats") else {}
+        return {**stats, "coalescing": self._single_flight.stats()}
+
+    def close(self):
+        """Closes the delegate client."""
+        self._client.close()
@@ -0,0 +1,178 @@
+import json
+import sqlite3
+from threading import Lock
+from time import time
+
+DAY = 24 * 60 * 60
+
+DEFAULT_TTLS = {
+    "movie": 7 * DAY,
+    "search": DAY,
+    "not_found": DAY / 4,
+}
+
+
+class OmdbCache:
+    """
+    A persistent cache of OMDB responses stored in a SQLite file. Entries are keyed by the kind
+    of query and a key, expire after a time to live per kind and the least recently used ones are
+    evicted once the stored responses exceed a size limit. Misses of the OMDB API ("not found")
+    are cached as well. The size of the stored responses is kept as running total, so caching a
+    response only prunes the cache once the limit is exceeded.
+    """
+
+    def __init__(self, path, *, ttls=None, max_bytes=50 * 1024 * 1024, clock=time):
+        """
+        Initializes an OmdbCache, creating the cache file if it does not exist yet.
+
+        Args:
+            path (str): The path of the SQLite cache file, or ":memory:" for a transient cache.
+            ttls (dict[str, float]): The time to live in seconds per kind of query, with the key
+                                     "not_found" for cached misses. Defaults to DEFAULT_TTLS.
+            max_bytes (int): The maximum size of all stored responses in bytes.
+                             Defaults to 50MB.
+            clock (Callable[[], float]): The time source in seconds. Defaults to time.time.
+        """
+        self._ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self._max_bytes = max_bytes
+        self._clock = clock
+        self._lock = Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode = WAL")
+        self._connection.execute("PRAGMA synchronous = NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "kind TEXT NOT NULL, key TEXT NOT NULL, value TEXT, size INTEGER NOT NULL, "
+            "expires_at REAL NOT NULL, accessed_at REAL NOT NULL, PRIMARY KEY (kind, key))"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS ix_responses_accessed_at ON responses (accessed_at)"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS ix_responses_expires_at ON responses (expires_at)"
+        )
+        self._size = self.__stored_size()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, kind, key):
+        """
+        Gets a cached response and marks it as recently used.
+
+        Args:
+            kind (str): The kind of query, e.g. "movie" or "search".
+            key (str): The normalized key of the query.
+
+        Returns:
+            tuple[bool, dict or None]: Whether the response is cached and the cached response,
+                                       which is None for a cached "not found".
+        """
+        now = self._clock()
+
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value FROM responses WHERE kind = ? AND key = ? AND expires_at > ?",
+                (kind, key, now)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return False, None
+
+            self._connection.execute(
+                "UPDATE responses SET accessed_at = ? WHERE kind = ? AND key = ?",
+                (now, kind, key)
+            )
+            self.hits += 1
+
+        return True, None if row[0] is None else json.loads(row[0])
+
+    def set(self, kind, key, value):
+        """
+        Caches a response, evicting the least recently used responses if the size limit is
+        exceeded.
+
+        Args:
+            kind (str): The kind of query, e.g. "movie" or "search".
+            key (str): The normalized key of the query.
+            value (dict or None): The response to cache, or None to cache a "not found".
+        """
+        now = self._clock()
+        ttl = self._ttls["not_found" if value is None else kind]
+        serialized = None if value is None else json.dumps(value)
+        size = len(key.encode()) + (len(serialized.encode()) if serialized else 0)
+
+        with self._lock:
+            replaced = self._connection.execute(
+                "SELECT size FROM responses WHERE kind = ? AND key = ?", (kind, key)
+            ).fetchone()
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(kind, key, value, size, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (kind, key, serialized, size, now + ttl, now)
+            )
+            self._size += size - (replaced[0] if replaced else 0)
+
+            if self._size > self._max_bytes:
+                self.__evict(now)
+
+    def stats(self):
+        """
+        Returns the hit and miss counters, the hit ratio and the size of the cache.
+
+        Returns:
+            dict: The number of hits and misses, the hit ratio, the number of entries and the
+                  size of the stored responses in bytes.
+        """
+        with self._lock:
+            entries = self._connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            lookups = self.hits + self.misses
+
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else None,
+                "entries": entries,
+                "bytes": self._size,
+            }
+
+    def close(self):
+        """Closes the cache file."""
+        self._connection.close()
+
+    def __evict(self, now):
+        """
+        Removes expired responses and, while the size limit is exceeded, the least recently used
+        ones. Must be called holding the lock.
+
+        Args:
+            now (float): The current time.
+        """
+        expired_size = self._connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses WHERE expires_at <= ?", (now,)
+        ).fetchone()[0]
+        self._connection.execute("DELETE FROM responses WHERE expires_at <= ?", (now,))
+        self._size -= expired_size
+
+        if self._size <= self._max_bytes:
+            return
+
+        self._connection.execute(
+            "DELETE FROM responses WHERE rowid IN (SELECT rowid FROM ("
+            "SELECT rowid, SUM(size) OVER (ORDER BY accessed_at DESC, rowid DESC) AS retained "
+            "FROM responses) WHERE retained > ?)",
+            (self._max_bytes,)
+        )
+        self._size = self.__stored_size()
+
+    def __stored_size(self):
+        """
+        Sums up the size of the stored responses. Must be called holding the lock, unless during
+        initialization.
+
+        Returns:
+            int: The size of the stored responses in bytes.
+        """
+        return self._connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()[0]
@@ -1,4 +1,7 @@
-import requests
+from requests import RequestException, Session
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from .upstream_error import UpstreamError
 
 OMDB_API = "https://www.omdbapi.com"
 
@@ -8,14 +11,46 @@ class OmdbClient:
     A client for interacting with the OMDB API to retrieve movie information.
     """
 
-    def __init__(self, *, api_key):
+    def __init__(self, *, api_key, base_url=OMDB_API, timeout=(3.05, 10), pool_size=10,
+                 retries=2, rate_controller=None, current_deadline=None):
         """
-        Initializes an OmdbClient object.
+        Initializes an OmdbClient object. The client keeps a pooled keep-alive HTTP session and
+        is meant to be shared, e.g. as one instance per application.
 
         Args:
             api_key (str): The API key for accessing the OMDB API.
+            base_url (str): The base URL of the OMDB API. Defaults to OMDB_API.
+            timeout (tuple[float, float]): The connect and read timeouts in seconds.
+                                           Defaults to (3.05, 10).
+            pool_size (int): The maximum number of pooled connections. Defaults to 10.
+            retries (int): The number of retries on connection errors and 5xx responses, with
+                           exponential backoff, if no rate controller is given. Defaults to 2.
+            rate_controller (RateController): Limits the rate of requests and retries them,
+                                              replacing the retries of the connection pool.
+                                              Defaults to None.
+            current_deadline (Callable[[], Deadline or None]): Gets the deadline of the current
+                request, which the timeouts are clipped to, see
+                concurrency.deadline.current_deadline. Only the rate controller stops retrying
+                at the deadline, not the connection pool. Defaults to None.
         """
         self._api_key = api_key
+        self._base_url = base_url
+        self._timeout = timeout
+        self._rate_controller = rate_controller
+        self._current_deadline = current_deadline
+        self._session = Session()
+
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=pool_size,
+            max_retries=0 if rate_controller else Retry(total=retries,
+                                                         backoff_factor=0.3,
+                                                         status_forcelist=(500, 502, 503, 504),
+                                                         allowed_methods=("GET",),
+                                                         raise_on_status=False)
+        )
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
 
     def find_movie_by_title(self, title):
         """
@@ -31,10 +66,13 @@ class OmdbClient:
         Raises:
             PermissionError: If the API key is invalid.
             RuntimeError: If an unexpected error occurs during the API request.
+            UpstreamError: If the API keeps rate limiting or failing.
+            CircuitOpenError: If the rate controller fails fast because the API is down.
+            DeadlineExceededError: If the deadline of the current request passes.
+            requests.RequestException: If the API can't be reached or times out.
             ValueError: If the movie is not found.
         """
-        url = f"{OMDB_API}?apikey={self._api_key}&type=movie&t={title}"
-        response = requests.get(url)
+        response = self.__get(t=title)
 
         if response.status_code == 401:
             raise PermissionError("Invalid API-KEY")
@@ -74,10 +112,13 @@ class OmdbClient:
         Raises:
             PermissionError: If the API key is invalid.
             RuntimeError: If an unexpected error occurs during the API request.
+            UpstreamError: If the API keeps rate limiting or failing.
+            CircuitOpenError: If the rate controller fails fast because the API is down.
+            DeadlineExceededError: If the deadline of the current request passes.
+            requests.RequestException: If the API can't be reached or times out.
             ValueError: If no movies are found for the given title or too many are found.
         """
-        url = f"{OMDB_API}?apikey={self._api_key}&type=movie&s={title}"
-        response = requests.get(url)
+        response = self.__get(s=title)
 
         if response.status_code == 401:
             raise PermissionError("Invalid API-KEY")
@@ -104,6 +145,62 @@ class OmdbClient:
             }) for result in results]
         }
 
+    def close(self):
+        """Closes the pooled connections of the client."""
+        self._session.close()
+
+    def __get(self, **params):
+        """
+        Sends a GET request for movies to the OMDB API using the pooled session, under the
+        control of the rate controller if there is one.
+
+        Args:
+            **params: The query parameters in addition to the API key and type.
+
+        Returns:
+            requests.Response: The response of the OMDB API.
+
+        Raises:
+            UpstreamError: If the API responds with a rate limit or server error.
+        """
+        if self._rate_controller:
+            return self._rate_controller.call(lambda: self.__send(params))
+
+        return self.__send(params)
+
+    def __send(self, params):
+        """
+        Sends a single GET request for movies to the OMDB API.
+
+        Args:
+            params (dict): The query parameters in addition to the API key and type.
+
+        Returns:
+            requests.Response: The response of the OMDB API.
+
+        Raises:
+            UpstreamError: If the API responds with a rate limit or server error.
+            DeadlineExceededError: If the deadline of the current request passes.
+        """
+        deadline = self._current_deadline() if self._current_deadline else None
+        timeout = deadline.clip(self._timeout) if deadline is not None else self._timeout
+
+        try:
+            response = self._session.get(self._base_url,
+                                         params={"apikey": self._api_key, "type": "movie",
+                                                 **params},
+                                         timeout=timeout)
+        except RequestException:
+            if deadline is not None:
+                deadline.check()
+
+            raise
+
+        if response.status_code == 429 or response.status_code >= 500:
+            raise UpstreamError(response.status_code, response.headers.get("Retry-After"))
+
+        return response
+
     def __sanitize_dict(self, dict):
         """
         Sanitizes string values within a dictionary by stripping leading/trailing whitespace
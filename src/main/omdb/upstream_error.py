@@ -0,0 +1,19 @@
+class UpstreamError(RuntimeError):
+    """
+    Custom exception raised when the OMDB API is rate limiting or failing, which may succeed when
+    retried later.
+    """
+
+    retryable = True
+
+    def __init__(self, status_code, retry_after=None):
+        """
+        Initializes an UpstreamError.
+
+        Args:
+            status_code (int): The HTTP status code of the response.
+            retry_after (str): The Retry-After header of the response, if any. Defaults to None.
+        """
+        super().__init__(f"Unexpected error durnig movie fetching with code {status_code}")
+        self.status_code = status_code
+        self.retry_after = retry_after
@@ -0,0 +1,91 @@
+from flask import current_app as app
+from repository.sqlite_projections import projections
+from repository.sqlite_recommendation_cache import recommendation_cache
+from gemini.gemini_client import GeminiClient
+from gemini.coalescing_gemini_client import CoalescingGeminiClient
+from omdb.caching_omdb_client import normalize_title
+from concurrency.deadline import current_deadline
+from environment import gemini_api_key
+
+
+def recommend_with_gemini(user_id, fingerprint):
+    """
+    Recommends movies to a user with Gemini, resolves them to movie details and caches them.
+    Movies which aren't resolved before the deadline of the request or whose OMDB lookup failed
+    are left out and the partial recommendations aren't cached.
+
+    Args:
+        user_id (int): The ID of the user.
+        fingerprint (str): The fingerprint of the user's current favourites.
+
+    Returns:
+        list[dict]: The details of the recommended movies, shaped like the movies returned by
+                    OmdbClient.find_movie_by_title.
+
+    Raises:
+        RateLimitError: If the Gemini API rate limit is still exceeded after retrying.
+        CircuitOpenError: If the Gemini or OMDB API is down.
+        DeadlineExceededError: If the deadline of the request passes before Gemini answers.
+        PermissionError: If the Gemini or OMDB API key is invalid.
+        RuntimeError: If an unexpected error occurs during a request.
+        requests.RequestException: If the OMDB API can't be reached for any recommended movie.
+    """
+    recommendations = find_gemini_recommendations(user_id)
+    movies, partial = app.extensions["recommendation_resolver"].resolve(recommendations)
+
+    if not partial:
+        recommendation_cache.set(user_id, fingerprint, movies)
+
+    return movies
+
+
+def find_gemini_recommendations(user_id):
+    """
+    Finds the recommended titles of a user with Gemini. Only a representative subset of the
+    favourites is sent, so favourites Gemini suggests although they weren't in the prompt are
+    filtered out here.
+
+    Args:
+        user_id (int): The ID of the user.
+
+    Returns:
+        list[str]: The recommended titles, excluding the user's favourites.
+
+    Raises:
+        RateLimitError: If the Gemini API rate limit is still exceeded after retrying.
+        CircuitOpenError: If the Gemini API is down.
+        DeadlineExceededError: If the deadline of the request passes before Gemini answers.
+        PermissionError: If the Gemini API key is invalid.
+    """
+    count = app.config.get("RECOMMENDATIONS_COUNT")
+    favourites = projections.find_favourite_summaries(user_id)
+    selected_titles = app.extensions["gemini_prompt_builder"].select_favourites(favourites)
+    app.extensions["gemini_prompt_metrics"].record_selection(len(favourites), len(selected_titles))
+
+    if len(selected_titles) < len(favourites):
+        count += app.config.get("GEMINI_OVERFETCH")
+
+    recommendations = __create_gemini_client().find_recommendations(selected_titles, count)
+    owned_titles = {normalize_title(favourite.title) for favourite in favourites}
+    recommendations = [title for title in recommendations
+                       if normalize_title(title) not in owned_titles]
+    return recommendations[:app.config.get("RECOMMENDATIONS_COUNT")]
+
+
+def __create_gemini_client():
+    """
+    Helper function to create a Gemini client sharing the rate controller, the prompt builder,
+    the prompt metrics and the coalescing of concurrent identical requests of the application.
+
+    Returns:
+        CoalescingGeminiClient: The Gemini client.
+    """
+    return CoalescingGeminiClient(
+        client=GeminiClient(api_key=gemini_api_key(),
+                            timeout=app.config.get("GEMINI_TIMEOUT"),
+                            rate_controller=app.extensions["rate_controllers"].get("gemini"),
+                            prompt_builder=app.extensions["gemini_prompt_builder"],
+                            metrics=app.extensions["gemini_prompt_metrics"],
+                            current_deadline=current_deadline),
+        single_flight=app.extensions["gemini_single_flight"]
+    )
@@ -0,0 +1,324 @@
+from collections import defaultdict
+from heapq import nlargest
+from math import sqrt
+from operator import itemgetter
+from threading import RLock
+from time import monotonic
+
+DEFAULT_WEIGHTS = {
+    "co_favourites": 0.5,  # Item-item cosine similarity of movies favoured by the same users
+    "genres": 0.2,  # Cosine similarity of the genre bitmasks
+    "crew": 0.3,  # Shared directors, writers and actors
+}
+
+ROLE_WEIGHTS = {"director": 1.0, "writer": 0.6, "actor": 0.3}
+
+UNRATED_WEIGHT = 0.7  # Weight of favourites without personal rating, like a rating of 7
+
+
+class LocalRecommender:
+    """
+    Recommends movies from the local database without calling an external service. Favourites
+    are scored by a blend of item-item collaborative filtering over co-favourites and content
+    similarity over genres and crew members.
+
+    The model is kept in sparse dictionaries: the user x movie matrix weighted by personal
+    ratings in both directions, the most similar co-favourites per movie computed on first use,
+    genre bitmasks grouped by mask and an inverted crew index. A query only touches the
+    neighbourhood of the user's favourites and the distinct genre masks. The favourites of the
+    requesting user are refreshed incrementally on every query, while the whole model is
+    rebuilt once it is older than its maximum age.
+    """
+
+    def __init__(self, *, load_favourites, load_features, weights=None, max_age=600,
+                 max_neighbours=100, clock=monotonic):
+        """
+        Initializes a LocalRecommender without building the model yet.
+
+        Args:
+            load_favourites (Callable[[int or None], list[tuple]]): Loads the user IDs, movie IDs
+                and personal ratings of the favourites of a user or, given None, of all users,
+                see SQLiteProjections.find_favourite_ratings.
+            load_features (Callable[[list[int] or None], tuple[list[tuple], list[tuple]]]): Loads
+                the genres and crew members of movies or, given None, of all movies, see
+                SQLiteProjections.find_movie_features.
+            weights (dict[str, float]): The weights of the similarity measures, see
+                                        DEFAULT_WEIGHTS. Defaults to DEFAULT_WEIGHTS.
+            max_age (float): The number of seconds after which the model is rebuilt.
+                             Defaults to 600.
+            max_neighbours (int): The number of most similar co-favourites kept per movie.
+                                  Defaults to 100.
+            clock (Callable[[], float]): The time source in seconds. Defaults to time.monotonic.
+        """
+        self._load_favourites = load_favourites
+        self._load_features = load_features
+        self._weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+        self._max_age = max_age
+        self._max_neighbours = max_neighbours
+        self._clock = clock
+        self._lock = RLock()
+        self._built_at = None
+        self.__reset()
+
+    def recommend(self, user_id, k=5):
+        """
+        Recommends movies a user hasn't favoured yet, refreshing the model if needed.
+
+        Args:
+            user_id (int): The ID of the user.
+            k (int): The maximum number of recommendations. Defaults to 5.
+
+        Returns:
+            list[int]: The IDs of the recommended movies, best first.
+        """
+        with self._lock:
+            if self._built_at is None or self._clock() - self._built_at >= self._max_age:
+                self.rebuild()
+            else:
+                self.refresh_user(user_id)
+
+            favourites = self._user_movies.get(user_id, {})
+
+            if not favourites:
+                return []
+
+            scores = defaultdict(float)
+            self.__score_co_favourites(favourites, scores)
+            self.__score_crew(favourites, scores)
+            mask_scores = self.__score_genre_masks(favourites)
+
+            for movie_id in scores:
+                scores[movie_id] += mask_scores.get(self._genre_masks.get(movie_id, 0), 0.0)
+
+            self.__add_genre_candidates(mask_scores, favourites, scores, k)
+
+            candidates = ((movie_id, score) for movie_id, score in scores.items()
+                          if movie_id not in favourites and score > 0)
+            best = nlargest(k, candidates, key=lambda candidate: (candidate[1], -candidate[0]))
+            return [movie_id for movie_id, _ in best]
+
+    def rebuild(self):
+        """Rebuilds the whole model from the database."""
+        with self._lock:
+            self.__reset()
+
+            for user_id, movie_id, rating in self._load_favourites(None):
+                self.__add_favourite(user_id, movie_id, self.__weight(rating))
+
+            self.__add_features(*self._load_features(None))
+            self._built_at = self._clock()
+
+    def refresh_user(self, user_id):
+        """
+        Incrementally refreshes the favourites of a user from the database, loading the features
+        of movies which are new to the model.
+
+        Args:
+            user_id (int): The ID of the user.
+        """
+        with self._lock:
+            weights = {movie_id: self.__weight(rating)
+                       for _, movie_id, rating in self._load_favourites(user_id)}
+            old_weights = dict(self._user_movies.get(user_id, {}))
+
+            for movie_id, weight in old_weights.items():
+                if weights.get(movie_id) != weight:
+                    self.__remove_favourite(user_id, movie_id)
+
+            for movie_id, weight in weights.items():
+                if old_weights.get(movie_id) != weight:
+                    self.__add_favourite(user_id, movie_id, weight)
+
+            new_movie_ids = [movie_id for movie_id in weights
+                             if movie_id not in self._featured_movies]
+
+            if new_movie_ids:
+                self.__add_features(*self._load_features(new_movie_ids))
+                self._featured_movies.update(new_movie_ids)
+
+    def __reset(self):
+        """Empties the model."""
+        self._user_movies = {}
+        self._movie_users = {}
+        self._movie_norms = defaultdict(float)  # Squared norms of the movie columns
+        self._neighbours = {}
+        self._genre_bits = {}
+        self._genre_masks = defaultdict(int)
+        self._movies_by_mask = defaultdict(set)
+        self._movie_crew = defaultdict(dict)
+        self._crew_movies = defaultdict(dict)
+        self._featured_movies = set()
+
+    def __weight(self, rating):
+        """Converts a personal rating from 0 to 10 to the weight of a favourite."""
+        return UNRATED_WEIGHT if rating is None else max(0.1, min(rating, 10) / 10)
+
+    def __add_favourite(self, user_id, movie_id, weight):
+        """Adds a favourite to the user x movie matrix, invalidating the affected neighbours."""
+        self._user_movies.setdefault(user_id, {})[movie_id] = weight
+        self._movie_users.setdefault(movie_id, {})[user_id] = weight
+        self._movie_norms[movie_id] += weight ** 2
+        self.__invalidate_neighbours(user_id, movie_id)
+
+    def __remove_favourite(self, user_id, movie_id):
+        """Removes a favourite from the user x movie matrix, invalidating affected neighbours."""
+        weight = self._user_movies[user_id].pop(movie_id)
+        self._movie_users[movie_id].pop(user_id)
+        self._movie_norms[movie_id] -= weight ** 2
+        self.__invalidate_neighbours(user_id, movie_id)
+
+    def __invalidate_neighbours(self, user_id, movie_id):
+        """
+        Drops the co-favourites of a movie, of the other favourites of its user and of every
+        movie co-favoured with it, whose similarities depend on the norm of the movie.
+        """
+        self._neighbours.pop(movie_id, None)
+
+        for other_id in self._user_movies[user_id]:
+            self._neighbours.pop(other_id, None)
+
+        for other_user_id in self._movie_users[movie_id]:
+            for other_id in self._user_movies[other_user_id]:
+                self._neighbours.pop(other_id, None)
+
+    def __neighbours(self, movie_id):
+        """
+        Gets the most similar co-favourites of a movie by cosine similarity, computing them on
+        first use.
+
+        Args:
+            movie_id (int): The ID of the movie.
+
+        Returns:
+            dict[int, float]: The similarities keyed by the IDs of the most similar movies.
+        """
+        neighbours = self._neighbours.get(movie_id)
+
+        if neighbours is None:
+            dots = defaultdict(float)
+
+            for user_id, user_weight in self._movie_users.get(movie_id, {}).items():
+                for other_id, other_weight in self._user_movies[user_id].items():
+                    dots[other_id] += user_weight * other_weight
+
+            dots.pop(movie_id, None)
+            norm = sqrt(self._movie_norms[movie_id])
+            similarities = ((other_id, dot / (norm * sqrt(self._movie_norms[other_id])))
+                            for other_id, dot in dots.items())
+            neighbours = dict(nlargest(self._max_neighbours, similarities, key=itemgetter(1)))
+            self._neighbours[movie_id] = neighbours
+
+        return neighbours
+
+    def __add_features(self, genres, crew_members):
+        """
+        Adds the genres and crew members of movies to the genre masks and the crew index.
+
+        Args:
+            genres (list[tuple[int, int]]): The movie and genre IDs.
+            crew_members (list[tuple[int, int, str]]): The movie IDs, crew member IDs and member
+                                                       types.
+        """
+        masks = defaultdict(int)
+
+        for movie_id, genre_id in genres:
+            bit = self._genre_bits.setdefault(genre_id, 1 << len(self._genre_bits))
+            masks[movie_id] |= bit
+
+        for movie_id, mask in masks.items():
+            self._movies_by_mask[self._genre_masks[movie_id]].discard(movie_id)
+            self._genre_masks[movie_id] |= mask
+            self._movies_by_mask[self._genre_masks[movie_id]].add(movie_id)
+
+        for movie_id, crew_member_id, member_type in crew_members:
+            weight = max(ROLE_WEIGHTS.get(member_type, 0.0),
+                         self._movie_crew[movie_id].get(crew_member_id, 0.0))
+            self._movie_crew[movie_id][crew_member_id] = weight
+            self._crew_movies[crew_member_id][movie_id] = weight
+
+        self._featured_movies.update(masks)
+        self._featured_movies.update(movie_id for movie_id, _, _ in crew_members)
+
+    def __score_co_favourites(self, favourites, scores):
+        """Adds the cosine similarity over co-favourites of every candidate to its score."""
+        weight = self._weights["co_favourites"]
+
+        for favourite_id, favourite_weight in favourites.items():
+            for movie_id, similarity in self.__neighbours(favourite_id).items():
+                scores[movie_id] += weight * favourite_weight * similarity
+
+    def __score_genre_masks(self, favourites):
+        """
+        Scores every distinct genre mask by its cosine similarity to the masks of the
+        favourites. The sum over the favourites is factored into a weight per genre, so a mask
+        is scored in the time of its number of genres.
+
+        Args:
+            favourites (dict[int, float]): The weights of the favourites keyed by movie ID.
+
+        Returns:
+            dict[int, float]: The weighted genre scores keyed by mask.
+        """
+        weight = self._weights["genres"]
+        genre_weights = defaultdict(float)
+
+        for favourite_id, favourite_weight in favourites.items():
+            mask = self._genre_masks.get(favourite_id, 0)
+            share = favourite_weight / sqrt(mask.bit_count()) if mask else 0.0
+
+            while mask:
+                bit = mask & -mask
+                genre_weights[bit] += share
+                mask ^= bit
+
+        mask_scores = {}
+
+        for mask, movie_ids in self._movies_by_mask.items():
+            if not mask or not movie_ids:
+                continue
+
+            score, remaining = 0.0, mask
+
+            while remaining:
+                bit = remaining & -remaining
+                score += genre_weights.get(bit, 0.0)
+                remaining ^= bit
+
+            if score:
+                mask_scores[mask] = weight * score / sqrt(mask.bit_count())
+
+        return mask_scores
+
+    def __add_genre_candidates(self, mask_scores, favourites, scores, k):
+        """
+        Adds the movies which are only similar by genre and could make it into the top k, i.e.
+        the movies of the best scored masks, to the candidates.
+
+        Args:
+            mask_scores (dict[int, float]): The genre scores keyed by mask.
+            favourites (dict[int, float]): The weights of the favourites keyed by movie ID.
+            scores (dict[int, float]): The scores of the candidates, which are extended.
+            k (int): The number of recommendations.
+        """
+        added, last_score = 0, None
+
+        for mask in sorted(mask_scores, key=mask_scores.get, reverse=True):
+            if added >= k and mask_scores[mask] < last_score:
+                break
+
+            for movie_id in self._movies_by_mask[mask]:
+                if movie_id not in favourites and movie_id not in scores:
+                    scores[movie_id] = mask_scores[mask]
+                    added += 1
+
+            last_score = mask_scores[mask]
+
+    def __score_crew(self, favourites, scores):
+        """Adds the weights of the crew members shared with the favourites to the scores."""
+        weight = self._weights["crew"]
+
+        for favourite_id, favourite_weight in favourites.items():
+            for crew_member_id, role_weight in self._movie_crew.get(favourite_id, {}).items():
+                for movie_id, other_role_weight in self._crew_movies[crew_member_id].items():
+                    scores[movie_id] += weight * favourite_weight * min(role_weight,
+                                                                        other_role_weight)
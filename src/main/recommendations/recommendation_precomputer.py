@@ -0,0 +1,111 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+
+
+class RecommendationPrecomputer:
+    """
+    Precomputes the recommendations of all eligible users in a batch, so they are served
+    instantly instead of on the first click. A user is eligible with enough favourites and is
+    only recomputed if their favourites changed since their recommendations were cached or the
+    cached ones expired. A run spends at most a budget of recommendation requests, the remaining
+    users are left to the next run.
+    """
+
+    def __init__(self, *, load_favourites, load_fingerprints, fingerprint, recommend,
+                 context=nullcontext, min_favourites=3, budget=100, max_workers=2, logger=None):
+        """
+        Initializes a RecommendationPrecomputer.
+
+        Args:
+            load_favourites (Callable[[], list[tuple]]): Loads the user IDs and movie IDs of the
+                favourites of all users, see SQLiteProjections.find_favourite_ratings.
+            load_fingerprints (Callable[[], dict[int, str]]): Loads the favourites fingerprints
+                of the cached recommendations keyed by user ID, see
+                SQLiteRecommendationCache.find_fingerprints.
+            fingerprint (Callable[[Iterable[int]], str]): Computes the fingerprint of favourite
+                movie IDs, see favourites_fingerprint.
+            recommend (Callable[[int, str], list]): Computes and caches the recommendations of a
+                user given the fingerprint of their favourites.
+            context (Callable[[], ContextManager]): Creates the context every user is computed
+                in, e.g. Flask.app_context. Defaults to a context doing nothing.
+            min_favourites (int): The number of favourites needed for recommendations.
+                                  Defaults to 3.
+            budget (int): The maximum number of users computed per run. Defaults to 100.
+            max_workers (int): The number of users computed concurrently. Defaults to 2.
+            logger (logging.Logger): The logger for failed users. Defaults to None.
+        """
+        self._load_favourites = load_favourites
+        self._load_fingerprints = load_fingerprints
+        self._fingerprint = fingerprint
+        self._recommend = recommend
+        self._context = context
+        self._min_favourites = min_favourites
+        self._budget = budget
+        self._max_workers = max_workers
+        self._logger = logger
+
+    def find_stale_users(self):
+        """
+        Finds the eligible users whose recommendations aren't cached for their current
+        favourites.
+
+        Returns:
+            tuple[int, list[tuple[int, str]]]: The number of eligible users, and the IDs and
+                favourites fingerprints of the stale users ordered by user ID.
+        """
+        favourites = {}
+
+        for user_id, movie_id, _ in self._load_favourites():
+            favourites.setdefault(user_id, []).append(movie_id)
+
+        eligible = {user_id: self._fingerprint(movie_ids)
+                    for user_id, movie_ids in favourites.items()
+                    if len(movie_ids) >= self._min_favourites}
+        cached = self._load_fingerprints()
+        stale = sorted((user_id, fingerprint) for user_id, fingerprint in eligible.items()
+                       if cached.get(user_id) != fingerprint)
+        return len(eligible), stale
+
+    def run(self):
+        """
+        Precomputes the recommendations of the stale users within the budget.
+
+        Returns:
+            dict[str, int]: The number of eligible users, of users whose recommendations were
+                            up to date, computed, failed and deferred to the next run.
+        """
+        eligible, stale = self.find_stale_users()
+        batch = stale[:self._budget]
+
+        with ThreadPoolExecutor(max_workers=self._max_workers,
+                                thread_name_prefix="precompute") as executor:
+            succeeded = list(executor.map(lambda user: self.__compute(*user), batch))
+
+        return {
+            "eligible": eligible,
+            "up_to_date": eligible - len(stale),
+            "computed": sum(succeeded),
+            "failed": len(batch) - sum(succeeded),
+            "deferred": len(stale) - len(batch),
+        }
+
+    def __compute(self, user_id, fingerprint):
+        """
+        Computes the recommendations of a user.
+
+        Args:
+            user_id (int): The ID of the user.
+            fingerprint (str): The fingerprint of the user's favourites.
+
+        Returns:
+            bool: True if the recommendations were computed, False if it failed.
+        """
+        try:
+            with self._context():
+                self._recommend(user_id, fingerprint)
+                return True
+        except Exception as e:
+            if self._logger:
+                self._logger.warning(f"Precomputing recommendations of user {user_id} failed: {e}")
+
+            return False
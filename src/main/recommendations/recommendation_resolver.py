@@ -0,0 +1,171 @@
+from concurrent.futures import TimeoutError, as_completed
+from contextvars import copy_context
+
+
+class RecommendationResolver:
+    """
+    Resolves recommended movie titles to movie details. Titles already stored locally are taken
+    from the database, the remaining ones are looked up on the OMDB API concurrently on a bounded
+    thread pool. Lookups missing the deadline of the request or failing, e.g. because the OMDB
+    API timed out for a title, are skipped, so the movies resolved by then are returned as
+    partial result. Only if no movie is resolved at all the error of the first failed lookup is
+    raised, as the OMDB API is rather down.
+    """
+
+    def __init__(self, *, omdb_client, executor, find_local_movies, current_deadline=None,
+                 logger=None):
+        """
+        Initializes a RecommendationResolver.
+
+        Args:
+            omdb_client (OmdbClient): The client used to look up titles not stored locally.
+            executor (concurrent.futures.Executor): The thread pool running the OMDB lookups.
+            find_local_movies (Callable[[list[str]], dict[str, dict]]): Finds the details of
+                locally stored movies by their titles, see
+                SQLiteProjections.find_movie_details_by_titles.
+            current_deadline (Callable[[], Deadline or None]): Gets the deadline of the current
+                request, see concurrency.deadline.current_deadline. Defaults to None.
+            logger (logging.Logger): The logger for failed OMDB lookups. Defaults to None.
+        """
+        self._omdb_client = omdb_client
+        self._executor = executor
+        self._find_local_movies = find_local_movies
+        self._current_deadline = current_deadline
+        self._logger = logger
+
+    def resolve(self, titles):
+        """
+        Resolves titles to movie details, skipping titles which are not found, not resolved
+        before the deadline of the request or whose lookup failed.
+
+        Args:
+            titles (list[str]): The titles to resolve.
+
+        Returns:
+            tuple[list[dict], bool]: The details of the found movies in the order of the titles,
+                shaped like the movies returned by OmdbClient.find_movie_by_title, and whether
+                they are partial because lookups missed the deadline or failed.
+
+        Raises:
+            PermissionError: If the OMDB API key is invalid.
+            Exception: The error of the first failed lookup if no movie is resolved.
+        """
+        local_movies, lookups = self.__start(titles)
+
+        movies, errors, partial = [], [], False
+        for title in titles:
+            if title in local_movies:
+                movies.append(local_movies[title])
+                continue
+
+            try:
+                movies.append(lookups[title].result(timeout=self.__remaining()))
+            except ValueError:
+                continue  # Go on if movie not found
+            except TimeoutError:
+                partial = True
+            except PermissionError:
+                raise
+            except Exception as e:
+                partial = True
+                errors.append(self.__failed(title, e))
+
+        if errors and not movies:
+            raise errors[0]
+
+        return movies, partial
+
+    def resolve_as_completed(self, titles):
+        """
+        Resolves titles to movie details, yielding every movie as soon as it is resolved instead
+        of waiting for the slowest lookup. Locally stored movies come first, titles which are not
+        found are skipped and the iteration stops once the deadline of the request passes. Titles
+        whose lookup failed are yielded without details, so the movies can be marked as partial.
+
+        Args:
+            titles (list[str]): The titles to resolve.
+
+        Yields:
+            tuple[int, dict or None]: The index of the title and the details of the found movie,
+                shaped like the movies returned by OmdbClient.find_movie_by_title, or None if the
+                lookup failed.
+
+        Raises:
+            PermissionError: If the OMDB API key is invalid.
+            Exception: The error of the first failed lookup if no movie is resolved.
+        """
+        local_movies, lookups = self.__start(titles)
+        indices = {}
+        errors, resolved = [], False
+
+        for index, title in enumerate(titles):
+            if title in local_movies:
+                resolved = True
+                yield index, local_movies[title]
+            else:
+                indices.setdefault(lookups[title], index)
+
+        try:
+            for lookup in as_completed(indices, timeout=self.__remaining()):
+                try:
+                    movie = lookup.result()
+                except (ValueError, TimeoutError):
+                    continue  # Go on if movie not found or the deadline passed
+                except PermissionError:
+                    raise
+                except Exception as e:
+                    errors.append(self.__failed(titles[indices[lookup]], e))
+                    yield indices[lookup], None
+                else:
+                    resolved = True
+                    yield indices[lookup], movie
+        except TimeoutError:
+            return  # The deadline passed
+
+        if errors and not resolved:
+            raise errors[0]
+
+    def __start(self, titles):
+        """
+        Finds the locally stored titles and starts the OMDB lookups of the remaining ones.
+
+        Args:
+            titles (list[str]): The titles to resolve.
+
+        Returns:
+            tuple[dict[str, dict], dict[str, concurrent.futures.Future]]: The details of the
+                locally stored movies and the pending lookups, both keyed by title.
+        """
+        local_movies = self._find_local_movies(titles)
+        lookups = {
+            title: self._executor.submit(copy_context().run, self._omdb_client.find_movie_by_title,
+                                         title)
+            for title in titles if title not in local_movies
+        }
+        return local_movies, lookups
+
+    def __failed(self, title, error):
+        """
+        Logs a failed OMDB lookup.
+
+        Args:
+            title (str): The title which was looked up.
+            error (Exception): The error of the lookup.
+
+        Returns:
+            Exception: The error.
+        """
+        if self._logger:
+            self._logger.warning(f"OMDB lookup of '{title}' failed: {error}")
+
+        return error
+
+    def __remaining(self):
+        """
+        Gets the time left until the deadline of the request.
+
+        Returns:
+            float or None: The number of seconds left, or None if there is no deadline.
+        """
+        deadline = self._current_deadline() if self._current_deadline else None
+        return deadline.remaining() if deadline is not None else None
@@ -0,0 +1,278 @@
+from .irepository import IRepository
+from .entities import Movie, Genre, CrewMember, User
+from .lru_cache import LRUCache, MISSING
+from .sqlite_repository import repo as sqlite_repo
+from .title_index import title_index
+from . import db
+
+
+class CachingRepository(IRepository):
+    """
+    A read-through caching decorator for another repository. Lookups of single movies, genres
+    and crew members by their names are served from bounded LRU caches with a time to live, as
+    well as positive existence checks, while all writes are delegated and invalidate exactly the
+    affected entries.
+
+    Only primary keys are cached, never entities, as the caches are shared by all sessions and
+    threads. Cached lookups get the entity by its primary key from the current session, which
+    loads it from the database unless it is already part of the session. Not-found results aren't
+    cached, as a movie may be added under a different title than the one looked up. Added movies
+    are also added to the title index, if any.
+    """
+
+    def __init__(self, *, repository, session, max_size=1024, ttl=300, title_index=None):
+        """
+        Initializes the CachingRepository.
+
+        Args:
+            repository (IRepository): The repository to delegate to.
+            session (sqlalchemy.orm.Session): The session cached entities are fetched in.
+            max_size (int): The maximum number of entries per cache. Defaults to 1024.
+            ttl (float): The number of seconds after which cached entries expire. Defaults to 300.
+            title_index (TitleIndex): The title index kept up to date with added movies.
+                                      Defaults to None.
+        """
+        self._repository = repository
+        self._session = session
+        self._movies = LRUCache(max_size=max_size, ttl=ttl)
+        self._genres = LRUCache(max_size=max_size, ttl=ttl)
+        self._crew_members = LRUCache(max_size=max_size, ttl=ttl)
+        self._exists = LRUCache(max_size=max_size, ttl=ttl)
+        self._title_index = title_index
+
+    def stats(self):
+        """
+        Returns the hit and miss counters and sizes of all caches.
+
+        Returns:
+            dict[str, dict]: The statistics keyed by cache name.
+        """
+        return {
+            "movies": self._movies.stats(),
+            "genres": self._genres.stats(),
+            "crew_members": self._crew_members.stats(),
+            "exists": self._exists.stats(),
+        }
+
+    def find_all_movies(self):
+        """Finds all movies, bypassing the cache."""
+        return self._repository.find_all_movies()
+
+    def find_movie_by_id(self, id):
+        """Finds a movie by its unique ID, served from the cache if possible."""
+        return self.__find_movie(("id", id), lambda: self._repository.find_movie_by_id(id))
+
+    def find_movie_by_title(self, title):
+        """Finds a movie by its title, served from the cache if possible."""
+        return self.__find_movie(("title", title),
+                                 lambda: self._repository.find_movie_by_title(title))
+
+    def find_movies_like(self, title, limit=None):
+        """Finds movies whose title contains the given string, bypassing the cache."""
+        return self._repository.find_movies_like(title, limit=limit)
+
+    def has_full_text_search(self):
+        """Checks if the full-text index is available."""
+        return self._repository.has_full_text_search()
+
+    def has_movie(self, *, id=None, title=None):
+        """Checks if a movie exists based on either its ID or title, using the caches."""
+        if id:
+            key = ("id", id)
+        elif title:
+            key = ("title", title)
+        else:
+            return False
+
+        if self._movies.get(key) is not MISSING:
+            return True
+
+        return self.__exists(("movie", *key), lambda: self._repository.has_movie(id=id,
+                                                                                 title=title))
+
+    def add_movie(
+            self,
+            title,
+            release_year,
+            rating,
+            poster_url,
+            imdb_id,
+            genre_names,
+            directors,
+            writers,
+            actors
+    ):
+        """Adds a new movie and adds it to the title index."""
+        movie = self._repository.add_movie(title, release_year, rating, poster_url, imdb_id,
+                                           genre_names, directors, writers, actors)
+
+        if self._title_index is not None:
+            self._title_index.add(movie.id, movie.title)
+
+        return movie
+
+    def add_movies_bulk(self, movies, batch_size=500):
+        """Adds a stream of movies in batches and rebuilds the title index."""
+        stats = self._repository.add_movies_bulk(movies, batch_size=batch_size)
+
+        if self._title_index is not None:
+            self._title_index.invalidate()
+
+        return stats
+
+    def add_genre(self, name):
+        """Adds a new genre."""
+        return self._repository.add_genre(name)
+
+    def find_genre_by_name(self, name):
+        """Finds a genre by its name, served from the cache if possible."""
+        return self.__read_through(Genre, self._genres, name,
+                                   lambda: self._repository.find_genre_by_name(name))
+
+    def add_crew_member(self, full_name):
+        """Adds a new crew member."""
+        return self._repository.add_crew_member(full_name)
+
+    def find_crew_member_by_name(self, full_name):
+        """Finds a crew member by their full name, served from the cache if possible."""
+        return self.__read_through(CrewMember, self._crew_members, full_name,
+                                   lambda: self._repository.find_crew_member_by_name(full_name))
+
+    def add_user(self, username, profile_picture_filename):
+        """Adds a new user."""
+        return self._repository.add_user(username, profile_picture_filename)
+
+    def add_user_movie(self, user_id, movie_id):
+        """Associates a user with a movie."""
+        self._repository.add_user_movie(user_id, movie_id)
+
+    def find_all_users(self):
+        """Finds all users, bypassing the cache."""
+        return self._repository.find_all_users()
+
+    def find_user_by_id(self, id):
+        """Finds a user by their unique ID, served from the current session if possible."""
+        return self._session.get(User, id)
+
+    def find_user_library(self, user_id):
+        """Finds a user together with their whole favourite movie graph, bypassing the cache."""
+        return self._repository.find_user_library(user_id)
+
+    def has_user(self, id):
+        """Checks if a user with the given ID exists, using the cache."""
+        return self.__exists(("user", id), lambda: self._repository.has_user(id))
+
+    def find_user_movie(self, user_id, movie_id):
+        """Finds the association between a user and a movie, bypassing the cache."""
+        return self._repository.find_user_movie(user_id, movie_id)
+
+    def has_user_movie(self, user_id, movie_id):
+        """Checks if a user is associated with a movie, using the cache."""
+        return self.__exists(("user_movie", user_id, movie_id),
+                             lambda: self._repository.has_user_movie(user_id, movie_id))
+
+    def delete_user_movie(self, user_id, movie_id):
+        """Deletes the association between a user and a movie and invalidates it."""
+        success = self._repository.delete_user_movie(user_id, movie_id)
+        self._exists.invalidate(("user_movie", user_id, movie_id))
+        return success
+
+    def update_user_movie(self, user_id, movie_id, personal_rating):
+        """Updates the personal rating of a movie."""
+        return self._repository.update_user_movie(user_id, movie_id, personal_rating)
+
+    def __find_movie(self, key, find):
+        """
+        Finds a movie through the cache, caching the IDs of found movies under all their keys.
+
+        Args:
+            key (tuple[str, object]): The cache key of the lookup.
+            find (Callable[[], Movie or None]): Finds the movie on a cache miss.
+
+        Returns:
+            Movie or None: The movie of the current session, or None if not found.
+        """
+        movie = self.__cached(Movie, self._movies, key)
+
+        if movie is None:
+            movie = find()
+
+            if movie is not None:
+                for movie_key in (key, ("id", movie.id), ("title", movie.title),
+                                  ("imdb_id", movie.imdb_id)):
+                    self._movies.set(movie_key, movie.id)
+
+        return movie
+
+    def __read_through(self, entity, cache, key, find):
+        """
+        Gets an entity through a cache of primary keys, finding it and caching its ID on a miss.
+
+        Args:
+            entity (type): The entity class, e.g. Genre.
+            cache (LRUCache): The cache to use.
+            key (Hashable): The cache key.
+            find (Callable[[], object]): Finds the entity on a cache miss.
+
+        Returns:
+            object or None: The entity of the current session, or None if not found.
+        """
+        found = self.__cached(entity, cache, key)
+
+        if found is None:
+            found = find()
+
+            if found is not None:
+                cache.set(key, found.id)
+
+        return found
+
+    def __cached(self, entity, cache, key):
+        """
+        Gets an entity by the primary key cached under a key from the current session.
+
+        Args:
+            entity (type): The entity class.
+            cache (LRUCache): The cache of primary keys.
+            key (Hashable): The cache key.
+
+        Returns:
+            object or None: The entity, or None if no primary key is cached or the entity doesn't
+                            exist anymore.
+        """
+        entity_id = cache.get(key)
+
+        if entity_id is MISSING:
+            return None
+
+        found = self._session.get(entity, entity_id)
+
+        if found is None:
+            cache.invalidate(key)
+
+        return found
+
+    def __exists(self, key, check):
+        """
+        Gets the result of an existence check from the cache, checking on a miss and caching the
+        result if the checked row exists.
+
+        Args:
+            key (tuple): The cache key.
+            check (Callable[[], bool]): Performs the check on a cache miss.
+
+        Returns:
+            bool: The result of the check.
+        """
+        if self._exists.get(key) is not MISSING:
+            return True
+
+        exists = check()
+
+        if exists:
+            self._exists.set(key, True)
+
+        return exists
+
+
+repo = CachingRepository(repository=sqlite_repo, session=db.session, title_index=title_index)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, String, ForeignKey
+from sqlalchemy import Column, Integer, Float, String, ForeignKey, Index, JSON, text
 from sqlalchemy.orm import relationship
 from . import db
 
@@ -6,10 +6,13 @@ from . import db
 class Movie(db.Model):
     """Represents a movie in the database."""
     __tablename__ = "movies"
+    __table_args__ = (
+        Index("ix_movies_imdb_id", "imdb_id", unique=True, sqlite_where=text("imdb_id != ''")),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     imdb_id = Column(String)
-    title = Column(String)
+    title = Column(String, index=True)
     release_year = Column(Integer)
     rating = Column(Float)
     poster_url = Column(String)
@@ -53,7 +56,7 @@ class Genre(db.Model):
     __tablename__ = "genres"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    name = Column(String)
+    name = Column(String, index=True, unique=True)
 
     def to_dict(self):
         """Returns a dictionary representation of the genre."""
@@ -68,7 +71,7 @@ class CrewMember(db.Model):
     __tablename__ = "crew_members"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    full_name = Column(String)
+    full_name = Column(String, index=True, unique=True)
 
     def to_dict(self):
         """Returns a dictionary representation of the crew member."""
@@ -85,7 +88,7 @@ class MovieUserAssociation(db.Model):
     __tablename__ = "movie_user"
 
     movie_id = Column(Integer, ForeignKey(Movie.id), primary_key=True)
-    user_id = Column(Integer, ForeignKey(User.id), primary_key=True)
+    user_id = Column(Integer, ForeignKey(User.id), primary_key=True, index=True)
     movie = relationship("Movie", foreign_keys="MovieUserAssociation.movie_id")
     personal_rating = Column(Float)
 
@@ -123,3 +126,59 @@ class MovieGenreAssociation(db.Model):
     def __repr__(self):
         """Returns a string representation of the MovieGenreAssociation object."""
         return f"<MovieGenreAssociation movie_id={self.movie_id}, genre_id={self.genre_id}>"
+
+
+class Job(db.Model):
+    """
+    Represents a background job in the database, e.g. adding a movie to a user's favourites
+    after fetching its details from OMDB.
+    """
+    __tablename__ = "jobs"
+    __table_args__ = (
+        Index("ix_jobs_status_run_at", "status", "run_at"),
+    )
+
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    kind = Column(String, nullable=False)
+    payload = Column(JSON, nullable=False)
+    user_id = Column(Integer, ForeignKey(User.id), index=True)
+    status = Column(String, nullable=False, default=PENDING)
+    attempts = Column(Integer, nullable=False, default=0)
+    error = Column(String)
+    run_at = Column(Float, nullable=False)
+    created_at = Column(Float, nullable=False)
+    updated_at = Column(Float, nullable=False)
+
+    def to_dict(self):
+        """Returns a dictionary representation of the job."""
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "payload": self.payload,
+            "status": self.status,
+            "attempts": self.attempts,
+            "error": self.error,
+        }
+
+
+class UserRecommendations(db.Model):
+    """
+    Represents the cached recommendations of a user, valid for the favourites they were
+    generated from as identified by their fingerprint.
+    """
+    __tablename__ = "user_recommendations"
+
+    user_id = Column(Integer, ForeignKey(User.id), primary_key=True)
+    fingerprint = Column(String, nullable=False)
+    movies = Column(JSON, nullable=False)
+    created_at = Column(Float, nullable=False)
+
+    def __repr__(self):
+        """Returns a string representation of the UserRecommendations object."""
+        return (f"<UserRecommendations user_id={self.user_id}, fingerprint={self.fingerprint}, "
+                f"movies={len(self.movies)}>")
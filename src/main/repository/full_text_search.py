@@ -0,0 +1,193 @@
+import re
+from sqlalchemy import bindparam, text, Integer, Float
+from sqlalchemy.exc import OperationalError
+
+FTS_TABLE = "movies_fts"
+
+FTS_ROWS = """
+    SELECT movies.id, movies.title,
+           (SELECT group_concat(genres.name, ' ') FROM movie_genre
+            JOIN genres ON genres.id = movie_genre.genre_id
+            WHERE movie_genre.movie_id = movies.id),
+           (SELECT group_concat(crew_members.full_name, ' ') FROM movie_crew_member
+            JOIN crew_members ON crew_members.id = movie_crew_member.crew_member_id
+            WHERE movie_crew_member.movie_id = movies.id)
+    FROM movies WHERE movies.id IN {movie_ids}
+"""
+
+FTS_REFRESH = f"""
+    DELETE FROM {FTS_TABLE} WHERE rowid IN {{movie_ids}};
+    INSERT INTO {FTS_TABLE} (rowid, title, genres, crew_members) {FTS_ROWS};
+"""
+
+# Movies inserted by SQLiteRepository are listed in this table while their genres and crew
+# members are inserted, so they are indexed once afterwards instead of once per association
+FTS_DEFERRED_TABLE = "movies_fts_deferred"
+
+NOT_DEFERRED = f"WHEN NEW.movie_id NOT IN (SELECT movie_id FROM {FTS_DEFERRED_TABLE})"
+
+FTS_TRIGGERS = {
+    "movies_fts_movie_insert": ("AFTER INSERT ON movies", "(NEW.id)"),
+    "movies_fts_movie_update": ("AFTER UPDATE OF title ON movies", "(NEW.id)"),
+    "movies_fts_genre_added": (f"AFTER INSERT ON movie_genre {NOT_DEFERRED}", "(NEW.movie_id)"),
+    "movies_fts_genre_delete": ("AFTER DELETE ON movie_genre", "(OLD.movie_id)"),
+    "movies_fts_genre_update": (
+        "AFTER UPDATE OF name ON genres",
+        "(SELECT movie_id FROM movie_genre WHERE genre_id = NEW.id)"
+    ),
+    "movies_fts_crew_member_added": (
+        f"AFTER INSERT ON movie_crew_member {NOT_DEFERRED}",
+        "(NEW.movie_id)"
+    ),
+    "movies_fts_crew_member_delete": ("AFTER DELETE ON movie_crew_member", "(OLD.movie_id)"),
+    "movies_fts_crew_member_update": (
+        "AFTER UPDATE OF full_name ON crew_members",
+        "(SELECT movie_id FROM movie_crew_member WHERE crew_member_id = NEW.id)"
+    ),
+}
+
+# Insert triggers of earlier versions which reindexed deferred movies too
+OBSOLETE_FTS_TRIGGERS = ["movies_fts_genre_insert", "movies_fts_crew_member_insert"]
+
+# Title matches outweigh genre and crew member matches in the BM25 ranking
+FTS_RANK = f"bm25({FTS_TABLE}, 10.0, 1.0, 2.0)"
+
+
+def create_full_text_search(connection):
+    """
+    Creates the FTS5 table indexing movie titles, genres and crew members, the triggers keeping it
+    in sync and backfills movies which are not indexed yet.
+
+    Args:
+        connection (sqlalchemy.engine.Connection): The connection to execute the statements on.
+
+    Returns:
+        bool: True if the full-text search is available, False if SQLite is built without FTS5.
+    """
+    try:
+        connection.execute(text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+            f"title, genres, crew_members, tokenize = 'unicode61 remove_diacritics 2')"
+        ))
+    except OperationalError:
+        return False
+
+    connection.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {FTS_DEFERRED_TABLE} (movie_id INTEGER PRIMARY KEY)"
+    ))
+
+    for name in OBSOLETE_FTS_TRIGGERS:
+        connection.execute(text(f"DROP TRIGGER IF EXISTS {name}"))
+
+    for name, (event, movie_ids) in FTS_TRIGGERS.items():
+        connection.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {name} {event} BEGIN "
+            f"{FTS_REFRESH.format(movie_ids=movie_ids)} END"
+        ))
+
+    connection.execute(text(
+        f"CREATE TRIGGER IF NOT EXISTS movies_fts_movie_delete AFTER DELETE ON movies BEGIN "
+        f"DELETE FROM {FTS_TABLE} WHERE rowid = OLD.id; END"
+    ))
+
+    unindexed_movie_ids = f"(SELECT id FROM movies EXCEPT SELECT rowid FROM {FTS_TABLE})"
+    connection.execute(text(
+        f"INSERT INTO {FTS_TABLE} (rowid, title, genres, crew_members) "
+        f"{FTS_ROWS.format(movie_ids=unindexed_movie_ids)}"
+    ))
+
+    return True
+
+
+def defer_full_text_search(connection, movie_ids):
+    """
+    Stops the triggers from reindexing movies for each genre and crew member inserted, until
+    refresh_full_text_search indexes them once. Requires the FTS5 table.
+
+    Args:
+        connection (sqlalchemy.engine.Connection): The connection to execute the statements on.
+        movie_ids (list[int]): The IDs of the movies about to get their associations.
+    """
+    if movie_ids:
+        connection.execute(text(f"INSERT OR IGNORE INTO {FTS_DEFERRED_TABLE} VALUES (:movie_id)"),
+                           [{"movie_id": movie_id} for movie_id in movie_ids])
+
+
+def refresh_full_text_search(connection, movie_ids):
+    """
+    Indexes movies deferred by defer_full_text_search with all their genres and crew members,
+    replacing their previous rows, and lets the triggers index them again. Requires the FTS5
+    table.
+
+    Args:
+        connection (sqlalchemy.engine.Connection): The connection to execute the statements on.
+        movie_ids (list[int]): The IDs of the movies to index.
+    """
+    if not movie_ids:
+        return
+
+    movie_ids_param = bindparam("movie_ids", expanding=True)
+
+    for statement in (
+        f"DELETE FROM {FTS_TABLE} WHERE rowid IN :movie_ids",
+        f"INSERT INTO {FTS_TABLE} (rowid, title, genres, crew_members) "
+        f"{FTS_ROWS.format(movie_ids=':movie_ids')}",
+        f"DELETE FROM {FTS_DEFERRED_TABLE} WHERE movie_id IN :movie_ids",
+    ):
+        connection.execute(text(statement).bindparams(movie_ids_param), {"movie_ids": movie_ids})
+
+
+def has_full_text_search(connection):
+    """
+    Checks if the FTS5 table exists in the database.
+
+    Args:
+        connection (sqlalchemy.engine.Connection): The connection to execute the query on.
+
+    Returns:
+        bool: True if the full-text search table exists, False otherwise.
+    """
+    query = text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name")
+    return connection.execute(query, {"name": FTS_TABLE}).first() is not None
+
+
+def match_expression(search_text):
+    """
+    Builds an FTS5 MATCH expression from free text, prefix-matching every word. Words are quoted
+    so user input can never be interpreted as FTS5 query syntax.
+
+    Args:
+        search_text (str): The free text to search for.
+
+    Returns:
+        str or None: The MATCH expression, or None if the text contains no words.
+    """
+    words = re.findall(r"\w+", search_text)
+
+    if not words:
+        return None
+
+    return " ".join(f'"{word}"*' for word in words)
+
+
+def ranked_movie_ids(search_text, limit=None):
+    """
+    Builds a subquery of the IDs of the movies matching free text, ranked by BM25.
+
+    Args:
+        search_text (str): The free text to search for.
+        limit (int): The maximum number of movies to return. Defaults to None.
+
+    Returns:
+        sqlalchemy.sql.Subquery or None: A subquery with the columns id and rank, where a lower rank
+                                         is a better match, or None if the text contains no words.
+    """
+    match = match_expression(search_text)
+
+    if not match:
+        return None
+
+    return text(
+        f"SELECT rowid AS id, {FTS_RANK} AS rank FROM {FTS_TABLE} "
+        f"WHERE {FTS_TABLE} MATCH :match ORDER BY rank LIMIT :limit"
+    ).bindparams(match=match, limit=limit or -1).columns(id=Integer, rank=Float).subquery()
@@ -18,6 +18,10 @@ class IRepository(ABC):
     def find_movies_like(self, title, limit=None):
         pass
 
+    @abstractmethod
+    def has_full_text_search(self):
+        pass
+
     @abstractmethod
     def has_movie(self, *, id=None, title=None):
         pass
@@ -37,6 +41,10 @@ class IRepository(ABC):
     ):
         pass
 
+    @abstractmethod
+    def add_movies_bulk(self, movies, batch_size=500):
+        pass
+
     @abstractmethod
     def add_genre(self, name):
         pass
@@ -69,6 +77,10 @@ class IRepository(ABC):
     def find_user_by_id(self, id):
         pass
 
+    @abstractmethod
+    def find_user_library(self, user_id):
+        pass
+
     @abstractmethod
     def has_user(self, id):
         pass
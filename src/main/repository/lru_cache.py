@@ -0,0 +1,90 @@
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+
+MISSING = object()
+
+
+class LRUCache:
+    """
+    A thread-safe, size-bounded mapping evicting the least recently used entries, whose entries
+    additionally expire after a time to live. Counts hits and misses.
+    """
+
+    def __init__(self, *, max_size, ttl, clock=monotonic):
+        """
+        Initializes an LRUCache.
+
+        Args:
+            max_size (int): The maximum number of entries before the least recently used ones
+                            are evicted.
+            ttl (float): The number of seconds after which an entry expires.
+            clock (Callable[[], float]): The time source in seconds. Defaults to time.monotonic.
+        """
+        self._max_size = max_size
+        self._ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=MISSING):
+        """
+        Gets the value of a key and marks it as recently used.
+
+        Args:
+            key (Hashable): The key to look up.
+            default (object): The value returned if the key is missing or expired.
+                              Defaults to MISSING.
+
+        Returns:
+            object: The cached value, or the default if the key is missing or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None or entry[1] <= self._clock():
+                self._entries.pop(key, None)
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, value):
+        """
+        Sets the value of a key, evicting the least recently used entry if the cache is full.
+
+        Args:
+            key (Hashable): The key to set.
+            value (object): The value to cache, which may be None.
+        """
+        with self._lock:
+            self._entries[key] = (value, self._clock() + self._ttl)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, *keys):
+        """
+        Removes keys from the cache, ignoring missing ones.
+
+        Args:
+            *keys (Hashable): The keys to remove.
+        """
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def stats(self):
+        """
+        Returns the hit and miss counters and the current size of the cache.
+
+        Returns:
+            dict: The number of hits, misses and entries.
+        """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
@@ -0,0 +1,67 @@
+from sqlalchemy import text
+from . import db
+from . import entities
+from .full_text_search import create_full_text_search
+
+DUPLICATE_MERGES = [
+    # (table, unique column, referencing tables with their foreign key column, row filter)
+    ("genres", "name", [("movie_genre", "genre_id")], "name IS NOT NULL"),
+    ("crew_members", "full_name", [("movie_crew_member", "crew_member_id")],
+     "full_name IS NOT NULL"),
+    ("movies", "imdb_id", [("movie_user", "movie_id"),
+                           ("movie_genre", "movie_id"),
+                           ("movie_crew_member", "movie_id")], "imdb_id != ''"),
+]
+
+
+def migrate(engine):
+    """
+    Migrates an existing database in place to the current schema. Duplicate rows which would
+    violate the unique indexes are merged into the row with the lowest ID, afterwards all missing
+    tables, e.g. the jobs table, indexes and, if supported by SQLite, the full-text search table
+    are created. Running the migration on an up-to-date database is a no-op.
+
+    Args:
+        engine (sqlalchemy.engine.Engine): The engine of the database to migrate.
+    """
+    with engine.begin() as connection:
+        for table, column, references, row_filter in DUPLICATE_MERGES:
+            __merge_duplicates(connection, table, column, references, row_filter)
+
+        db.metadata.create_all(connection, checkfirst=True)
+
+        for table in db.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(connection, checkfirst=True)
+
+        create_full_text_search(connection)
+
+
+def __merge_duplicates(connection, table, column, references, row_filter):
+    """
+    Merges rows sharing the same value in a column into the row with the lowest ID, re-pointing
+    all references to it and dropping references which would then be duplicated.
+
+    Args:
+        connection (sqlalchemy.engine.Connection): The connection to execute the statements on.
+        table (str): The name of the table containing duplicates.
+        column (str): The column which should be unique.
+        references (list[tuple[str, str]]): The referencing tables with their foreign key column.
+        row_filter (str): A SQL condition restricting the rows which have to be unique.
+    """
+    keeper_id = (f"(SELECT MIN(keeper.id) FROM {table} keeper WHERE keeper.{column} = "
+                 f"(SELECT duplicate.{column} FROM {table} duplicate WHERE duplicate.id = {{}}))")
+    duplicate_ids = (f"(SELECT id FROM {table} WHERE {row_filter} AND id NOT IN "
+                     f"(SELECT MIN(id) FROM {table} WHERE {row_filter} GROUP BY {column}))")
+
+    for reference_table, foreign_key in references:
+        connection.execute(text(
+            f"UPDATE OR IGNORE {reference_table} "
+            f"SET {foreign_key} = {keeper_id.format(f'{reference_table}.{foreign_key}')} "
+            f"WHERE {foreign_key} IN {duplicate_ids}"
+        ))
+        connection.execute(text(
+            f"DELETE FROM {reference_table} WHERE {foreign_key} IN {duplicate_ids}"
+        ))
+
+    connection.execute(text(f"DELETE FROM {table} WHERE id IN {duplicate_ids}"))
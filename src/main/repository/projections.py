@@ -0,0 +1,105 @@
+class GenreSummary:
+    """A read-only projection of a genre."""
+    __slots__ = ("id", "name")
+
+    def __init__(self, id, name):
+        """
+        Initializes a GenreSummary.
+
+        Args:
+            id (int): The ID of the genre.
+            name (str): The name of the genre.
+        """
+        self.id = id
+        self.name = name
+
+    def to_dict(self):
+        """Returns a dictionary representation of the genre."""
+        return {
+            "id": self.id,
+            "name": self.name,
+        }
+
+
+class MovieSummary:
+    """A read-only projection of a movie including its genres, without crew members."""
+    __slots__ = ("id", "imdb_id", "title", "release_year", "rating", "poster_url", "genres")
+
+    def __init__(self, id, imdb_id, title, release_year, rating, poster_url, genres=()):
+        """
+        Initializes a MovieSummary.
+
+        Args:
+            id (int): The ID of the movie.
+            imdb_id (str): The IMDb ID of the movie.
+            title (str): The title of the movie.
+            release_year (int): The year the movie was released.
+            rating (float): The rating of the movie.
+            poster_url (str): The URL of the movie's poster.
+            genres (Sequence[GenreSummary]): The genres of the movie. Defaults to no genres.
+        """
+        self.id = id
+        self.imdb_id = imdb_id
+        self.title = title
+        self.release_year = release_year
+        self.rating = rating
+        self.poster_url = poster_url
+        self.genres = genres
+
+    def to_dict(self):
+        """Returns a dictionary representation of the movie."""
+        return {
+            "id": self.id,
+            "imdb_id": self.imdb_id,
+            "title": self.title,
+            "release_year": self.release_year,
+            "rating": self.rating,
+            "poster_url": self.poster_url,
+            "genres": [genre.to_dict() for genre in self.genres]
+        }
+
+
+class FavouriteSummary:
+    """A read-only projection of a user's favourite movie including its genres."""
+    __slots__ = ("id", "title", "personal_rating", "genres")
+
+    def __init__(self, id, title, personal_rating, genres=()):
+        """
+        Initializes a FavouriteSummary.
+
+        Args:
+            id (int): The ID of the movie.
+            title (str): The title of the movie.
+            personal_rating (float): The user's personal rating of the movie, or None if unrated.
+            genres (Sequence[GenreSummary]): The genres of the movie. Defaults to no genres.
+        """
+        self.id = id
+        self.title = title
+        self.personal_rating = personal_rating
+        self.genres = genres
+
+
+class UserSummary:
+    """A read-only projection of a user, without their movies."""
+    __slots__ = ("id", "username", "profile_picture")
+
+    def __init__(self, id, username, profile_picture):
+        """
+        Initializes a UserSummary.
+
+        Args:
+            id (int): The ID of the user.
+            username (str): The username of the user.
+            profile_picture (str): The filename of the user's profile picture.
+        """
+        self.id = id
+        self.username = username
+        self.profile_picture = profile_picture
+
+    def to_dict(self):
+        """Returns a dictionary representation of the user."""
+        return {
+            "id": self.id,
+            "username": self.username,
+            "profile_picture": self.profile_picture,
+        }
@@ -0,0 +1,164 @@
+from contextvars import ContextVar
+from threading import Lock
+from time import perf_counter
+from sqlalchemy import event
+
+
+class QueryStats:
+    """The number and total duration of the SQL statements executed during a request."""
+
+    def __init__(self):
+        """Initializes empty QueryStats."""
+        self.count = 0
+        self.duration = 0.0
+        self._lock = Lock()
+
+    def add(self, duration):
+        """
+        Records an executed statement. Statements may be executed by several threads.
+
+        Args:
+            duration (float): The duration of the statement in seconds.
+        """
+        with self._lock:
+            self.count += 1
+            self.duration += duration
+
+    def server_timing(self):
+        """
+        Formats the statistics as value of a Server-Timing header.
+
+        Returns:
+            str: The metric "db" with the number of statements and the total duration in
+                 milliseconds, e.g. 'db;desc="3 queries";dur=1.25'.
+        """
+        with self._lock:
+            return f'db;desc="{self.count} queries";dur={self.duration * 1000:.2f}'
+
+
+class QueryProfiler:
+    """
+    Profiles the SQL statements executed by an engine using its cursor events. The statements
+    are counted and timed per request and statements slower than a threshold are logged with
+    their query plan, so e.g. a missing index shows up as SCAN in the log.
+
+    A request is profiled between start and stop on its thread, and on other threads running in
+    a copy of its context.
+    """
+
+    def __init__(self, *, slow_threshold=0.1, logger=None, clock=perf_counter):
+        """
+        Initializes a QueryProfiler without profiling a request yet.
+
+        Args:
+            slow_threshold (float): The duration in seconds from which statements are logged, or
+                                    None to log no statements. Defaults to 0.1.
+            logger (logging.Logger): The logger for slow statements. Defaults to None.
+            clock (Callable[[], float]): The time source in seconds.
+                                         Defaults to time.perf_counter.
+        """
+        self._slow_threshold = slow_threshold
+        self._logger = logger
+        self._clock = clock
+        self._stats = ContextVar("query_stats", default=None)
+
+    def install(self, engine):
+        """
+        Registers the listeners timing every statement of an engine.
+
+        Args:
+            engine (sqlalchemy.engine.Engine): The engine to profile.
+        """
+        explain = engine.dialect.name == "sqlite"
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def start_timer(connection, cursor, statement, parameters, context, executemany):
+            connection.info.setdefault("query_started_at", []).append(self._clock())
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def stop_timer(connection, cursor, statement, parameters, context, executemany):
+            duration = self._clock() - connection.info["query_started_at"].pop()
+            stats = self._stats.get()
+
+            if stats is not None:
+                stats.add(duration)
+
+            if self._slow_threshold is not None and duration >= self._slow_threshold:
+                plan = self.__query_plan(cursor, statement, parameters) \
+                    if explain and not executemany else None
+                self.__log_slow_query(statement, parameters, duration, plan)
+
+    def start(self):
+        """
+        Starts profiling the current request.
+
+        Returns:
+            contextvars.Token: The token ending the profiling, see stop.
+        """
+        return self._stats.set(QueryStats())
+
+    def stop(self, token):
+        """
+        Stops profiling the current request.
+
+        Args:
+            token (contextvars.Token): The token returned by start.
+        """
+        self._stats.reset(token)
+
+    def current_stats(self):
+        """
+        Gets the statistics of the request being profiled.
+
+        Returns:
+            QueryStats or None: The statistics, or None if no request is profiled.
+        """
+        return self._stats.get()
+
+    def __query_plan(self, cursor, statement, parameters):
+        """
+        Explains how SQLite executes a statement, on the connection which executed it.
+
+        Args:
+            cursor (sqlite3.Cursor): The cursor which executed the statement.
+            statement (str): The SQL statement.
+            parameters (tuple or dict): The parameters of the statement.
+
+        Returns:
+            str or None: The details of the query plan, indented by depth, or None if the
+                         statement can't be explained.
+        """
+        try:
+            rows = cursor.connection.execute(f"EXPLAIN QUERY PLAN {statement}",
+                                             parameters).fetchall()
+        except Exception:
+            return None
+
+        depths = {0: -1}
+        lines = []
+
+        for node_id, parent_id, _, detail in rows:
+            depths[node_id] = depths.get(parent_id, -1) + 1
+            lines.append("  " * depths[node_id] + detail)
+
+        return "\n".join(lines)
+
+    def __log_slow_query(self, statement, parameters, duration, plan):
+        """
+        Logs a slow statement.
+
+        Args:
+            statement (str): The SQL statement.
+            parameters (tuple or dict or list): The parameters of the statement.
+            duration (float): The duration of the statement in seconds.
+            plan (str or None): The query plan, if any.
+        """
+        if not self._logger:
+            return
+
+        message = f"Slow query ({duration * 1000:.1f}ms): {statement} {parameters!r}"
+
+        if plan:
+            message += f"\nQuery plan:\n{plan}"
+
+        self._logger.warning(message)
@@ -0,0 +1,192 @@
+from time import time
+from sqlalchemy import select, update
+from sqlalchemy.exc import SQLAlchemyError
+from .entities import Job
+from . import db
+
+
+class SQLiteJobQueue:
+    """
+    A persistent queue of background jobs stored in the jobs table of the SQLite database.
+    Jobs are claimed atomically, so several worker threads or processes can share the queue.
+    """
+
+    def __init__(self, *, session, clock=time):
+        """
+        Initializes the SQLiteJobQueue with a database session.
+
+        Args:
+            session (sqlalchemy.orm.Session): The SQLAlchemy session to use for database operations.
+            clock (Callable[[], float]): The current unix time. Defaults to time.time.
+        """
+        self._session = session
+        self._clock = clock
+
+    def enqueue(self, kind, payload, user_id=None):
+        """
+        Adds a new pending job which is due immediately.
+
+        Args:
+            kind (str): The kind of the job, selecting the handler which runs it.
+            payload (dict): The JSON serializable arguments of the job.
+            user_id (int): The ID of the user the job belongs to, if any. Defaults to None.
+
+        Returns:
+            Job: The newly created job.
+
+        Raises:
+            SQLAlchemyError: If an error occurs during the database operation.
+        """
+        now = self._clock()
+        job = Job(kind=kind, payload=payload, user_id=user_id, status=Job.PENDING, attempts=0,
+                  run_at=now, created_at=now, updated_at=now)
+
+        try:
+            self._session.add(job)
+            self._session.commit()
+            return job
+        except SQLAlchemyError as e:
+            self._session.rollback()
+            raise e
+
+    def claim(self):
+        """
+        Claims the pending job which is due the longest, marking it as running and counting the
+        attempt.
+
+        Returns:
+            Job or None: The claimed job, or None if no job is due.
+
+        Raises:
+            SQLAlchemyError: If an error occurs during the database operation.
+        """
+        now = self._clock()
+        due_job_id = select(Job.id).where(
+            Job.status == Job.PENDING, Job.run_at <= now
+        ).order_by(Job.run_at, Job.id).limit(1).scalar_subquery()
+
+        query = update(Job).where(Job.id == due_job_id, Job.status == Job.PENDING).values(
+            status=Job.RUNNING, attempts=Job.attempts + 1, updated_at=now
+        ).returning(Job)
+
+        try:
+            job = self._session.execute(query).scalar_one_or_none()
+            self._session.commit()
+            return job
+        except SQLAlchemyError as e:
+            self._session.rollback()
+            raise e
+
+    def complete(self, job_id):
+        """
+        Marks a job as done.
+
+        Args:
+            job_id (int): The ID of the job.
+
+        Raises:
+            SQLAlchemyError: If an error occurs during the database operation.
+        """
+        self.__update(job_id, status=Job.DONE, error=None)
+
+    def retry(self, job_id, error, delay):
+        """
+        Reschedules a failed job to run again after a delay.
+
+        Args:
+            job_id (int): The ID of the job.
+            error (str): The error of the failed attempt.
+            delay (float): The number of seconds until the job is due again.
+
+        Raises:
+            SQLAlchemyError: If an error occurs during the database operation.
+        """
+        self.__update(job_id, status=Job.PENDING, error=error, run_at=self._clock() + delay)
+
+    def fail(self, job_id, error):
+        """
+        Marks a job as finally failed.
+
+        Args:
+            job_id (int): The ID of the job.
+            error (str): The error of the last attempt.
+
+        Raises:
+            SQLAlchemyError: If an error occurs during the database operation.
+        """
+        self.__update(job_id, status=Job.FAILED, error=error)
+
+    def resume_interrupted(self):
+        """
+        Makes running jobs pending again, so jobs interrupted by a crash or restart are resumed.
+        Must only be called before any worker has started.
+
+        Returns:
+            int: The number of resumed jobs.
+
+        Raises:
+            SQLAlchemyError: If an error occurs during the database operation.
+        """
+        now = self._clock()
+        query = update(Job).where(Job.status == Job.RUNNING).values(
+            status=Job.PENDING, run_at=now, updated_at=now
+        )
+
+        try:
+            count = self._session.execute(query).rowcount
+            self._session.commit()
+            return count
+        except SQLAlchemyError as e:
+            self._session.rollback()
+            raise e
+
+    def find_job_by_id(self, id):
+        """
+        Finds a job by its unique ID.
+
+        Args:
+            id (int): The ID of the job.
+
+        Returns:
+            Job or None: The job if found, otherwise None.
+        """
+        return self._session.get(Job, id)
+
+    def find_unfinished_jobs(self, user_id, kind):
+        """
+        Finds the pending and running jobs of a user.
+
+        Args:
+            user_id (int): The ID of the user.
+            kind (str): The kind of the jobs.
+
+        Returns:
+            list[Job]: The unfinished jobs in the order they were created.
+        """
+        query = select(Job).where(
+            Job.user_id == user_id, Job.kind == kind, Job.status.in_((Job.PENDING, Job.RUNNING))
+        ).order_by(Job.id)
+        return self._session.execute(query).scalars().all()
+
+    def __update(self, job_id, **values):
+        """
+        Updates the columns of a job.
+
+        Args:
+            job_id (int): The ID of the job.
+            **values: The new column values.
+
+        Raises:
+            SQLAlchemyError: If an error occurs during the database operation.
+        """
+        query = update(Job).where(Job.id == job_id).values(updated_at=self._clock(), **values)
+
+        try:
+            self._session.execute(query)
+            self._session.commit()
+        except SQLAlchemyError as e:
+            self._session.rollback()
+            raise e
+
+
+job_queue = SQLiteJobQueue(session=db.session)
@@ -0,0 +1,343 @@
+from itertools import groupby
+from sqlalchemy import func, literal_column, select
+from .entities import Movie, Genre, CrewMember, User, MovieGenreAssociation, \
+    MovieUserAssociation, MovieCrewMemberAssociation
+from .full_text_search import ranked_movie_ids
+from .projections import FavouriteSummary, GenreSummary, MovieSummary, UserSummary
+from . import db
+
+
+class SQLiteProjections:
+    """
+    Read-only queries for SQLite, selecting only the needed columns into lightweight summaries
+    instead of loading full entities into the session.
+    """
+
+    movie_columns = (Movie.id, Movie.imdb_id, Movie.title, Movie.release_year, Movie.rating,
+                     Movie.poster_url)
+
+    def __init__(self, *, session):
+        """
+        Initializes the SQLiteProjections with a database session.
+
+        Args:
+            session (sqlalchemy.orm.Session): The SQLAlchemy session to use for database operations.
+        """
+        self._session = session
+
+    def find_movies_like(self, title, limit=None):
+        """
+        Finds movies whose title contains the given string (case-insensitive).
+
+        Args:
+            title (str): The substring to search for in movie titles.
+            limit (int): The maximum number of movies to return. Defaults to None.
+
+        Returns:
+            list[MovieSummary]: The movies whose titles contain the search string.
+        """
+        query = select(*self.movie_columns).where(Movie.title.ilike(f"%{title}%"))
+
+        if limit:
+            query = query.limit(limit)
+
+        return self.__movie_summaries(self._session.execute(query).all())
+
+    def search_movies(self, search_text, limit=None):
+        """
+        Searches movies using the FTS5 full-text index, ranked by BM25.
+
+        Args:
+            search_text (str): The free text to search for.
+            limit (int): The maximum number of movies to return. Defaults to None.
+
+        Returns:
+            list[MovieSummary]: The matching movies, best match first.
+        """
+        ranked = ranked_movie_ids(search_text, limit)
+
+        if ranked is None:
+            return []
+
+        query = select(*self.movie_columns).join(ranked, Movie.id == ranked.c.id).order_by(
+            ranked.c.rank)
+        return self.__movie_summaries(self._session.execute(query).all())
+
+    def find_movies_page(self, after_id=None, limit=100):
+        """
+        Finds a page of movies ordered by ID using keyset pagination.
+
+        Args:
+            after_id (int): The ID of the last movie of the previous page, or None for the first
+                            page. Defaults to None.
+            limit (int): The maximum number of movies in the page. Defaults to 100.
+
+        Returns:
+            tuple[list[MovieSummary], int or None]: The movies of the page and the cursor of the
+                                                    next page, which is None if this is the last
+                                                    page.
+        """
+        query = select(*self.movie_columns).order_by(Movie.id).limit(limit + 1)
+
+        if after_id is not None:
+            query = query.where(Movie.id > after_id)
+
+        rows = self._session.execute(query).all()
+        next_cursor = rows[limit - 1].id if len(rows) > limit else None
+        return self.__movie_summaries(rows[:limit]), next_cursor
+
+    def stream_all_movies(self, batch_size=500):
+        """
+        Iterates over all movies ordered by ID, fetching them and their genres from the database
+        in batches so memory stays flat regardless of the number of movies.
+
+        Args:
+            batch_size (int): The number of movies fetched per batch. Defaults to 500.
+
+        Yields:
+            MovieSummary: The next movie.
+        """
+        query = select(*self.movie_columns).order_by(Movie.id)
+        result = self._session.execute(query, execution_options={"yield_per": batch_size})
+
+        for rows in result.partitions():
+            yield from self.__movie_summaries(rows)
+
+    def find_movies_by_ids(self, ids):
+        """
+        Finds movies by their IDs.
+
+        Args:
+            ids (list[int]): The IDs of the movies to find.
+
+        Returns:
+            list[MovieSummary]: The found movies in the order of the IDs.
+        """
+        if not ids:
+            return []
+
+        query = select(*self.movie_columns).where(Movie.id.in_(ids))
+        movies = {movie.id: movie for movie in self.__movie_summaries(
+            self._session.execute(query).all())}
+        return [movies[id] for id in ids if id in movies]
+
+    def find_movie_titles(self):
+        """
+        Finds the titles of all movies together with their popularity.
+
+        Returns:
+            list[tuple[int, str, int]]: The IDs, titles and numbers of users favouring the movies.
+        """
+        query = select(Movie.id, Movie.title, func.count(MovieUserAssociation.user_id)).outerjoin(
+            MovieUserAssociation, MovieUserAssociation.movie_id == Movie.id
+        ).group_by(Movie.id)
+        return [tuple(row) for row in self._session.execute(query)]
+
+    def find_all_users(self):
+        """
+        Finds all users, without their movies.
+
+        Returns:
+            list[UserSummary]: All users in the database.
+        """
+        query = select(User.id, User.username, User.profile_picture)
+        return [UserSummary(*row) for row in self._session.execute(query)]
+
+    def find_favourites(self, user_id):
+        """
+        Finds the IDs and titles of a user's favourite movies.
+
+        Args:
+            user_id (int): The ID of the user.
+
+        Returns:
+            list[tuple[int, str]]: The IDs and titles of the user's favourite movies, ordered
+                                   by ID.
+        """
+        query = select(Movie.id, Movie.title).join(
+            MovieUserAssociation, MovieUserAssociation.movie_id == Movie.id
+        ).where(MovieUserAssociation.user_id == user_id).order_by(Movie.id)
+        return [tuple(row) for row in self._session.execute(query)]
+
+    def find_favourite_summaries(self, user_id):
+        """
+        Finds a user's favourite movies with their personal ratings and genres.
+
+        Args:
+            user_id (int): The ID of the user.
+
+        Returns:
+            list[FavouriteSummary]: The user's favourite movies in the order they were added.
+        """
+        # The implicit rowid of the association table grows with every added favourite
+        query = select(Movie.id, Movie.title, MovieUserAssociation.personal_rating).join(
+            MovieUserAssociation, MovieUserAssociation.movie_id == Movie.id
+        ).where(MovieUserAssociation.user_id == user_id).order_by(
+            literal_column("movie_user.rowid"))
+
+        rows = self._session.execute(query).all()
+        genres = self.__genres_by_movie([row.id for row in rows]) if rows else {}
+        return [FavouriteSummary(*row, genres=genres.get(row.id, ())) for row in rows]
+
+    def find_movie_details_by_titles(self, titles):
+        """
+        Finds the details of movies by their titles, shaped like the movies returned by
+        OmdbClient.find_movie_by_title.
+
+        Args:
+            titles (list[str]): The titles of the movies to find.
+
+        Returns:
+            dict[str, dict]: The details of the found movies keyed by title, containing the title,
+                             release year, rating, poster URL, IMDb ID, genres, directors,
+                             writers and actors.
+        """
+        if not titles:
+            return {}
+
+        rows = self._session.execute(
+            select(*self.movie_columns).where(Movie.title.in_(titles))
+        ).all()
+        return {details["title"]: details for details in self.__movie_details(rows)}
+
+    def find_movie_details_by_ids(self, ids):
+        """
+        Finds the details of movies by their IDs, shaped like the movies returned by
+        OmdbClient.find_movie_by_title.
+
+        Args:
+            ids (list[int]): The IDs of the movies to find.
+
+        Returns:
+            list[dict]: The details of the found movies in the order of the IDs.
+        """
+        if not ids:
+            return []
+
+        rows = self._session.execute(
+            select(*self.movie_columns).where(Movie.id.in_(ids))
+        ).all()
+        details = dict(zip([row.id for row in rows], self.__movie_details(rows)))
+        return [details[id] for id in ids if id in details]
+
+    def find_favourite_ratings(self, user_id=None):
+        """
+        Finds the favourite movies of users together with their personal ratings.
+
+        Args:
+            user_id (int): The ID of the user, or None for the favourites of all users.
+                           Defaults to None.
+
+        Returns:
+            list[tuple[int, int, float or None]]: The user IDs, movie IDs and personal ratings.
+        """
+        query = select(MovieUserAssociation.user_id, MovieUserAssociation.movie_id,
+                       MovieUserAssociation.personal_rating)
+
+        if user_id is not None:
+            query = query.where(MovieUserAssociation.user_id == user_id)
+
+        return [tuple(row) for row in self._session.execute(query)]
+
+    def find_movie_features(self, movie_ids=None):
+        """
+        Finds the genres and crew members of movies.
+
+        Args:
+            movie_ids (list[int]): The IDs of the movies, or None for all movies.
+                                   Defaults to None.
+
+        Returns:
+            tuple[list[tuple[int, int]], list[tuple[int, int, str]]]: The movie and genre IDs,
+                and the movie IDs, crew member IDs and member types.
+        """
+        genre_query = select(MovieGenreAssociation.movie_id, MovieGenreAssociation.genre_id)
+        crew_query = select(MovieCrewMemberAssociation.movie_id,
+                            MovieCrewMemberAssociation.crew_member_id,
+                            MovieCrewMemberAssociation.member_type)
+
+        if movie_ids is not None:
+            genre_query = genre_query.where(MovieGenreAssociation.movie_id.in_(movie_ids))
+            crew_query = crew_query.where(MovieCrewMemberAssociation.movie_id.in_(movie_ids))
+
+        return ([tuple(row) for row in self._session.execute(genre_query)],
+                [tuple(row) for row in self._session.execute(crew_query)])
+
+    def __movie_summaries(self, rows):
+        """
+        Creates movie summaries from rows of movie columns, loading the genres of all movies with
+        a single query.
+
+        Args:
+            rows (list[sqlalchemy.engine.Row]): Rows containing the movie columns.
+
+        Returns:
+            list[MovieSummary]: The movie summaries in the order of the rows.
+        """
+        if not rows:
+            return []
+
+        genres = self.__genres_by_movie([row.id for row in rows])
+        return [MovieSummary(*row, genres=genres.get(row.id, ())) for row in rows]
+
+    def __movie_details(self, rows):
+        """
+        Creates movie details shaped like the movies returned by OmdbClient.find_movie_by_title
+        from rows of movie columns, loading the genres and crew members of all movies with one
+        query each.
+
+        Args:
+            rows (list[sqlalchemy.engine.Row]): Rows containing the movie columns.
+
+        Returns:
+            list[dict]: The movie details in the order of the rows.
+        """
+        movie_ids = [row.id for row in rows]
+        genres = self.__genres_by_movie(movie_ids)
+
+        query = select(MovieCrewMemberAssociation.movie_id,
+                       MovieCrewMemberAssociation.member_type,
+                       CrewMember.full_name).join(
+            CrewMember, CrewMember.id == MovieCrewMemberAssociation.crew_member_id
+        ).where(MovieCrewMemberAssociation.movie_id.in_(movie_ids))
+
+        crew_members = {}
+        for movie_id, member_type, full_name in self._session.execute(query):
+            crew_members.setdefault((movie_id, member_type), []).append(full_name)
+
+        return [{
+            "title": row.title,
+            "release_year": row.release_year,
+            "rating": row.rating,
+            "poster_url": row.poster_url,
+            "imdb_id": row.imdb_id,
+            "genres": [genre.name for genre in genres.get(row.id, ())],
+            "directors": crew_members.get((row.id, "director"), []),
+            "writers": crew_members.get((row.id, "writer"), []),
+            "actors": crew_members.get((row.id, "actor"), []),
+        } for row in rows]
+
+    def __genres_by_movie(self, movie_ids):
+        """
+        Finds the genres of movies with a single query.
+
+        Args:
+            movie_ids (list[int]): The IDs of the movies.
+
+        Returns:
+            dict[int, tuple[GenreSummary]]: The genres keyed by movie ID, movies without genres
+                                            are missing.
+        """
+        query = select(MovieGenreAssociation.movie_id, Genre.id, Genre.name).join(
+            Genre, Genre.id == MovieGenreAssociation.genre_id
+        ).where(
+            MovieGenreAssociation.movie_id.in_(movie_ids)
+        ).order_by(MovieGenreAssociation.movie_id)
+
+        return {
+            movie_id: tuple(GenreSummary(genre_id, name) for _, genre_id, name in movie_genres)
+            for movie_id, movie_genres in groupby(self._session.execute(query), lambda row: row[0])
+        }
+
+
+projections = SQLiteProjections(session=db.session)
@@ -0,0 +1,124 @@
+from hashlib import sha256
+from time import time
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.exc import SQLAlchemyError
+from .entities import UserRecommendations
+from . import db
+
+
+def favourites_fingerprint(movie_ids):
+    """
+    Computes a stable fingerprint of a set of favourite movies, independent of their order.
+
+    Args:
+        movie_ids (Iterable[int]): The IDs of the favourite movies.
+
+    Returns:
+        str: The hex digest of the SHA-256 hash of the sorted movie IDs.
+    """
+    return sha256(",".join(map(str, sorted(movie_ids))).encode()).hexdigest()
+
+
+class SQLiteRecommendationCache:
+    """
+    A persistent cache of the resolved recommendations per user, stored in the SQLite database.
+    Entries are only valid for the favourites fingerprint they were generated from, so they are
+    never served once the favourites changed, and expire after a time to live.
+    """
+
+    def __init__(self, *, session, ttl=7 * 24 * 60 * 60, clock=time):
+        """
+        Initializes the SQLiteRecommendationCache with a database session.
+
+        Args:
+            session (sqlalchemy.orm.Session): The SQLAlchemy session to use for database operations.
+            ttl (float): The number of seconds after which cached recommendations expire, or None
+                         to keep them until the favourites change. Defaults to 7 days.
+            clock (Callable[[], float]): The current unix time. Defaults to time.time.
+        """
+        self._session = session
+        self._ttl = ttl
+        self._clock = clock
+
+    def get(self, user_id, fingerprint):
+        """
+        Gets the cached recommendations of a user.
+
+        Args:
+            user_id (int): The ID of the user.
+            fingerprint (str): The fingerprint of the user's current favourites.
+
+        Returns:
+            list[dict] or None: The cached recommended movies, or None if there are none for the
+                                fingerprint or they expired.
+        """
+        query = select(UserRecommendations.movies).where(
+            UserRecommendations.user_id == user_id,
+            UserRecommendations.fingerprint == fingerprint
+        )
+
+        if self._ttl is not None:
+            query = query.where(UserRecommendations.created_at > self._clock() - self._ttl)
+
+        return self._session.execute(query).scalar_one_or_none()
+
+    def find_fingerprints(self):
+        """
+        Finds the favourites fingerprints of all cached recommendations which didn't expire.
+
+        Returns:
+            dict[int, str]: The fingerprints keyed by user ID.
+        """
+        query = select(UserRecommendations.user_id, UserRecommendations.fingerprint)
+
+        if self._ttl is not None:
+            query = query.where(UserRecommendations.created_at > self._clock() - self._ttl)
+
+        return dict(self._session.execute(query).all())
+
+    def set(self, user_id, fingerprint, movies):
+        """
+        Caches the recommendations of a user, replacing the previous ones.
+
+        Args:
+            user_id (int): The ID of the user.
+            fingerprint (str): The fingerprint of the favourites the recommendations are based on.
+            movies (list[dict]): The recommended movies.
+
+        Raises:
+            SQLAlchemyError: If an error occurs during the database operation.
+        """
+        values = {"user_id": user_id, "fingerprint": fingerprint, "movies": movies,
+                  "created_at": self._clock()}
+        query = insert(UserRecommendations).values(**values).on_conflict_do_update(
+            index_elements=[UserRecommendations.user_id], set_=values
+        )
+
+        try:
+            self._session.execute(query)
+            self._session.commit()
+        except SQLAlchemyError as e:
+            self._session.rollback()
+            raise e
+
+    def invalidate(self, user_id):
+        """
+        Removes the cached recommendations of a user.
+
+        Args:
+            user_id (int): The ID of the user.
+
+        Raises:
+            SQLAlchemyError: If an error occurs during the database operation.
+        """
+        try:
+            self._session.execute(delete(UserRecommendations).where(
+                UserRecommendations.user_id == user_id))
+            self._session.commit()
+        except SQLAlchemyError as e:
+            self._session.rollback()
+            raise e
+
+
+recommendation_cache = SQLiteRecommendationCache(session=db.session)
@@ -1,14 +1,23 @@
-from sqlalchemy import select
+from itertools import islice
+from time import perf_counter
+from sqlalchemy import select, exists, delete
+from sqlalchemy.dialects.sqlite import insert
 from sqlalchemy.exc import NoResultFound, SQLAlchemyError
+from sqlalchemy.orm import selectinload, joinedload
 from .irepository import IRepository
+from .full_text_search import has_full_text_search, defer_full_text_search, \
+    refresh_full_text_search
 from .entities import Movie, Genre, CrewMember, User, MovieCrewMemberAssociation, \
-    MovieUserAssociation
+    MovieUserAssociation, MovieGenreAssociation, UserRecommendations
 from . import db
 
 
 class SQLiteRepository(IRepository):
     """A repository implementation using SQLite as the database."""
 
+    lookup_chunk_size = 500
+    crew_member_types = (("director", "directors"), ("writer", "writers"), ("actor", "actors"))
+
     def __init__(self, *, session):
         """
         Initializes the SQLiteRepository with a database session.
@@ -17,6 +26,7 @@ class SQLiteRepository(IRepository):
             session (sqlalchemy.orm.Session): The SQLAlchemy session to use for database operations.
         """
         self._session = session
+        self._full_text_search = None
 
     def find_all_movies(self):
         """
@@ -78,6 +88,19 @@ class SQLiteRepository(IRepository):
 
         return self._exec_query(query).scalars().all()
 
+    def has_full_text_search(self):
+        """
+        Checks if the database provides the FTS5 full-text index used by
+        SQLiteProjections.search_movies.
+
+        Returns:
+            bool: True if the full-text index can be used, False otherwise.
+        """
+        if self._full_text_search is None:
+            self._full_text_search = has_full_text_search(self._session.connection())
+
+        return self._full_text_search
+
     def has_movie(self, *, id=None, title=None):
         """
         Checks if a movie exists based on either its ID or title.
@@ -90,10 +113,10 @@ class SQLiteRepository(IRepository):
             bool: True if a movie with the given ID or title exists, False otherwise.
         """
         if id:
-            return self.find_movie_by_id(id) is not None
+            return self.__exists(Movie.id == id)
 
         if title:
-            return self.find_movie_by_title(title) is not None
+            return self.__exists(Movie.title == title)
 
         return False
 
@@ -110,7 +133,8 @@ class SQLiteRepository(IRepository):
             actors
     ):
         """
-        Adds a new movie to the database, including its genres and crew members.
+        Adds a new movie to the database, including its genres and crew members. If a movie with
+        the same IMDb ID already exists, it is returned instead.
 
         Args:
             title (str): The title of the movie.
@@ -124,76 +148,134 @@ class SQLiteRepository(IRepository):
             actors (list[str]): A list of actor names for the movie.
 
         Returns:
-            Movie: The newly added Movie object.
+            Movie: The newly added Movie object, or the existing one with the same IMDb ID.
 
         Raises:
             SQLAlchemyError: If any database error occurs during the operation.
         """
-        genres = []
-        for genre_name in genre_names:
-            genre = self.find_genre_by_name(genre_name)
-
-            if not genre:
-                new_genre = self.add_genre(genre_name)
-                genres.append(new_genre)
-            else:
-                genres.append(genre)
+        movie_data = {"genre_names": genre_names,
+                      "directors": directors,
+                      "writers": writers,
+                      "actors": actors}
 
         try:
-            movie = Movie(title=title,
-                          release_year=release_year,
-                          rating=rating,
-                          poster_url=poster_url,
-                          imdb_id=imdb_id,
-                          genres=genres)
-
-            self._session.add(movie)
-            self._session.flush()
+            movie = self._session.scalar(
+                insert(Movie).values(title=title,
+                                     release_year=release_year,
+                                     rating=rating,
+                                     poster_url=poster_url,
+                                     imdb_id=imdb_id).on_conflict_do_nothing().returning(Movie)
+            )
+
+            if movie is None:
+                self._session.commit()
+                return self._exec_query(select(Movie).where(Movie.imdb_id == imdb_id)).scalar_one()
+
+            genre_ids = self.__resolve_ids(Genre, Genre.name, genre_names, {})
+            crew_member_ids = self.__resolve_ids(CrewMember, CrewMember.full_name,
+                                                 [*directors, *writers, *actors], {})
+            self.__insert_associations([(movie.id, movie_data)], genre_ids, crew_member_ids)
+            self._session.commit()
+            return movie
         except SQLAlchemyError as e:
             self._session.rollback()
             raise e
 
-        director_associations = [
-            self.__create_movie_crew_member_association(director, movie.id, member_type="director")
-            for director in directors]
+    def add_movies_bulk(self, movies, batch_size=500):
+        """
+        Adds a stream of movies to the database in batches, including their genres and crew
+        members. Genre and crew member ids are cached by name across batches, associations are
+        inserted with executemany and every batch is committed on its own. Movies whose IMDb ID
+        already exists are skipped.
 
-        writer_associations = [
-            self.__create_movie_crew_member_association(writer, movie.id, member_type="writer")
-            for writer in writers]
+        Args:
+            movies (Iterable[dict]): The movies to add, each a dict with the keyword arguments of
+                                     add_movie (title, release_year, rating, poster_url, imdb_id,
+                                     genre_names, directors, writers, actors).
+            batch_size (int): The number of movies inserted and committed per batch.
+                              Defaults to 500.
 
-        actor_associations = [
-            self.__create_movie_crew_member_association(actor, movie.id, member_type="actor")
-            for actor in actors]
+        Returns:
+            list[dict]: Throughput statistics per committed batch, containing the batch number,
+                        the number of movies, the number of skipped movies, the elapsed seconds
+                        and the movies per second.
 
-        try:
-            self._session.add_all(director_associations)
-            self._session.add_all(writer_associations)
-            self._session.add_all(actor_associations)
-            self._session.commit()
-            return self._exec_query(select(Movie).where(Movie.id == movie.id)).scalar_one()
-        except SQLAlchemyError as e:
-            self._session.rollback()
-            raise e
+        Raises:
+            SQLAlchemyError: If any database error occurs, the current batch is rolled back while
+                             previously committed batches are kept.
+        """
+        genre_ids = {}
+        crew_member_ids = {}
+        stats = []
+        movies = iter(movies)
+
+        while batch := list(islice(movies, batch_size)):
+            start = perf_counter()
+
+            try:
+                new_movies = self.__without_existing_imdb_ids(batch)
+                new_genre_ids = self.__resolve_ids(
+                    Genre, Genre.name,
+                    [name for movie in new_movies for name in movie.get("genre_names", [])],
+                    genre_ids
+                )
+                new_crew_member_ids = self.__resolve_ids(
+                    CrewMember, CrewMember.full_name,
+                    [name for movie in new_movies for _, key in self.crew_member_types
+                     for name in movie.get(key, [])],
+                    crew_member_ids
+                )
+
+                movie_ids = self._session.scalars(
+                    insert(Movie).returning(Movie.id, sort_by_parameter_order=True),
+                    [{"title": movie.get("title"),
+                      "release_year": movie.get("release_year"),
+                      "rating": movie.get("rating"),
+                      "poster_url": movie.get("poster_url"),
+                      "imdb_id": movie.get("imdb_id")} for movie in new_movies]
+                ).all() if new_movies else []
+
+                self.__insert_associations(zip(movie_ids, new_movies),
+                                           {**genre_ids, **new_genre_ids},
+                                           {**crew_member_ids, **new_crew_member_ids})
+                self._session.commit()
+            except SQLAlchemyError as e:
+                self._session.rollback()
+                raise e
+
+            genre_ids.update(new_genre_ids)
+            crew_member_ids.update(new_crew_member_ids)
+
+            elapsed = perf_counter() - start
+            stats.append({
+                "batch": len(stats) + 1,
+                "movies": len(new_movies),
+                "skipped": len(batch) - len(new_movies),
+                "seconds": elapsed,
+                "movies_per_second": len(new_movies) / elapsed if elapsed else None
+            })
+
+        return stats
 
     def add_genre(self, name):
         """
-        Adds a new genre to the database.
+        Adds a new genre to the database, unless a genre with the same name already exists.
 
         Args:
             name (str): The name of the genre to add.
 
         Returns:
-            Genre: The newly added Genre object.
+            Genre: The newly added Genre object, or the existing one with the same name.
 
         Raises:
             SQLAlchemyError: If any database error occurs during the operation.
         """
-        genre = Genre(name=name)
-
         try:
-            self._session.add(genre)
+            genre = self._session.scalar(
+                insert(Genre).values(name=name).on_conflict_do_nothing().returning(Genre)
+            )
             self._session.commit()
-            return self._exec_query(select(Genre).where(Genre.id == genre.id)).scalar_one()
+            return genre or self.find_genre_by_name(name)
         except SQLAlchemyError as e:
             self._session.rollback()
             raise e
@@ -216,25 +298,26 @@ class SQLiteRepository(IRepository):
 
     def add_crew_member(self, full_name):
         """
-        Adds a new crew member to the database.
+        Adds a new crew member to the database, unless a crew member with the same full name
+        already exists.
 
         Args:
             full_name (str): The full name of the crew member to add.
 
         Returns:
-            CrewMember: The newly added CrewMember object.
+            CrewMember: The newly added CrewMember object, or the existing one with the same full
+            name.
 
         Raises:
             SQLAlchemyError: If any database error occurs during the operation.
         """
-        crew_member = CrewMember(full_name=full_name)
-
         try:
-            self._session.add(crew_member)
+            crew_member = self._session.scalar(
+                insert(CrewMember).values(full_name=full_name).on_conflict_do_nothing().returning(
+                    CrewMember)
+            )
             self._session.commit()
-            return self._exec_query(
-                select(CrewMember).where(CrewMember.id == crew_member.id)
-            ).scalar_one()
+            return crew_member or self.find_crew_member_by_name(full_name)
         except SQLAlchemyError as e:
             self._session.rollback()
             raise e
@@ -282,7 +365,7 @@ class SQLiteRepository(IRepository):
 
     def add_user_movie(self, user_id, movie_id):
         """
-        Associates a user with a movie.
+        Associates a user with a movie, dropping the user's cached recommendations.
 
         Args:
             user_id (int): The ID of the user.
@@ -294,6 +377,7 @@ class SQLiteRepository(IRepository):
         try:
             user_movie = MovieUserAssociation(movie_id=movie_id, user_id=user_id)
             self._session.add(user_movie)
+            self.__delete_recommendations(user_id)
             self._session.commit()
         except SQLAlchemyError as e:
             self._session.rollback()
@@ -325,6 +409,31 @@ class SQLiteRepository(IRepository):
         except NoResultFound:
             return None
 
+    def find_user_library(self, user_id):
+        """
+        Finds a user together with their whole favourite movie graph (movies, genres and crew
+        members), eagerly loaded in a fixed number of queries regardless of the library size.
+
+        Args:
+            user_id (int): The ID of the user to find.
+
+        Returns:
+            User or None: The User object with its movie associations loaded, or None if not found.
+        """
+        movie_loader = selectinload(User.movie_associations).joinedload(
+            MovieUserAssociation.movie)
+
+        query = select(User).where(User.id == user_id).options(
+            movie_loader.selectinload(Movie.genres),
+            movie_loader.selectinload(Movie.crew_members).joinedload(
+                MovieCrewMemberAssociation.crew_member)
+        )
+
+        try:
+            return self._exec_query(query).scalar_one()
+        except NoResultFound:
+            return None
+
     def has_user(self, id):
         """
         Checks if a user with the given ID exists.
@@ -335,7 +444,7 @@ class SQLiteRepository(IRepository):
         Returns:
             bool: True if a user with the given ID exists, False otherwise.
         """
-        return self.find_user_by_id(id) is not None
+        return self.__exists(User.id == id)
 
     def find_user_movie(self, user_id, movie_id):
         """
@@ -368,11 +477,13 @@ class SQLiteRepository(IRepository):
         Returns:
             bool: True if the user is associated with the movie, False otherwise.
         """
-        return self.find_user_movie(user_id, movie_id) is not None
+        return self.__exists(MovieUserAssociation.user_id == user_id,
+                             MovieUserAssociation.movie_id == movie_id)
 
     def delete_user_movie(self, user_id, movie_id):
         """
-        Deletes the association between a user and a movie.
+        Deletes the association between a user and a movie, dropping the user's cached
+        recommendations.
 
         Args:
             user_id (int): The ID of the user.
@@ -384,6 +495,7 @@ class SQLiteRepository(IRepository):
         try:
             user_movie = self.find_user_movie(user_id, movie_id)
             self._session.delete(user_movie)
+            self.__delete_recommendations(user_id)
             self._session.commit()
             return True
         except SQLAlchemyError:
@@ -415,6 +527,17 @@ class SQLiteRepository(IRepository):
             self._session.rollback()
             return False
 
+    def __delete_recommendations(self, user_id):
+        """
+        Deletes the cached recommendations of a user within the current transaction, as they
+        are outdated once the user's favourites change.
+
+        Args:
+            user_id (int): The ID of the user.
+        """
+        self._session.execute(delete(UserRecommendations).where(
+            UserRecommendations.user_id == user_id))
+
     def _exec_query(self, query):
         """
         Executes a SQLAlchemy query.
@@ -427,29 +550,123 @@ class SQLiteRepository(IRepository):
         """
         return self._session.execute(query)
 
-    def __create_movie_crew_member_association(self, crew_member_name, movie_id, member_type):
+    def __exists(self, *criteria):
         """
-        Creates an association between a movie and a crew member.
+        Checks with a SELECT EXISTS query if any row matches the given criteria, without loading
+        it.
 
         Args:
-            crew_member_name (str): The full name of the crew member.
-            movie_id (int): The ID of the movie.
-            member_type (str): The type of crew member (e.g., "director", "writer", "actor").
+            *criteria (sqlalchemy.sql.ColumnElement): The WHERE criteria to check.
+
+        Returns:
+            bool: True if a matching row exists, False otherwise.
+        """
+        return self._session.scalar(select(exists().where(*criteria)))
+
+    def __resolve_ids(self, entity, name_column, names, known_ids):
+        """
+        Resolves names of genres or crew members to their ids. Unknown names are inserted with
+        ON CONFLICT DO NOTHING within the current transaction and then looked up in chunks.
+
+        Args:
+            entity (type): The entity class to resolve, either Genre or CrewMember.
+            name_column (sqlalchemy.orm.InstrumentedAttribute): The unique name column of the
+                                                                 entity.
+            names (list[str]): The names to resolve.
+            known_ids (dict[str, int]): Already resolved ids keyed by name, which are skipped.
+
+        Returns:
+            dict[str, int]: The ids of the names not contained in known_ids, keyed by name.
+        """
+        unknown_names = [name for name in dict.fromkeys(names) if name not in known_ids]
+        resolved_ids = {}
+
+        if not unknown_names:
+            return resolved_ids
+
+        self._session.execute(insert(entity).on_conflict_do_nothing(),
+                              [{name_column.key: name} for name in unknown_names])
+
+        for i in range(0, len(unknown_names), self.lookup_chunk_size):
+            chunk = unknown_names[i:i + self.lookup_chunk_size]
+            query = select(name_column, entity.id).where(name_column.in_(chunk))
+            resolved_ids.update(self._exec_query(query).all())
+
+        return resolved_ids
+
+    def __without_existing_imdb_ids(self, movies):
+        """
+        Filters out movies whose IMDb ID already exists in the database or earlier in the given
+        list.
+
+        Args:
+            movies (list[dict]): The movies to filter.
 
         Returns:
-            MovieCrewMemberAssociation: The newly created association object.
+            list[dict]: The movies which can be inserted without violating the IMDb ID uniqueness.
         """
-        crew_member = self.find_crew_member_by_name(crew_member_name)
+        imdb_ids = [movie.get("imdb_id") for movie in movies if movie.get("imdb_id")]
+        seen_imdb_ids = set()
+
+        for i in range(0, len(imdb_ids), self.lookup_chunk_size):
+            chunk = imdb_ids[i:i + self.lookup_chunk_size]
+            query = select(Movie.imdb_id).where(Movie.imdb_id.in_(chunk))
+            seen_imdb_ids.update(self._exec_query(query).scalars())
+
+        new_movies = []
+        for movie in movies:
+            imdb_id = movie.get("imdb_id")
+
+            if imdb_id and imdb_id in seen_imdb_ids:
+                continue
+
+            seen_imdb_ids.add(imdb_id)
+            new_movies.append(movie)
+
+        return new_movies
+
+    def __insert_associations(self, movies, genre_ids, crew_member_ids):
+        """
+        Inserts the genre and crew member associations of movies with executemany. The full-text
+        index triggers are deferred meanwhile, so the movies are indexed once with all their
+        associations instead of once per association.
+
+        Args:
+            movies (Iterable[tuple[int, dict]]): Pairs of movie ID and movie data containing the
+                                                 genre_names, directors, writers and actors.
+            genre_ids (dict[str, int]): The genre ids keyed by name.
+            crew_member_ids (dict[str, int]): The crew member ids keyed by full name.
+        """
+        movies = list(movies)
+        movie_ids = [movie_id for movie_id, _ in movies]
+        full_text_search = self.has_full_text_search()
+        genre_rows = []
+        crew_member_rows = []
+
+        for movie_id, movie in movies:
+            genre_rows.extend(
+                {"movie_id": movie_id, "genre_id": genre_ids[name]}
+                for name in dict.fromkeys(movie.get("genre_names", []))
+            )
+            crew_member_rows.extend(
+                {"movie_id": movie_id,
+                 "crew_member_id": crew_member_ids[name],
+                 "member_type": member_type}
+                for member_type, key in self.crew_member_types
+                for name in dict.fromkeys(movie.get(key, []))
+            )
+
+        if full_text_search:
+            defer_full_text_search(self._session.connection(), movie_ids)
+
+        if genre_rows:
+            self._session.execute(insert(MovieGenreAssociation), genre_rows)
 
-        if crew_member:
-            crew_member_id = crew_member.id
-        else:
-            new_crew_member = self.add_crew_member(crew_member_name)
-            crew_member_id = new_crew_member.id
+        if crew_member_rows:
+            self._session.execute(insert(MovieCrewMemberAssociation), crew_member_rows)
 
-        return MovieCrewMemberAssociation(movie_id=movie_id,
-                                          crew_member_id=crew_member_id,
-                                          member_type=member_type)
+        if full_text_search:
+            refresh_full_text_search(self._session.connection(), movie_ids)
 
 
 repo = SQLiteRepository(session=db.session)
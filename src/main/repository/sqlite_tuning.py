@@ -0,0 +1,60 @@
+from sqlalchemy import event
+
+# Lets readers proceed while a writer commits and trades a little durability on power loss for
+# far fewer fsyncs, which is the recommended setup for SQLite serving a web application.
+WAL_PROFILE = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 5000,  # 5s
+    "cache_size": -64000,  # 64MB
+    "mmap_size": 256 * 1024 * 1024,  # 256MB
+    "temp_store": "MEMORY",
+}
+
+
+def apply_pragmas(engine, pragmas):
+    """
+    Registers a listener setting the given pragmas on every new connection of a SQLite engine.
+
+    Args:
+        engine (sqlalchemy.engine.Engine): The engine to configure.
+        pragmas (dict[str, object] or None): The pragma values keyed by pragma name, e.g.
+                                             WAL_PROFILE. Nothing is registered if empty or None.
+    """
+    if not pragmas or engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name} = {value}")
+        finally:
+            cursor.close()
+
+
+def interrupt_on_deadline(engine, current_deadline, instructions=10000):
+    """
+    Registers a listener installing a progress handler on every new connection of a SQLite
+    engine, which interrupts a running query once the deadline of the current request has
+    passed. The interrupted query raises an OperationalError.
+
+    Args:
+        engine (sqlalchemy.engine.Engine): The engine to configure.
+        current_deadline (Callable[[], Deadline or None]): Gets the deadline of the current
+            request, see concurrency.deadline.current_deadline.
+        instructions (int): The number of virtual machine instructions between two checks of the
+                            deadline. Defaults to 10000.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+
+    def is_expired():
+        deadline = current_deadline()
+        return deadline is not None and deadline.expired
+
+    @event.listens_for(engine, "connect")
+    def set_progress_handler(dbapi_connection, connection_record):
+        dbapi_connection.set_progress_handler(is_expired, instructions)
@@ -0,0 +1,297 @@
+import re
+import unicodedata
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from heapq import nlargest
+from math import ceil
+from threading import Lock
+from .sqlite_projections import projections
+
+NON_WORD_CHARACTERS = re.compile(r"[\W_]+")
+WORD_STARTS = re.compile(r"(?<= )\S")
+
+
+def normalize_for_index(title):
+    """
+    Normalizes a title or prefix for the title index by stripping accents, case folding and
+    replacing punctuation with single spaces, e.g. "Amélie: Spider-Man" becomes
+    "amelie spider man".
+
+    Args:
+        title (str): The title or prefix to normalize.
+
+    Returns:
+        str: The normalized title.
+    """
+    if not title.isascii():
+        decomposed = unicodedata.normalize("NFKD", title)
+        title = "".join(char for char in decomposed if not unicodedata.combining(char))
+
+    return " ".join(NON_WORD_CHARACTERS.sub(" ", title.casefold()).split())
+
+
+def title_trigrams(key):
+    """
+    Splits a normalized title into the trigrams of its words, each padded with two spaces in
+    front and one behind like in PostgreSQL's pg_trgm, e.g. "heat" becomes "  h", " he", "hea",
+    "eat" and "at ".
+
+    Args:
+        key (str): The normalized title.
+
+    Returns:
+        set[str]: The trigrams of the title.
+    """
+    trigrams = set()
+
+    for word in key.split():
+        padded = f"  {word} "
+        trigrams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+
+    return trigrams
+
+
+class TitleIndex:
+    """
+    An in-memory prefix index over the titles of all movies for search-as-you-type without
+    querying the database. Normalized titles are kept in a sorted array which is searched with
+    bisect, so a lookup takes logarithmic time in the number of titles. A second sorted array
+    holds the title suffixes starting at every further word, so "knight" finds
+    "The Dark Knight" after the titles starting with it.
+
+    Equal titles are ordered by popularity, i.e. the number of users favouring them, and then
+    by ID. The index is built from the database once and updated incrementally as movies are
+    added by this process.
+
+    For typo tolerant matching, an inverted index maps the trigrams of the titles to the movies
+    containing them, ranking movies by the trigram similarity of their titles.
+    """
+
+    def __init__(self, *, load_titles):
+        """
+        Initializes an empty TitleIndex, which is built on first use.
+
+        Args:
+            load_titles (Callable[[], list[tuple[int, str, int]]]): Loads the IDs, titles and
+                popularity of all movies, see SQLiteProjections.find_movie_titles.
+        """
+        self._load_titles = load_titles
+        self._lock = Lock()
+        self.__clear()
+        self._stale = True
+
+    def __len__(self):
+        """Returns the number of indexed movies."""
+        return len(self._keys_by_id)
+
+    def rebuild(self):
+        """Rebuilds the index from the database."""
+        title_entries = sorted((normalize_for_index(title), -popularity, movie_id)
+                               for movie_id, title, popularity in self._load_titles())
+        word_entries = []
+        postings = {}
+        trigram_counts = {}
+
+        for key, _, movie_id in title_entries:
+            word_entries.extend((word_key, movie_id) for word_key in self.__word_keys(key))
+            trigrams = title_trigrams(key)
+            trigram_counts[movie_id] = len(trigrams)
+
+            for trigram in trigrams:
+                postings.setdefault(trigram, []).append(movie_id)
+
+        # Sorting is stable, so equal keys keep the order by popularity and ID
+        word_entries.sort(key=lambda entry: entry[0])
+
+        with self._lock:
+            self.__clear()
+            self._title_keys = [key for key, _, _ in title_entries]
+            self._title_ids = [movie_id for _, _, movie_id in title_entries]
+            self._word_keys = [key for key, _ in word_entries]
+            self._word_ids = [movie_id for _, movie_id in word_entries]
+            self._keys_by_id = {movie_id: key for key, _, movie_id in title_entries}
+            self._postings = postings
+            self._trigram_counts = trigram_counts
+            self._stale = False
+
+    def invalidate(self):
+        """Marks the index as stale, so it is rebuilt on next use, e.g. after a bulk import."""
+        with self._lock:
+            self._stale = True
+
+    def add(self, movie_id, title):
+        """
+        Adds a new movie to the index, unless it is indexed already. Its popularity is zero, so
+        it is ordered after the movies with the same title.
+
+        Args:
+            movie_id (int): The ID of the movie.
+            title (str): The title of the movie.
+        """
+        key = normalize_for_index(title)
+
+        with self._lock:
+            if self._stale or movie_id in self._keys_by_id:
+                return
+
+            self.__insert(self._title_keys, self._title_ids, key, movie_id)
+
+            for word_key in self.__word_keys(key):
+                self.__insert(self._word_keys, self._word_ids, word_key, movie_id)
+
+            trigrams = title_trigrams(key)
+
+            for trigram in trigrams:
+                self._postings.setdefault(trigram, []).append(movie_id)
+
+            self._keys_by_id[movie_id] = key
+            self._trigram_counts[movie_id] = len(trigrams)
+
+    def search(self, prefix, limit=10):
+        """
+        Finds the movies whose title or one of its words starts with a prefix. Matches of the
+        whole title come first, in alphabetical order of the titles.
+
+        Args:
+            prefix (str): The prefix to search for.
+            limit (int): The maximum number of movies. Defaults to 10.
+
+        Returns:
+            list[int]: The IDs of the matching movies.
+        """
+        if self._stale:
+            self.rebuild()
+
+        key = normalize_for_index(prefix)
+
+        if not key:
+            return []
+
+        with self._lock:
+            movie_ids = self.__matches(self._title_keys, self._title_ids, key, limit, [])
+            return self.__matches(self._word_keys, self._word_ids, key, limit, movie_ids)
+
+    def find_similar(self, title, limit=10, threshold=0.5):
+        """
+        Finds the movies whose titles are most similar to a possibly misspelled title, measured
+        by the Jaccard similarity of their trigrams.
+
+        Only movies sharing at least threshold times the number of trigrams of the title can
+        reach the threshold, so candidates are only collected from the posting lists of its
+        rarest trigrams, skipping the lists of common trigrams like "the". Candidates which
+        can't reach the threshold even if they contained all skipped trigrams are dropped before
+        their similarity is computed.
+
+        Args:
+            title (str): The title to match.
+            limit (int): The maximum number of movies. Defaults to 10.
+            threshold (float): The minimum similarity between 0 and 1. Defaults to 0.5.
+
+        Returns:
+            list[tuple[int, float]]: The IDs and similarities of the matching movies, most
+                                     similar first.
+        """
+        if self._stale:
+            self.rebuild()
+
+        trigrams = title_trigrams(normalize_for_index(title))
+
+        if not trigrams:
+            return []
+
+        skipped = max(1, ceil(threshold * len(trigrams))) - 1
+        matches = []
+
+        with self._lock:
+            postings = sorted((self._postings.get(trigram, ()) for trigram in trigrams), key=len)
+            candidates = Counter()
+
+            for posting in postings[:len(trigrams) - skipped]:
+                candidates.update(posting)
+
+            for movie_id, hits in candidates.items():
+                count = self._trigram_counts[movie_id]
+                shared = min(hits + skipped, count)
+
+                if shared < threshold * (len(trigrams) + count - shared):
+                    continue
+
+                shared = len(trigrams & title_trigrams(self._keys_by_id[movie_id]))
+                similarity = shared / (len(trigrams) + count - shared)
+
+                if similarity >= threshold:
+                    matches.append((movie_id, similarity))
+
+        return nlargest(limit, matches, key=lambda match: (match[1], -match[0]))
+
+    def find_corrections(self, title, limit=10, threshold=0.5):
+        """
+        Finds the movies whose titles the title is likely a misspelling of, see find_similar.
+        Titles which rather belong to another movie of the same series missing locally aren't
+        corrections, so titles starting with the title's words or vice versa, like "Heat 2" and
+        "Heat", and titles longer than the title, like "Aliens" for "Alien", are skipped.
+
+        Args:
+            title (str): The title to match.
+            limit (int): The maximum number of movies. Defaults to 10.
+            threshold (float): The minimum similarity between 0 and 1. Defaults to 0.5.
+
+        Returns:
+            list[tuple[int, float]]: The IDs and similarities of the matching movies, most
+                                     similar first.
+        """
+        key = normalize_for_index(title)
+        matches = self.find_similar(title, limit, threshold)
+
+        with self._lock:
+            keys = [self._keys_by_id.get(movie_id, "") for movie_id, _ in matches]
+
+        return [match for match, match_key in zip(matches, keys)
+                if len(key) >= len(match_key)
+                and not key.startswith(match_key + " ") and not match_key.startswith(key + " ")]
+
+    def __clear(self):
+        """Empties the index."""
+        self._title_keys, self._title_ids = [], []
+        self._word_keys, self._word_ids = [], []
+        self._keys_by_id = {}
+        self._postings = {}
+        self._trigram_counts = {}
+
+    def __word_keys(self, key):
+        """Returns the suffixes of a normalized title starting at every word but the first."""
+        return [key[match.start():] for match in WORD_STARTS.finditer(key)]
+
+    def __insert(self, keys, ids, key, movie_id):
+        """Inserts a key and its movie ID after the equal keys. Must be called holding the lock."""
+        position = bisect_right(keys, key)
+        keys.insert(position, key)
+        ids.insert(position, movie_id)
+
+    def __matches(self, keys, ids, prefix, limit, movie_ids):
+        """
+        Collects the IDs of the keys starting with a prefix. Must be called holding the lock.
+
+        Args:
+            keys (list[str]): The sorted keys.
+            ids (list[int]): The movie IDs of the keys.
+            prefix (str): The normalized prefix.
+            limit (int): The maximum number of movie IDs.
+            movie_ids (list[int]): The IDs collected so far, which is extended.
+
+        Returns:
+            list[int]: The distinct collected movie IDs.
+        """
+        position = bisect_left(keys, prefix)
+
+        while len(movie_ids) < limit and position < len(keys) \
+                and keys[position].startswith(prefix):
+            if ids[position] not in movie_ids:
+                movie_ids.append(ids[position])
+
+            position += 1
+
+        return movie_ids
+
+
+title_index = TitleIndex(load_titles=projections.find_movie_titles)
@@ -0,0 +1,117 @@
+from concurrent.futures import TimeoutError
+from contextvars import copy_context
+from time import monotonic
+
+
+class MovieSearch:
+    """
+    Searches movies in the local database and on the OMDB API concurrently under one latency
+    budget. Local movies are ranked first and OMDB results duplicating them are dropped. If the
+    OMDB search misses the deadline or fails, the local results are returned as partial results.
+
+    If local movies closely match a misspelled title, they are returned right away without
+    searching the OMDB API at all.
+    """
+
+    def __init__(self, *, find_local_movies, omdb_client, executor, timeout=1.5,
+                 find_close_movies=None, current_deadline=None, clock=monotonic, logger=None):
+        """
+        Initializes a MovieSearch.
+
+        Args:
+            find_local_movies (Callable[[str], list]): Finds local movies by title, returning
+                objects providing a to_dict method, e.g. SQLiteProjections.find_movies_like.
+            omdb_client (OmdbClient): The client searching the OMDB API.
+            executor (concurrent.futures.Executor): The thread pool running the OMDB searches.
+            timeout (float): The latency budget of a search in seconds. Defaults to 1.5.
+            find_close_movies (Callable[[str], list]): Finds local movies whose titles are
+                similar enough to the title to skip the OMDB search, returning objects providing
+                a to_dict method. Defaults to None, always searching the OMDB API.
+            current_deadline (Callable[[], Deadline or None]): Gets the deadline of the current
+                request, which the latency budget is clipped to, see
+                concurrency.deadline.current_deadline. Defaults to None.
+            clock (Callable[[], float]): The time source in seconds. Defaults to time.monotonic.
+            logger (logging.Logger): The logger for failed OMDB searches. Defaults to None.
+        """
+        self._find_local_movies = find_local_movies
+        self._find_close_movies = find_close_movies
+        self._current_deadline = current_deadline
+        self._omdb_client = omdb_client
+        self._executor = executor
+        self._timeout = timeout
+        self._clock = clock
+        self._logger = logger
+
+    def search(self, title):
+        """
+        Searches movies by title. The local search runs on the calling thread while the OMDB
+        search runs on the thread pool, so it may use the caller's database session. An OMDB
+        search missing the deadline isn't cancelled and still fills the OMDB cache, if any, unless
+        the deadline of the request cuts it short as well.
+
+        Args:
+            title (str): The title to search for.
+
+        Returns:
+            dict: The total number of results, the local movies followed by the OMDB movies
+                  which aren't stored locally, and whether the results are partial because the
+                  OMDB search missed the deadline or failed.
+        """
+        close_movies = self._find_close_movies(title) if self._find_close_movies else []
+
+        if close_movies:
+            movies = self.__merge([movie.to_dict() for movie in self._find_local_movies(title)],
+                                  [movie.to_dict() for movie in close_movies])
+            return {"total_results": len(movies), "results": movies, "partial": False}
+
+        timeout = self._timeout
+        request_deadline = self._current_deadline() if self._current_deadline else None
+
+        if request_deadline is not None:
+            timeout = min(timeout, request_deadline.remaining())
+
+        deadline = self._clock() + timeout
+        omdb_search = self._executor.submit(copy_context().run, self._omdb_client.search_movies,
+                                            title)
+
+        local_movies = [movie.to_dict() for movie in self._find_local_movies(title)]
+        omdb_movies, partial = [], False
+
+        try:
+            omdb_movies = omdb_search.result(timeout=max(0.0, deadline - self._clock()))["results"]
+        except ValueError:
+            pass  # No movies found
+        except TimeoutError:
+            partial = True
+        except Exception as e:
+            partial = True
+
+            if self._logger:
+                self._logger.warning(f"OMDB search for '{title}' failed: {e}")
+
+        movies = self.__merge(local_movies, omdb_movies)
+        return {"total_results": len(movies), "results": movies, "partial": partial}
+
+    def __merge(self, local_movies, omdb_movies):
+        """
+        Merges the local and OMDB movies, dropping duplicates by IMDb ID or, without one, by
+        title.
+
+        Args:
+            local_movies (list[dict]): The local movies.
+            omdb_movies (list[dict]): The OMDB movies.
+
+        Returns:
+            list[dict]: The distinct movies, local ones first.
+        """
+        seen = set()
+        movies = []
+
+        for movie in local_movies + omdb_movies:
+            key = movie.get("imdb_id") or movie.get("title")
+
+            if key not in seen:
+                seen.add(key)
+                movies.append(movie)
+
+        return movies
@@ -0,0 +1,21 @@
+import pytest
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+        self.step = 0.0  # Seconds passing on every reading
+        self.sleeps = []
+
+    def __call__(self):
+        self.now += self.step
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture(scope="function")
+def clock():
+    return FakeClock()
@@ -0,0 +1,173 @@
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from main.repository import Base
+from main.repository.caching_repository import CachingRepository
+from main.repository.lru_cache import LRUCache, MISSING
+from main.repository.sqlite_projections import SQLiteProjections
+from main.repository.sqlite_repository import SQLiteRepository
+from main.repository.title_index import TitleIndex
+
+TEST_DB_URI = "sqlite:///:memory:"
+
+engine = create_engine(TEST_DB_URI)
+Session = sessionmaker(bind=engine)
+
+
+@pytest.fixture(scope="function")
+def session():
+    Base.metadata.create_all(engine)
+    session_ = Session()
+
+    try:
+        yield session_
+    finally:
+        session_.rollback()
+        session_.close()
+        Base.metadata.drop_all(engine)
+
+
+@pytest.fixture(scope="function")
+def repo(session):
+    return CachingRepository(repository=SQLiteRepository(session=session), session=session)
+
+
+@pytest.fixture(scope="function")
+def statements():
+    executed = []
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count_statement)
+
+    try:
+        yield executed
+    finally:
+        event.remove(engine, "before_cursor_execute", count_statement)
+
+
+def add_movie(repo, title, imdb_id="tt1"):
+    return repo.add_movie(title=title, release_year=2020, rating=7.0, poster_url="",
+                          imdb_id=imdb_id, genre_names=["Drama"], directors=["Jane Doe"],
+                          writers=[], actors=[])
+
+
+class TestLRUCache:
+    def test_get_and_set(self):
+        cache = LRUCache(max_size=2, ttl=10)
+        cache.set("key", None)
+        assert cache.get("key") is None
+        assert cache.get("other") is MISSING
+        assert cache.stats() == {"hits": 1, "misses": 1, "size": 1}
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(max_size=2, ttl=10)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert cache.get("b") is MISSING
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+
+    def test_expires_after_ttl(self):
+        now = [0]
+        cache = LRUCache(max_size=2, ttl=10, clock=lambda: now[0])
+        cache.set("a", 1)
+        now[0] = 9
+        assert cache.get("a") == 1
+        now[0] = 10
+        assert cache.get("a") is MISSING
+        assert cache.stats()["size"] == 0
+
+
+class TestCachingRepository:
+    def test_find_movie_by_id_cached(self, repo, session, statements):
+        movie = add_movie(repo, "Cached")
+        assert repo.find_movie_by_id(movie.id).title == "Cached"
+
+        statements.clear()
+        assert repo.find_movie_by_id(movie.id).title == "Cached"
+        assert repo.find_movie_by_title("Cached").id == movie.id
+        assert repo.has_movie(id=movie.id) is True
+        assert repo.has_movie(title="Cached") is True
+        assert statements == []
+        assert repo.stats()["movies"]["hits"] == 4
+
+    def test_cached_movie_usable_in_new_session(self, repo, session):
+        movie_id = add_movie(repo, "Cached").id
+        assert repo.find_movie_by_id(movie_id).genres[0].name == "Drama"
+        session.commit()
+        session.close()
+
+        cached_movie = repo.find_movie_by_id(movie_id)
+        assert cached_movie in session
+        assert cached_movie.title == "Cached"
+        assert cached_movie.genres[0].name == "Drama"
+
+    def test_cached_movie_not_shared_across_sessions(self, repo, session):
+        movie_id = add_movie(repo, "Cached").id
+        cached_movie = repo.find_movie_by_id(movie_id)
+        session.commit()
+        session.close()
+        assert repo.find_movie_by_id(movie_id) is not cached_movie
+
+    def test_not_found_not_cached(self, repo, session):
+        assert repo.find_movie_by_title("Later") is None
+        assert repo.has_movie(title="Later") is False
+        SQLiteRepository(session=session).add_movie(
+            title="Later", release_year=2020, rating=7.0, poster_url="", imdb_id="tt1",
+            genre_names=[], directors=[], writers=[], actors=[])
+        assert repo.find_movie_by_title("Later") is not None
+        assert repo.has_movie(title="Later") is True
+
+    def test_add_movies_bulk(self, repo):
+        assert repo.find_movie_by_id(1) is None
+        repo.add_movies_bulk([{"title": "Bulk", "imdb_id": "tt1", "genre_names": ["Drama"]}])
+        assert repo.find_movie_by_id(1) is not None
+        assert repo.find_movie_by_title("Bulk") is not None
+
+    def test_added_movies_update_title_index(self, session):
+        title_index = TitleIndex(load_titles=SQLiteProjections(session=session).find_movie_titles)
+        repo = CachingRepository(repository=SQLiteRepository(session=session), session=session,
+                                 title_index=title_index)
+        title_index.rebuild()
+        movie = add_movie(repo, "Later")
+        assert title_index.search("lat") == [movie.id]
+        repo.add_movies_bulk([{"title": "Latest", "imdb_id": "tt2", "genre_names": []}])
+        assert len(title_index.search("lat")) == 2
+
+    def test_find_genre_and_crew_member_cached(self, repo, statements):
+        assert repo.find_genre_by_name("Drama") is None
+        assert repo.find_crew_member_by_name("Jane Doe") is None
+        repo.add_genre("Drama")
+        repo.add_crew_member("Jane Doe")
+        assert repo.find_genre_by_name("Drama") is not None
+        assert repo.find_crew_member_by_name("Jane Doe") is not None
+
+        statements.clear()
+        assert repo.find_genre_by_name("Drama").name == "Drama"
+        assert repo.find_crew_member_by_name("Jane Doe").full_name == "Jane Doe"
+        assert not [statement for statement in statements if "name = ?" in statement]
+
+    def test_add_user(self, repo):
+        assert repo.has_user(1) is False
+        assert repo.find_user_by_id(1) is None
+        repo.add_user("user", None)
+        assert repo.has_user(1) is True
+        assert repo.find_user_by_id(1).username == "user"
+
+    def test_user_movie_changes(self, repo):
+        user = repo.add_user("user", None)
+        movie = add_movie(repo, "Favourite")
+        assert repo.has_user_movie(user.id, movie.id) is False
+        assert repo.find_user_by_id(user.id).movies == []
+
+        repo.add_user_movie(user.id, movie.id)
+        assert repo.has_user_movie(user.id, movie.id) is True
+        assert [movie.title for movie in repo.find_user_by_id(user.id).movies] == ["Favourite"]
+
+        repo.delete_user_movie(user.id, movie.id)
+        assert repo.has_user_movie(user.id, movie.id) is False
+        assert repo.find_user_by_id(user.id).movies == []
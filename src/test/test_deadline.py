@@ -0,0 +1,65 @@
+import pytest
+from main.concurrency.deadline import Deadline, DeadlineExceededError, current_deadline, \
+    deadline_scope, end_deadline, start_deadline
+
+
+class TestDeadline:
+    def test_remaining(self, clock):
+        deadline = Deadline(2, clock)
+        clock.now += 0.5
+        assert deadline.remaining() == 1.5
+        assert not deadline.expired
+        clock.now += 2
+        assert deadline.remaining() == 0.0
+        assert deadline.expired
+
+    def test_clip(self, clock):
+        deadline = Deadline(2, clock)
+        assert deadline.clip(5) == 2
+        assert deadline.clip(1) == 1
+        assert deadline.clip((3.05, 10)) == (2, 2)
+        assert deadline.clip(None) == 2
+
+    def test_clip_after_deadline(self, clock):
+        deadline = Deadline(2, clock)
+        clock.now += 2
+
+        with pytest.raises(DeadlineExceededError):
+            deadline.clip(5)
+
+    def test_is_timeout(self):
+        assert isinstance(DeadlineExceededError(), TimeoutError)
+
+
+class TestDeadlineScope:
+    def test_sets_current_deadline(self, clock):
+        assert current_deadline() is None
+
+        with deadline_scope(2, clock) as deadline:
+            assert current_deadline() is deadline
+            assert deadline.remaining() == 2
+
+        assert current_deadline() is None
+
+    def test_nested_scope_only_shortens(self, clock):
+        with deadline_scope(2, clock) as outer:
+            with deadline_scope(5, clock) as inner:
+                assert inner is outer
+
+            with deadline_scope(1, clock) as inner:
+                assert inner.remaining() == 1
+
+            assert current_deadline() is outer
+
+    def test_none_lifts_deadline(self, clock):
+        with deadline_scope(2, clock):
+            with deadline_scope(None):
+                assert current_deadline() is None
+
+            assert current_deadline() is not None
+
+    def test_start_and_end(self, clock):
+        token = start_deadline(2, clock)
+        assert current_deadline().remaining() == 2
+        end_deadline(token)
+        assert current_deadline() is None
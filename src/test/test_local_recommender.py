@@ -0,0 +1,102 @@
+import pytest
+from main.recommendations.local_recommender import LocalRecommender
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.favourites = []
+        self.genres = []
+        self.crew_members = []
+        self.full_loads = 0
+
+    def load_favourites(self, user_id):
+        if user_id is None:
+            self.full_loads += 1
+            return list(self.favourites)
+
+        return [row for row in self.favourites if row[0] == user_id]
+
+    def load_features(self, movie_ids):
+        return ([row for row in self.genres if movie_ids is None or row[0] in movie_ids],
+                [row for row in self.crew_members if movie_ids is None or row[0] in movie_ids])
+
+
+@pytest.fixture(scope="function")
+def database():
+    return FakeDatabase()
+
+
+def create_recommender(database, clock, **weights):
+    return LocalRecommender(load_favourites=database.load_favourites,
+                            load_features=database.load_features,
+                            weights=weights or None, max_age=60, clock=clock)
+
+
+class TestLocalRecommender:
+    def test_recommends_co_favourites(self, database, clock):
+        database.favourites = [(1, 10, None), (2, 10, None), (2, 20, None), (3, 10, None),
+                               (3, 20, None), (3, 30, None), (4, 40, None)]
+        recommender = create_recommender(database, clock)
+        assert recommender.recommend(1) == [20, 30]
+
+    def test_weights_personal_ratings(self, database, clock):
+        database.favourites = [(1, 10, 10.0), (1, 11, 1.0), (2, 10, None), (2, 20, None),
+                               (3, 11, None), (3, 30, None)]
+        recommender = create_recommender(database, clock)
+        assert recommender.recommend(1) == [20, 30]
+
+    def test_recommends_similar_genres(self, database, clock):
+        database.favourites = [(1, 10, None)]
+        database.genres = [(10, 1), (10, 2), (20, 1), (20, 2), (30, 1), (30, 3), (40, 3)]
+        recommender = create_recommender(database, clock)
+        assert recommender.recommend(1) == [20, 30]
+
+    def test_recommends_shared_crew(self, database, clock):
+        database.favourites = [(1, 10, None)]
+        database.crew_members = [(10, 100, "director"), (10, 101, "actor"), (20, 101, "actor"),
+                                 (30, 100, "director"), (40, 102, "director")]
+        recommender = create_recommender(database, clock)
+        assert recommender.recommend(1) == [30, 20]
+
+    def test_excludes_favourites_and_limits(self, database, clock):
+        database.favourites = [(1, 10, None), (1, 20, None)]
+        database.genres = [(movie_id, 1) for movie_id in range(10, 100, 10)]
+        recommender = create_recommender(database, clock)
+        recommendations = recommender.recommend(1, k=3)
+        assert len(recommendations) == 3
+        assert not {10, 20} & set(recommendations)
+
+    def test_no_favourites(self, database, clock):
+        database.genres = [(10, 1)]
+        assert create_recommender(database, clock).recommend(1) == []
+
+    def test_refreshes_user_incrementally(self, database, clock):
+        database.favourites = [(2, 10, None), (2, 20, None)]
+        database.genres = [(30, 1)]
+        recommender = create_recommender(database, clock)
+        assert recommender.recommend(1) == []
+        database.favourites.append((1, 10, None))
+        database.genres.append((10, 1))
+        assert recommender.recommend(1) == [20, 30]
+        database.favourites.remove((1, 10, None))
+        assert recommender.recommend(1) == []
+        assert database.full_loads == 1
+
+    def test_rebuilds_after_max_age(self, database, clock):
+        database.favourites = [(1, 10, None)]
+        recommender = create_recommender(database, clock)
+        assert recommender.recommend(1) == []
+        database.favourites += [(2, 10, None), (2, 20, None)]
+        assert recommender.recommend(1) == []
+        clock.now += 60
+        assert recommender.recommend(1) == [20]
+        assert database.full_loads == 2
+
+    def test_refresh_invalidates_neighbours_of_co_favourites(self, database, clock):
+        database.favourites = [(3, 10, None), (4, 10, None), (4, 20, None), (5, 10, None),
+                               (5, 30, None)]
+        recommender = create_recommender(database, clock)
+        assert recommender.recommend(3) == [20, 30]
+        database.favourites.append((1, 20, None))
+        recommender.recommend(1)
+        assert recommender.recommend(3) == [30, 20]
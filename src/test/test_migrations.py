@@ -0,0 +1,92 @@
+import pytest
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.exc import IntegrityError
+from main.repository.migrations import migrate
+
+LEGACY_SCHEMA = [
+    "CREATE TABLE movies (id INTEGER NOT NULL, imdb_id VARCHAR, title VARCHAR, "
+    "release_year INTEGER, rating FLOAT, poster_url VARCHAR, PRIMARY KEY (id))",
+    "CREATE TABLE users (id INTEGER NOT NULL, username VARCHAR, profile_picture VARCHAR, "
+    "PRIMARY KEY (id))",
+    "CREATE TABLE genres (id INTEGER NOT NULL, name VARCHAR, PRIMARY KEY (id))",
+    "CREATE TABLE crew_members (id INTEGER NOT NULL, full_name VARCHAR, PRIMARY KEY (id))",
+    "CREATE TABLE movie_user (movie_id INTEGER NOT NULL, user_id INTEGER NOT NULL, "
+    "personal_rating FLOAT, PRIMARY KEY (movie_id, user_id))",
+    "CREATE TABLE movie_crew_member (movie_id INTEGER NOT NULL, crew_member_id INTEGER NOT NULL, "
+    "member_type VARCHAR NOT NULL, PRIMARY KEY (movie_id, crew_member_id, member_type))",
+    "CREATE TABLE movie_genre (movie_id INTEGER NOT NULL, genre_id INTEGER NOT NULL, "
+    "PRIMARY KEY (movie_id, genre_id))",
+]
+
+LEGACY_DATA = [
+    "INSERT INTO movies (id, imdb_id, title) VALUES (1, 'tt1', 'Movie'), (2, 'tt1', 'Movie'), "
+    "(3, '', 'No IMDb'), (4, '', 'No IMDb Either')",
+    "INSERT INTO users (id, username) VALUES (1, 'user')",
+    "INSERT INTO genres (id, name) VALUES (1, 'Drama'), (2, 'Drama'), (3, 'Action')",
+    "INSERT INTO crew_members (id, full_name) VALUES (1, 'Jane Doe'), (2, 'Jane Doe')",
+    "INSERT INTO movie_user (movie_id, user_id) VALUES (1, 1), (2, 1)",
+    "INSERT INTO movie_genre (movie_id, genre_id) VALUES (1, 1), (2, 2), (2, 3)",
+    "INSERT INTO movie_crew_member (movie_id, crew_member_id, member_type) "
+    "VALUES (1, 1, 'director'), (2, 2, 'director'), (2, 2, 'writer')",
+]
+
+
+@pytest.fixture(scope="function")
+def legacy_engine():
+    engine = create_engine("sqlite:///:memory:")
+
+    with engine.begin() as connection:
+        for statement in LEGACY_SCHEMA + LEGACY_DATA:
+            connection.execute(text(statement))
+
+    try:
+        yield engine
+    finally:
+        engine.dispose()
+
+
+def query(engine, statement):
+    with engine.connect() as connection:
+        return connection.execute(text(statement)).all()
+
+
+class TestMigrations:
+    def test_migrate_merges_duplicates(self, legacy_engine):
+        migrate(legacy_engine)
+        assert query(legacy_engine, "SELECT id FROM movies ORDER BY id") == [(1,), (3,), (4,)]
+        assert query(legacy_engine, "SELECT id FROM genres ORDER BY id") == [(1,), (3,)]
+        assert query(legacy_engine, "SELECT id FROM crew_members") == [(1,)]
+        assert query(legacy_engine, "SELECT movie_id, user_id FROM movie_user") == [(1, 1)]
+        assert query(legacy_engine, "SELECT movie_id, genre_id FROM movie_genre "
+                                    "ORDER BY genre_id") == [(1, 1), (1, 3)]
+        assert query(legacy_engine, "SELECT movie_id, crew_member_id, member_type "
+                                    "FROM movie_crew_member ORDER BY member_type") == [
+                   (1, 1, "director"), (1, 1, "writer")]
+
+    def test_migrate_creates_indexes(self, legacy_engine):
+        migrate(legacy_engine)
+        inspector = inspect(legacy_engine)
+        assert {index["name"] for index in inspector.get_indexes("movies")} == {
+            "ix_movies_imdb_id", "ix_movies_title"}
+        assert {index["name"] for index in inspector.get_indexes("movie_user")} == {
+            "ix_movie_user_user_id"}
+
+        with pytest.raises(IntegrityError):
+            query(legacy_engine, "INSERT INTO genres (name) VALUES ('Drama')")
+
+    def test_migrate_is_idempotent(self, legacy_engine):
+        migrate(legacy_engine)
+        migrate(legacy_engine)
+        assert query(legacy_engine, "SELECT COUNT(*) FROM genres") == [(2,)]
+
+    def test_migrate_drops_per_row_full_text_search_triggers(self, legacy_engine):
+        with legacy_engine.begin() as connection:
+            connection.execute(text("CREATE TRIGGER movies_fts_genre_insert AFTER INSERT ON "
+                                    "movie_genre BEGIN SELECT 1; END"))
+
+        migrate(legacy_engine)
+        triggers = {name for name, in query(legacy_engine, "SELECT name FROM sqlite_master "
+                                                           "WHERE type = 'trigger'")}
+        assert "movies_fts_genre_insert" not in triggers
+        assert {"movies_fts_movie_insert", "movies_fts_genre_added",
+                "movies_fts_genre_delete"} <= triggers
@@ -0,0 +1,130 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event
+import pytest
+from main.concurrency.deadline import current_deadline, deadline_scope
+from main.search.movie_search import MovieSearch
+
+
+class FakeMovie:
+    def __init__(self, id, title, imdb_id):
+        self.id = id
+        self.title = title
+        self.imdb_id = imdb_id
+
+    def to_dict(self):
+        return {"id": self.id, "title": self.title, "imdb_id": self.imdb_id}
+
+
+class FakeOmdbClient:
+    def __init__(self, results=(), error=None, release=None):
+        self.started = Event()
+        self._results = list(results)
+        self._error = error
+        self._release = release
+
+    def search_movies(self, title):
+        self.started.set()
+
+        if self._release:
+            self._release.wait(timeout=5)
+
+        if self._error:
+            raise self._error
+
+        return {"total_results": len(self._results), "results": self._results}
+
+
+def find_local_movies(title):
+    return [FakeMovie(1, "Heat", "tt0113277")]
+
+
+@pytest.fixture(scope="function")
+def executor():
+    executor_ = ThreadPoolExecutor(max_workers=2)
+
+    try:
+        yield executor_
+    finally:
+        executor_.shutdown()
+
+
+def movie_search(omdb_client, executor, find_local_movies=find_local_movies, timeout=1.0,
+                 find_close_movies=None):
+    return MovieSearch(find_local_movies=find_local_movies, omdb_client=omdb_client,
+                       executor=executor, timeout=timeout, find_close_movies=find_close_movies,
+                       current_deadline=current_deadline)
+
+
+class TestMovieSearch:
+    def test_merges_local_first_without_duplicates(self, executor):
+        omdb_client = FakeOmdbClient(results=[{"title": "Heat 2", "imdb_id": "tt1"},
+                                              {"title": "Heat", "imdb_id": "tt0113277"}])
+        result = movie_search(omdb_client, executor).search("Heat")
+        assert result == {"total_results": 2, "partial": False, "results": [
+            {"id": 1, "title": "Heat", "imdb_id": "tt0113277"},
+            {"title": "Heat 2", "imdb_id": "tt1"}
+        ]}
+
+    def test_runs_concurrently(self, executor):
+        omdb_client = FakeOmdbClient()
+
+        def find_local_movies_during_omdb_search(title):
+            assert omdb_client.started.wait(timeout=5)
+            return []
+
+        movie_search(omdb_client, executor, find_local_movies_during_omdb_search).search("Heat")
+
+    def test_deadline_returns_partial_local_results(self, executor):
+        release = Event()
+        omdb_client = FakeOmdbClient(results=[{"title": "Heat 2", "imdb_id": "tt1"}],
+                                     release=release)
+
+        try:
+            result = movie_search(omdb_client, executor, timeout=0.05).search("Heat")
+        finally:
+            release.set()
+
+        assert result["partial"]
+        assert [movie["title"] for movie in result["results"]] == ["Heat"]
+
+    def test_not_found_on_omdb_is_complete(self, executor):
+        omdb_client = FakeOmdbClient(error=ValueError("Movie not found"))
+        result = movie_search(omdb_client, executor).search("Heat")
+        assert not result["partial"]
+        assert result["total_results"] == 1
+
+    def test_omdb_failure_returns_partial_local_results(self, executor):
+        omdb_client = FakeOmdbClient(error=RuntimeError("Unexpected error"))
+        result = movie_search(omdb_client, executor).search("Heat")
+        assert result["partial"]
+        assert result["total_results"] == 1
+
+    def test_close_local_matches_skip_omdb(self, executor):
+        omdb_client = FakeOmdbClient(results=[{"title": "Heat 2", "imdb_id": "tt1"}])
+        result = movie_search(omdb_client, executor, find_local_movies=lambda title: [],
+                              find_close_movies=find_local_movies).search("Haet")
+        assert result == {"total_results": 1, "partial": False, "results": [
+            {"id": 1, "title": "Heat", "imdb_id": "tt0113277"}
+        ]}
+        assert not omdb_client.started.is_set()
+
+    def test_without_close_local_matches_searches_omdb(self, executor):
+        omdb_client = FakeOmdbClient(results=[{"title": "Heat 2", "imdb_id": "tt1"}])
+        result = movie_search(omdb_client, executor,
+                              find_close_movies=lambda title: []).search("Heat")
+        assert result["total_results"] == 2
+        assert omdb_client.started.is_set()
+
+    def test_request_deadline_clips_budget(self, executor):
+        release = Event()
+        omdb_client = FakeOmdbClient(results=[{"title": "Heat 2", "imdb_id": "tt1"}],
+                                     release=release)
+
+        try:
+            with deadline_scope(0.05):
+                result = movie_search(omdb_client, executor, timeout=5).search("Heat")
+        finally:
+            release.set()
+
+        assert result["partial"]
+        assert result["total_results"] == 1
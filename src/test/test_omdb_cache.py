@@ -0,0 +1,135 @@
+import pytest
+from main.omdb.omdb_cache import OmdbCache
+from main.omdb.caching_omdb_client import CachingOmdbClient
+
+
+class FakeOmdbClient:
+    def __init__(self):
+        self.calls = []
+
+    def find_movie_by_title(self, title):
+        self.calls.append(("movie", title))
+
+        if title == "Missing":
+            raise ValueError(f"Movie with title '{title}' not found")
+
+        return {"title": title}
+
+    def search_movies(self, title):
+        self.calls.append(("search", title))
+        return {"total_results": "1", "results": [{"title": title}]}
+
+
+@pytest.fixture(scope="function")
+def cache(clock):
+    cache_ = OmdbCache(":memory:", ttls={"movie": 100, "search": 10, "not_found": 5}, clock=clock)
+
+    try:
+        yield cache_
+    finally:
+        cache_.close()
+
+
+@pytest.fixture(scope="function")
+def omdb_client():
+    return FakeOmdbClient()
+
+
+@pytest.fixture(scope="function")
+def caching_client(omdb_client, cache):
+    return CachingOmdbClient(client=omdb_client, cache=cache)
+
+
+class TestOmdbCache:
+    def test_get_and_set(self, cache):
+        assert cache.get("movie", "key") == (False, None)
+        cache.set("movie", "key", {"title": "Title"})
+        assert cache.get("movie", "key") == (True, {"title": "Title"})
+        assert cache.get("search", "key") == (False, None)
+
+    def test_not_found(self, cache):
+        cache.set("movie", "key", None)
+        assert cache.get("movie", "key") == (True, None)
+
+    def test_ttl_per_kind(self, cache, clock):
+        cache.set("movie", "key", {})
+        cache.set("search", "key", {})
+        cache.set("movie", "missing", None)
+        clock.now += 5
+        assert cache.get("movie", "missing") == (False, None)
+        clock.now += 5
+        assert cache.get("search", "key") == (False, None)
+        assert cache.get("movie", "key") == (True, {})
+
+    def test_evicts_least_recently_used(self, clock):
+        cache = OmdbCache(":memory:", max_bytes=100, clock=clock)
+        value = {"data": "x" * 30}  # 42 bytes serialized plus 1 byte key
+        cache.set("movie", "a", value)
+        clock.now += 1
+        cache.set("movie", "b", value)
+        clock.now += 1
+        cache.get("movie", "a")
+        clock.now += 1
+        cache.set("movie", "c", value)
+        assert cache.get("movie", "b") == (False, None)
+        assert cache.get("movie", "a") == (True, value)
+        assert cache.get("movie", "c") == (True, value)
+        assert cache.stats()["bytes"] <= 100
+
+    def test_prunes_expired_only_over_size_limit(self, clock):
+        cache = OmdbCache(":memory:", ttls={"not_found": 5}, max_bytes=86, clock=clock)
+        value = {"data": "x" * 30}  # 42 bytes serialized plus 1 byte key
+        cache.set("movie", "a", None)
+        clock.now += 10
+        cache.set("movie", "b", value)
+        assert cache.stats()["entries"] == 2
+        cache.set("movie", "c", value)
+        assert cache.stats()["entries"] == 2
+        assert cache.get("movie", "b") == (True, value)
+
+    def test_keeps_size_of_replaced_and_persisted_responses(self, tmp_path):
+        path = str(tmp_path / "cache.sqlite")
+        cache = OmdbCache(path)
+        cache.set("movie", "key", {"title": "Title"})
+        cache.set("movie", "key", {"title": "Other Title"})
+        size = len('{"title": "Other Title"}') + len("key")
+        assert cache.stats()["bytes"] == size
+        cache.close()
+        assert OmdbCache(path).stats()["bytes"] == size
+
+    def test_persists(self, tmp_path):
+        path = str(tmp_path / "cache.sqlite")
+        cache = OmdbCache(path)
+        cache.set("movie", "key", {"title": "Title"})
+        cache.close()
+        assert OmdbCache(path).get("movie", "key") == (True, {"title": "Title"})
+
+    def test_stats(self, cache):
+        cache.get("movie", "key")
+        cache.set("movie", "key", {"title": "Title"})
+        cache.get("movie", "key")
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_ratio"] == 0.5
+        assert stats["entries"] == 1
+        assert stats["bytes"] == len('{"title": "Title"}') + len("key")
+
+
+class TestCachingOmdbClient:
+    def test_find_movie_by_title_cached(self, caching_client, omdb_client):
+        assert caching_client.find_movie_by_title("Star Wars") == {"title": "Star Wars"}
+        assert caching_client.find_movie_by_title("  star   WARS ") == {"title": "Star Wars"}
+        assert omdb_client.calls == [("movie", "Star Wars")]
+
+    def test_find_movie_by_title_not_found_cached(self, caching_client, omdb_client):
+        for _ in range(2):
+            with pytest.raises(ValueError):
+                caching_client.find_movie_by_title("Missing")
+        assert omdb_client.calls == [("movie", "Missing")]
+
+    def test_search_movies_cached_separately(self, caching_client, omdb_client):
+        caching_client.search_movies("Star")
+        caching_client.search_movies("star")
+        caching_client.find_movie_by_title("Star")
+        assert omdb_client.calls == [("search", "Star"), ("movie", "Star")]
@@ -0,0 +1,154 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+import pytest
+from main.concurrency.deadline import DeadlineExceededError, current_deadline, deadline_scope
+from main.concurrency.rate_control import RateController
+from main.omdb.omdb_client import OmdbClient
+from main.omdb.upstream_error import UpstreamError
+
+MOVIE = {
+    "Title": "Stub Movie", "Year": "2000", "imdbRating": "7.5", "Poster": "N/A",
+    "imdbID": "tt0000001", "Genre": "Drama, Comedy", "Director": "Jane Doe",
+    "Writer": "Jane Doe, John Doe", "Actors": "Actor One", "Response": "True"
+}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    requests = []
+    connections = set()
+
+    def do_GET(self):
+        query = {key: values[0] for key, values in parse_qs(urlparse(self.path).query).items()}
+        StubHandler.requests.append(query)
+        StubHandler.connections.add(self.client_address)
+
+        if query.get("apikey") != "key":
+            status, body = 401, {"Error": "Invalid API key!"}
+        elif query.get("t") == "Missing":
+            status, body = 200, {"Error": "Movie not found!"}
+        elif query.get("t") == "Slow":
+            time.sleep(0.5)
+            status, body = 200, MOVIE
+        elif query.get("t") == "Overloaded":
+            status, body = 429, {"Error": "Request limit reached!"}
+        elif "s" in query:
+            status, body = 200, {"Search": [MOVIE], "totalResults": "1"}
+        else:
+            status, body = 200, {**MOVIE, "Title": query.get("t")}
+
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(payload)))
+
+        if status == 429:
+            self.send_header("Retry-After", "1")
+
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def handle(self):
+        try:
+            super().handle()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # The client gave up waiting for a slow response
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def server_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+
+
+@pytest.fixture(scope="function")
+def client(server_url):
+    StubHandler.requests.clear()
+    StubHandler.connections.clear()
+    client_ = OmdbClient(api_key="key", base_url=server_url)
+
+    try:
+        yield client_
+    finally:
+        client_.close()
+
+
+class TestOmdbClient:
+    def test_find_movie_by_title(self, client):
+        movie = client.find_movie_by_title("Star Wars & Co")
+        assert movie == {
+            "title": "Star Wars & Co",
+            "release_year": 2000,
+            "rating": 7.5,
+            "poster_url": "N/A",
+            "imdb_id": "tt0000001",
+            "genres": ["Drama", "Comedy"],
+            "directors": ["Jane Doe"],
+            "writers": ["Jane Doe", "John Doe"],
+            "actors": ["Actor One"],
+        }
+        assert StubHandler.requests == [{"apikey": "key", "type": "movie", "t": "Star Wars & Co"}]
+
+    def test_find_movie_by_title_not_found(self, client):
+        with pytest.raises(ValueError):
+            client.find_movie_by_title("Missing")
+
+    def test_invalid_api_key(self, server_url):
+        with pytest.raises(PermissionError):
+            OmdbClient(api_key="invalid", base_url=server_url).find_movie_by_title("Movie")
+
+    def test_search_movies(self, client):
+        movies = client.search_movies("Stub")
+        assert movies == {"total_results": "1", "results": [{
+            "title": "Stub Movie", "release_year": 2000, "poster_url": "N/A",
+            "imdb_id": "tt0000001"
+        }]}
+
+    def test_reuses_connection(self, client):
+        for i in range(5):
+            client.find_movie_by_title(f"Movie {i}")
+        assert len(StubHandler.connections) == 1
+
+    def test_rate_controller_retries_honoring_retry_after(self, server_url):
+        StubHandler.requests.clear()
+        sleeps = []
+        rate_controller = RateController(rate=100, capacity=10, retries=2, sleep=sleeps.append)
+        client = OmdbClient(api_key="key", base_url=server_url, rate_controller=rate_controller)
+
+        with pytest.raises(UpstreamError):
+            client.find_movie_by_title("Overloaded")
+
+        assert len(StubHandler.requests) == 3
+        assert sleeps == [1.0, 1.0]
+
+    def test_rate_controller_not_found_is_not_retried(self, server_url):
+        StubHandler.requests.clear()
+        rate_controller = RateController(rate=100, capacity=10, sleep=lambda seconds: None)
+        client = OmdbClient(api_key="key", base_url=server_url, rate_controller=rate_controller)
+
+        with pytest.raises(ValueError):
+            client.find_movie_by_title("Missing")
+
+        assert len(StubHandler.requests) == 1
+
+    def test_timeout_clipped_to_deadline(self, server_url):
+        rate_controller = RateController(rate=100, capacity=10, sleep=lambda seconds: None)
+        client = OmdbClient(api_key="key", base_url=server_url, rate_controller=rate_controller,
+                            current_deadline=current_deadline)
+        started_at = time.monotonic()
+
+        with deadline_scope(0.1):
+            with pytest.raises(DeadlineExceededError):
+                client.find_movie_by_title("Slow")
+
+        assert time.monotonic() - started_at < 0.4
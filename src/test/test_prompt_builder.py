@@ -0,0 +1,63 @@
+import pytest
+from main.gemini.prompt_builder import PromptBuilder
+from main.gemini.prompt_metrics import PromptMetrics
+from main.repository.projections import FavouriteSummary, GenreSummary
+
+
+def favourite(id, rating=None, genres=("Drama",)):
+    return FavouriteSummary(id, f"Movie {id}", rating,
+                            tuple(GenreSummary(i, name) for i, name in enumerate(genres)))
+
+
+class TestPromptBuilder:
+    def test_select_favourites_below_maximum_keeps_all(self):
+        builder = PromptBuilder(max_favourites=3)
+        favourites = [favourite(1), favourite(2), favourite(3)]
+        assert builder.select_favourites(favourites) == ["Movie 1", "Movie 2", "Movie 3"]
+
+    def test_select_favourites_caps_to_maximum(self):
+        builder = PromptBuilder(max_favourites=50)
+        favourites = [favourite(id, rating=id % 10) for id in range(1, 5001)]
+        selected = builder.select_favourites(favourites)
+        assert len(selected) == 50
+        assert len(set(selected)) == 50
+
+    def test_select_favourites_highest_rated_and_most_recent_first(self):
+        builder = PromptBuilder(max_favourites=4, rating_share=0.5, recent_share=0.25)
+        favourites = [favourite(id) for id in range(1, 11)]
+        favourites[2] = favourite(3, rating=9.5)
+        favourites[4] = favourite(5, rating=8.0)
+        favourites[6] = favourite(7, rating=2.0)
+        assert builder.select_favourites(favourites)[:3] == ["Movie 3", "Movie 5", "Movie 10"]
+
+    def test_select_favourites_samples_every_genre(self):
+        builder = PromptBuilder(max_favourites=10, rating_share=0, recent_share=0)
+        favourites = [favourite(id, genres=("Drama",)) for id in range(1, 91)]
+        favourites += [favourite(id, genres=("Drama", "Western")) for id in range(91, 101)]
+        selected = builder.select_favourites(favourites)
+        assert len(selected) == 10
+        assert sum(int(title.split()[1]) > 90 for title in selected) == 1
+
+    def test_select_favourites_is_deterministic(self):
+        builder = PromptBuilder(max_favourites=20)
+        favourites = [favourite(id, rating=id % 7, genres=(f"Genre {id % 5}",))
+                      for id in range(1, 501)]
+        assert builder.select_favourites(favourites) == builder.select_favourites(favourites)
+
+    def test_build(self):
+        prompt = PromptBuilder().build(["Heat", "Ronin"], count=8)
+        assert prompt.startswith("Favourite movies:\n- Heat\n- Ronin\n\n")
+        assert "Give me exactly 8 suggestions" in prompt
+
+
+class TestPromptMetrics:
+    def test_stats(self):
+        metrics = PromptMetrics()
+        metrics.record_selection(favourites=1000, sent_favourites=50)
+        metrics.record_request(prompt_chars=1200, latency=0.5)
+        metrics.record_request(prompt_chars=800, latency=1.5, prompt_tokens=300)
+        stats = metrics.stats()
+        assert stats["sent_favourites"] == {"count": 1, "mean": 50, "max": 50}
+        assert stats["prompt_chars"] == {"count": 2, "mean": 1000, "max": 1200}
+        assert stats["latency"]["mean"] == pytest.approx(1.0)
+        assert stats["prompt_tokens"]["count"] == 1
@@ -0,0 +1,100 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+import pytest
+from sqlalchemy import create_engine, text
+from main.repository.query_profiler import QueryProfiler
+
+
+@pytest.fixture(scope="function")
+def engine():
+    engine_ = create_engine("sqlite://")
+
+    with engine_.begin() as connection:
+        connection.execute(text("CREATE TABLE crew (id INTEGER PRIMARY KEY, name TEXT)"))
+
+    try:
+        yield engine_
+    finally:
+        engine_.dispose()
+
+
+@pytest.fixture(scope="function")
+def logger():
+    return logging.getLogger("test_query_profiler")
+
+
+class TestQueryProfiler:
+    def test_counts_and_times_statements(self, engine, clock):
+        clock.step = 0.005
+        profiler = QueryProfiler(slow_threshold=None, clock=clock)
+        profiler.install(engine)
+        token = profiler.start()
+
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+            connection.execute(text("SELECT 2"))
+
+        stats = profiler.current_stats()
+        profiler.stop(token)
+
+        assert stats.count == 2
+        assert stats.duration == pytest.approx(0.01)
+        assert stats.server_timing() == 'db;desc="2 queries";dur=10.00'
+        assert profiler.current_stats() is None
+
+    def test_counts_statements_of_context_copies(self, engine):
+        profiler = QueryProfiler(slow_threshold=None)
+        profiler.install(engine)
+        token = profiler.start()
+
+        def query():
+            with engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            for future in [executor.submit(copy_context().run, query) for _ in range(4)]:
+                future.result()
+
+        assert profiler.current_stats().count == 4
+        profiler.stop(token)
+
+    def test_logs_slow_statements_with_query_plan(self, engine, logger, caplog, clock):
+        clock.step = 0.1
+        profiler = QueryProfiler(slow_threshold=0.1, logger=logger, clock=clock)
+        profiler.install(engine)
+
+        with caplog.at_level(logging.WARNING, logger=logger.name):
+            with engine.connect() as connection:
+                connection.execute(text("SELECT * FROM crew WHERE name = :name"), {"name": "A"})
+
+        assert len(caplog.records) == 1
+        message = caplog.records[0].getMessage()
+        assert "SELECT * FROM crew WHERE name = ?" in message
+        assert "SCAN crew" in message
+
+    def test_skips_fast_statements(self, engine, logger, caplog, clock):
+        clock.step = 0.01
+        profiler = QueryProfiler(slow_threshold=0.1, logger=logger, clock=clock)
+        profiler.install(engine)
+
+        with caplog.at_level(logging.WARNING, logger=logger.name):
+            with engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
+
+        assert not caplog.records
+
+    def test_logs_executemany_without_query_plan(self, engine, logger, caplog, clock):
+        clock.step = 0.1
+        profiler = QueryProfiler(slow_threshold=0.1, logger=logger, clock=clock)
+        profiler.install(engine)
+
+        with caplog.at_level(logging.WARNING, logger=logger.name):
+            with engine.begin() as connection:
+                connection.execute(text("INSERT INTO crew (name) VALUES (:name)"),
+                                   [{"name": "A"}, {"name": "B"}])
+
+        messages = [record.getMessage() for record in caplog.records]
+        messages = [message for message in messages if "INSERT" in message]
+        assert len(messages) == 1
+        assert "Query plan" not in messages[0]
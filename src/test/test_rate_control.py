@@ -0,0 +1,278 @@
+import pytest
+from main.concurrency.deadline import DeadlineExceededError, deadline_scope
+from main.concurrency.rate_control import CircuitBreaker, CircuitOpenError, RateController, \
+    TokenBucket, retry_after_seconds
+
+
+class RetryableError(Exception):
+    retryable = True
+
+    def __init__(self, retry_after=None):
+        super().__init__("Service unavailable")
+        self.retry_after = retry_after
+
+
+class FlakyCall:
+    def __init__(self, *errors, result="ok"):
+        self.calls = 0
+        self._errors = list(errors)
+        self._result = result
+
+    def __call__(self):
+        self.calls += 1
+
+        if self._errors:
+            raise self._errors.pop(0)
+
+        return self._result
+
+
+def create_rate_controller(clock, **settings):
+    return RateController(**{"rate": 100, "capacity": 100, "retries": 2, "backoff_base": 1,
+                             "max_backoff": 10, "failure_threshold": 3, "reset_timeout": 30,
+                             "clock": clock, "sleep": clock.sleep, "random": lambda: 0.5,
+                             **settings})
+
+
+class TestTokenBucket:
+    def test_allows_burst_up_to_capacity(self, clock):
+        bucket = TokenBucket(rate=1, capacity=3, clock=clock, sleep=clock.sleep)
+        assert [bucket.acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+        assert clock.sleeps == []
+
+    def test_waits_for_tokens(self, clock):
+        bucket = TokenBucket(rate=2, capacity=1, clock=clock, sleep=clock.sleep)
+        bucket.acquire()
+        assert bucket.acquire() == 0.5
+        assert clock.sleeps == [0.5]
+
+    def test_does_not_wait_past_timeout(self, clock):
+        bucket = TokenBucket(rate=0.25, capacity=1, clock=clock, sleep=clock.sleep)
+        bucket.acquire()
+
+        with pytest.raises(DeadlineExceededError):
+            bucket.acquire(timeout=4)
+
+        assert clock.sleeps == []
+        assert bucket.acquire(timeout=5) == 4
+
+    def test_refills_over_time(self, clock):
+        bucket = TokenBucket(rate=1, capacity=2, clock=clock, sleep=clock.sleep)
+        bucket.acquire()
+        bucket.acquire()
+        clock.now += 10
+        assert [bucket.acquire(), bucket.acquire()] == [0.0, 0.0]
+
+
+class TestCircuitBreaker:
+    def test_opens_after_threshold(self, clock):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30, clock=clock)
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.CLOSED
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+
+        with pytest.raises(CircuitOpenError) as e:
+            breaker.before_call()
+
+        assert e.value.retry_after == 30
+
+    def test_success_resets_failures(self, clock):
+        breaker = CircuitBreaker(failure_threshold=2, clock=clock)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_half_open_allows_single_trial(self, clock):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30, clock=clock)
+        breaker.record_failure()
+        clock.now += 30
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        breaker.before_call()
+
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_failed_trial_reopens(self, clock):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30, clock=clock)
+        breaker.record_failure()
+        clock.now += 30
+        breaker.before_call()
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+
+
+class TestRateController:
+    def test_call(self, clock):
+        rate_controller = create_rate_controller(clock)
+        assert rate_controller.call(lambda: "ok") == "ok"
+        assert rate_controller.stats() == {"calls": 1, "retried": 0, "rejected": 0,
+                                           "circuit": CircuitBreaker.CLOSED}
+
+    def test_retries_with_jittered_exponential_backoff(self, clock):
+        rate_controller = create_rate_controller(clock)
+        call = FlakyCall(RetryableError(), RetryableError())
+        assert rate_controller.call(call) == "ok"
+        assert call.calls == 3
+        assert clock.sleeps == [0.5, 1.0]
+
+    def test_retries_on_network_errors(self, clock):
+        rate_controller = create_rate_controller(clock)
+        assert rate_controller.call(FlakyCall(ConnectionError())) == "ok"
+
+    def test_honors_retry_after(self, clock):
+        rate_controller = create_rate_controller(clock)
+        rate_controller.call(FlakyCall(RetryableError(retry_after="7")))
+        assert clock.sleeps == [7.0]
+
+    def test_gives_up_if_retry_after_exceeds_max_backoff(self, clock):
+        rate_controller = create_rate_controller(clock)
+        call = FlakyCall(RetryableError(retry_after=60))
+
+        with pytest.raises(RetryableError):
+            rate_controller.call(call)
+
+        assert call.calls == 1
+
+    def test_raises_after_retries(self, clock):
+        rate_controller = create_rate_controller(clock, failure_threshold=10)
+        call = FlakyCall(*[RetryableError()] * 3)
+
+        with pytest.raises(RetryableError):
+            rate_controller.call(call)
+
+        assert call.calls == 3
+
+    def test_does_not_retry_other_errors(self, clock):
+        rate_controller = create_rate_controller(clock)
+        call = FlakyCall(ValueError("Movie not found"))
+
+        with pytest.raises(ValueError):
+            rate_controller.call(call)
+
+        assert call.calls == 1
+
+    def test_other_errors_do_not_reset_failures(self, clock):
+        rate_controller = create_rate_controller(clock, retries=0, failure_threshold=2)
+
+        for error in (RetryableError(), ValueError("Movie not found"), RetryableError()):
+            with pytest.raises(type(error)):
+                rate_controller.call(FlakyCall(error))
+
+        with pytest.raises(CircuitOpenError):
+            rate_controller.call(FlakyCall())
+
+    def test_other_errors_release_trial_call(self, clock):
+        rate_controller = create_rate_controller(clock, retries=0, failure_threshold=1)
+
+        with pytest.raises(RetryableError):
+            rate_controller.call(FlakyCall(RetryableError()))
+
+        clock.now += 30
+
+        with pytest.raises(ValueError):
+            rate_controller.call(FlakyCall(ValueError("Movie not found")))
+
+        assert rate_controller.call(FlakyCall()) == "ok"
+
+    def test_fails_fast_while_circuit_open(self, clock):
+        rate_controller = create_rate_controller(clock, retries=0, failure_threshold=2)
+
+        for _ in range(2):
+            with pytest.raises(RetryableError):
+                rate_controller.call(FlakyCall(RetryableError()))
+
+        call = FlakyCall()
+        with pytest.raises(CircuitOpenError):
+            rate_controller.call(call)
+
+        assert call.calls == 0
+        clock.now += 30
+        assert rate_controller.call(call) == "ok"
+        assert rate_controller.stats()["rejected"] == 1
+
+    def test_limits_rate(self, clock):
+        rate_controller = create_rate_controller(clock, rate=1, capacity=1)
+        rate_controller.call(lambda: "ok")
+        rate_controller.call(lambda: "ok")
+        assert clock.sleeps == [1.0]
+
+    def test_does_not_retry_past_deadline(self, clock):
+        rate_controller = create_rate_controller(clock)
+        call = FlakyCall(RetryableError(), RetryableError())
+
+        with deadline_scope(1.5, clock):
+            with pytest.raises(RetryableError):
+                rate_controller.call(call)
+
+        assert call.calls == 2
+        assert clock.sleeps == [0.5]
+
+    def test_not_attempted_after_deadline(self, clock):
+        rate_controller = create_rate_controller(clock)
+        call = FlakyCall()
+
+        with deadline_scope(1, clock):
+            clock.now += 1
+
+            with pytest.raises(DeadlineExceededError):
+                rate_controller.call(call)
+
+        assert call.calls == 0
+
+    def test_does_not_wait_for_token_past_deadline(self, clock):
+        rate_controller = create_rate_controller(clock, rate=0.25, capacity=5)
+        call = FlakyCall()
+
+        with deadline_scope(15, clock):
+            for _ in range(8):
+                rate_controller.call(call)
+
+            with pytest.raises(DeadlineExceededError):
+                rate_controller.call(call)
+
+        assert call.calls == 8
+        assert clock.sleeps == [4.0, 4.0, 4.0]
+
+    def test_not_attempted_if_deadline_passed_while_waiting_for_token(self, clock):
+        def oversleep(seconds):
+            clock.sleep(seconds + 1)
+
+        rate_controller = RateController(rate=1, capacity=1, clock=clock, sleep=oversleep)
+        call = FlakyCall()
+
+        with deadline_scope(1.5, clock):
+            rate_controller.call(call)
+
+            with pytest.raises(DeadlineExceededError):
+                rate_controller.call(call)
+
+        assert call.calls == 1
+        assert rate_controller.stats()["circuit"] == CircuitBreaker.CLOSED
+
+    def test_deadline_exceeded_counts_as_failure(self, clock):
+        rate_controller = create_rate_controller(clock, failure_threshold=1)
+        call = FlakyCall(DeadlineExceededError())
+
+        with pytest.raises(DeadlineExceededError):
+            rate_controller.call(call)
+
+        assert call.calls == 1
+        assert rate_controller.stats()["circuit"] == CircuitBreaker.OPEN
+
+
+class TestRetryAfterSeconds:
+    def test_seconds(self):
+        assert retry_after_seconds("120") == 120.0
+        assert retry_after_seconds(1.5) == 1.5
+
+    def test_http_date(self):
+        assert retry_after_seconds("Wed, 21 Oct 2015 07:28:30 GMT", now=lambda: 1445412480) == 30
+
+    def test_invalid(self):
+        assert retry_after_seconds(None) is None
+        assert retry_after_seconds("soon") is None
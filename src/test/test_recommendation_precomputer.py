@@ -0,0 +1,70 @@
+from threading import Barrier
+from main.recommendations.recommendation_precomputer import RecommendationPrecomputer
+
+FAVOURITES = [(1, 10, None), (1, 11, 8.0), (1, 12, None),  # Eligible, up to date
+              (2, 10, None), (2, 13, None), (2, 14, 5.0),  # Eligible, changed
+              (3, 10, None), (3, 11, None),  # Not enough favourites
+              (4, 11, None), (4, 12, None), (4, 13, None)]  # Eligible, never computed
+
+
+def fingerprint(movie_ids):
+    return ",".join(map(str, sorted(movie_ids)))
+
+
+class FakeRecommender:
+    def __init__(self, failing=(), barrier=None):
+        self.calls = []
+        self._failing = failing
+        self._barrier = barrier
+
+    def __call__(self, user_id, fingerprint):
+        self.calls.append((user_id, fingerprint))
+
+        if self._barrier:
+            self._barrier.wait(timeout=5)
+
+        if user_id in self._failing:
+            raise RuntimeError("Gemini failed")
+
+        return []
+
+
+def precomputer(recommend, **kwargs):
+    return RecommendationPrecomputer(
+        load_favourites=lambda: FAVOURITES,
+        load_fingerprints=lambda: {1: "10,11,12", 2: "10,13"},
+        fingerprint=fingerprint,
+        recommend=recommend,
+        **kwargs
+    )
+
+
+class TestRecommendationPrecomputer:
+    def test_find_stale_users(self):
+        assert precomputer(FakeRecommender()).find_stale_users() == \
+               (3, [(2, "10,13,14"), (4, "11,12,13")])
+
+    def test_run_computes_stale_users(self):
+        recommend = FakeRecommender()
+        stats = precomputer(recommend).run()
+        assert sorted(recommend.calls) == [(2, "10,13,14"), (4, "11,12,13")]
+        assert stats == {"eligible": 3, "up_to_date": 1, "computed": 2, "failed": 0,
+                         "deferred": 0}
+
+    def test_run_within_budget(self):
+        recommend = FakeRecommender()
+        stats = precomputer(recommend, budget=1).run()
+        assert recommend.calls == [(2, "10,13,14")]
+        assert stats["computed"] == 1
+        assert stats["deferred"] == 1
+
+    def test_run_counts_failures(self):
+        stats = precomputer(FakeRecommender(failing=(2,))).run()
+        assert stats["computed"] == 1
+        assert stats["failed"] == 1
+
+    def test_run_concurrently(self):
+        # Both users wait for each other, so computing them one after another would time out
+        recommend = FakeRecommender(barrier=Barrier(2))
+        stats = precomputer(recommend, max_workers=2).run()
+        assert stats["computed"] == 2
@@ -0,0 +1,157 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import Barrier, Event
+import pytest
+from main.concurrency.deadline import current_deadline, deadline_scope
+from main.recommendations.recommendation_resolver import RecommendationResolver
+
+
+class FakeOmdbClient:
+    def __init__(self, barrier=None):
+        self.calls = []
+        self._barrier = barrier
+
+    def find_movie_by_title(self, title):
+        self.calls.append(title)
+
+        if self._barrier:
+            self._barrier.wait(timeout=5)
+
+        if title == "Missing":
+            raise ValueError(f"Movie with title '{title}' not found")
+
+        return {"title": title, "source": "omdb"}
+
+
+def find_local_movies(titles):
+    return {title: {"title": title, "source": "local"} for title in titles if title == "Local"}
+
+
+@pytest.fixture(scope="function")
+def executor():
+    executor_ = ThreadPoolExecutor(max_workers=3)
+
+    try:
+        yield executor_
+    finally:
+        executor_.shutdown()
+
+
+class TestRecommendationResolver:
+    def test_resolve_keeps_order_and_skips_not_found(self, executor):
+        omdb_client = FakeOmdbClient()
+        resolver = RecommendationResolver(omdb_client=omdb_client, executor=executor,
+                                          find_local_movies=find_local_movies)
+        movies, partial = resolver.resolve(["A", "Missing", "Local", "B"])
+        assert movies == [{"title": "A", "source": "omdb"},
+                          {"title": "Local", "source": "local"},
+                          {"title": "B", "source": "omdb"}]
+        assert not partial
+
+    def test_resolve_local_titles_skip_omdb(self, executor):
+        omdb_client = FakeOmdbClient()
+        resolver = RecommendationResolver(omdb_client=omdb_client, executor=executor,
+                                          find_local_movies=find_local_movies)
+        resolver.resolve(["Local", "A"])
+        assert omdb_client.calls == ["A"]
+
+    def test_resolve_concurrently(self, executor):
+        # Every lookup waits for the others, so sequential lookups would break the barrier
+        omdb_client = FakeOmdbClient(barrier=Barrier(3))
+        resolver = RecommendationResolver(omdb_client=omdb_client, executor=executor,
+                                          find_local_movies=find_local_movies)
+        assert len(resolver.resolve(["A", "B", "C"])[0]) == 3
+
+    def test_resolve_raises_omdb_errors(self, executor):
+        class FailingOmdbClient:
+            def find_movie_by_title(self, title):
+                raise PermissionError("Invalid API-KEY")
+
+        resolver = RecommendationResolver(omdb_client=FailingOmdbClient(), executor=executor,
+                                          find_local_movies=find_local_movies)
+
+        with pytest.raises(PermissionError):
+            resolver.resolve(["A"])
+
+    def test_resolve_skips_failed_lookups(self, executor):
+        class FlakyOmdbClient(FakeOmdbClient):
+            def find_movie_by_title(self, title):
+                if title == "Flaky":
+                    raise ConnectionError("Read timed out")
+
+                return super().find_movie_by_title(title)
+
+        resolver = RecommendationResolver(omdb_client=FlakyOmdbClient(), executor=executor,
+                                          find_local_movies=find_local_movies)
+        assert resolver.resolve(["Flaky", "A"]) == ([{"title": "A", "source": "omdb"}], True)
+        assert list(resolver.resolve_as_completed(["Flaky", "Local"])) == [
+            (1, {"title": "Local", "source": "local"}), (0, None)]
+
+    def test_resolve_raises_if_all_lookups_failed(self, executor):
+        class FailingOmdbClient:
+            def find_movie_by_title(self, title):
+                raise ConnectionError("Read timed out")
+
+        resolver = RecommendationResolver(omdb_client=FailingOmdbClient(), executor=executor,
+                                          find_local_movies=find_local_movies)
+
+        with pytest.raises(ConnectionError):
+            resolver.resolve(["A", "Missing"])
+
+        with pytest.raises(ConnectionError):
+            list(resolver.resolve_as_completed(["A"]))
+
+    def test_resolve_as_completed_yields_fastest_first(self, executor):
+        slow_lookup = Event()
+
+        class SlowOmdbClient(FakeOmdbClient):
+            def find_movie_by_title(self, title):
+                if title == "Slow":
+                    slow_lookup.wait(timeout=5)
+
+                return super().find_movie_by_title(title)
+
+        resolver = RecommendationResolver(omdb_client=SlowOmdbClient(), executor=executor,
+                                          find_local_movies=find_local_movies)
+        movies = resolver.resolve_as_completed(["Slow", "Missing", "Fast", "Local"])
+
+        assert next(movies) == (3, {"title": "Local", "source": "local"})
+        assert next(movies) == (2, {"title": "Fast", "source": "omdb"})
+        slow_lookup.set()
+        assert list(movies) == [(0, {"title": "Slow", "source": "omdb"})]
+
+    def test_resolve_skips_lookups_missing_deadline(self, executor):
+        slow_lookup = Event()
+
+        class SlowOmdbClient(FakeOmdbClient):
+            def find_movie_by_title(self, title):
+                if title == "Slow":
+                    slow_lookup.wait(timeout=5)
+
+                return super().find_movie_by_title(title)
+
+        resolver = RecommendationResolver(omdb_client=SlowOmdbClient(), executor=executor,
+                                          find_local_movies=find_local_movies,
+                                          current_deadline=current_deadline)
+
+        try:
+            with deadline_scope(0.1):
+                movies, partial = resolver.resolve(["Slow", "Fast", "Local"])
+                completed = list(resolver.resolve_as_completed(["Slow", "Local"]))
+        finally:
+            slow_lookup.set()
+
+        assert movies == [{"title": "Fast", "source": "omdb"},
+                          {"title": "Local", "source": "local"}]
+        assert partial
+        assert completed == [(1, {"title": "Local", "source": "local"})]
+
+    def test_lookups_see_deadline(self, executor):
+        class DeadlineOmdbClient:
+            def find_movie_by_title(self, title):
+                return {"title": title, "deadline": current_deadline() is not None}
+
+        resolver = RecommendationResolver(omdb_client=DeadlineOmdbClient(), executor=executor,
+                                          find_local_movies=find_local_movies)
+
+        with deadline_scope(5):
+            assert resolver.resolve(["A"]) == ([{"title": "A", "deadline": True}], False)
@@ -0,0 +1,205 @@
+import sys
+from pathlib import Path
+from time import sleep
+import pytest
+
+# The application imports its packages top-level from src/main
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "main"))
+
+import app.app as app_module  # noqa: E402
+import api.routes as api_routes  # noqa: E402
+from app.config import Config  # noqa: E402
+from repository.caching_repository import repo  # noqa: E402
+from repository.sqlite_job_queue import job_queue  # noqa: E402
+from jobs.movie_jobs import ADD_USER_MOVIE  # noqa: E402
+from concurrency.deadline import current_deadline  # noqa: E402
+
+
+class RoutesConfig(Config):
+    TESTING = True
+    SLOW_QUERY_THRESHOLD = None
+    OMDB_CACHE_PATH = None
+    JOB_WORKERS = 0
+    REQUEST_DEADLINES = {**Config.REQUEST_DEADLINES, "api.get_omdb_movies": 0.05}
+
+
+class FakeOmdbClient:
+    def __init__(self):
+        self.search_results = {"total_results": 0, "results": []}
+        self.error = None
+        self.delay = 0
+
+    def search_movies(self, title):
+        sleep(self.delay)
+        deadline = current_deadline()
+
+        if deadline is not None:
+            deadline.check()
+
+        if self.error is not None:
+            raise self.error
+
+        return self.search_results
+
+
+class FakeRecommendationResolver:
+    def __init__(self, results):
+        self.results = results
+        self.calls = 0
+
+    def resolve_as_completed(self, titles):
+        self.calls += 1
+        yield from self.results
+
+
+omdb_client = FakeOmdbClient()
+
+
+@pytest.fixture(scope="module")
+def app(tmp_path_factory):
+    class TestConfig(RoutesConfig):
+        SQLALCHEMY_DATABASE_URI = \
+            f"sqlite:///{tmp_path_factory.mktemp('routes') / 'movie_library.sqlite'}"
+
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(app_module, "OmdbClient", lambda **settings: omdb_client)
+        app_ = app_module.create_app(TestConfig)
+
+    yield app_
+    app_.extensions["omdb_executor"].shutdown()
+
+
+@pytest.fixture(scope="function")
+def client(app):
+    return app.test_client()
+
+
+def add_movie(app, title, imdb_id):
+    with app.app_context():
+        return repo.add_movie(title=title, release_year=2000, rating=7.0, poster_url="",
+                              imdb_id=imdb_id, genre_names=["Drama"], directors=[], writers=[],
+                              actors=[]).id
+
+
+def add_user(app, username, favourite_count=0):
+    with app.app_context():
+        user_id = repo.add_user(username, "").id
+
+    for i in range(favourite_count):
+        movie_id = add_movie(app, f"{username} Favourite {i}", f"{username}-{i}")
+
+        with app.app_context():
+            repo.add_user_movie(user_id, movie_id)
+
+    return user_id
+
+
+def sse_event(event, data):
+    return f"event: {event}\ndata: {data}\n\n"
+
+
+class TestApiRoutes:
+    def test_get_movies_page(self, app, client):
+        first_id = add_movie(app, "Paged Movie", "tt-paged")
+        add_movie(app, "Next Paged Movie", "tt-next-paged")
+        response = client.get(f"/api/movies?limit=1&cursor={first_id - 1}")
+        assert response.status_code == 200
+        assert [movie["title"] for movie in response.json["results"]] == ["Paged Movie"]
+        assert response.json["next_cursor"] == first_id
+
+    @pytest.mark.parametrize("query", ["limit=ten", "cursor=next"])
+    def test_get_movies_rejects_invalid_page(self, client, query):
+        assert client.get(f"/api/movies?{query}").status_code == 400
+
+    def test_search_movies(self, app, client, monkeypatch):
+        add_movie(app, "Heat", "tt0113277")
+        monkeypatch.setattr(omdb_client, "search_results", {"total_results": 2, "results": [
+            {"title": "Heat", "imdb_id": "tt0113277"}, {"title": "Heat 2", "imdb_id": "tt2"}]})
+
+        response = client.get("/api/search?title=hea")
+
+        assert response.status_code == 200
+        assert [movie["title"] for movie in response.json["results"]] == ["Heat", "Heat 2"]
+        assert response.json["partial"] is False
+
+    def test_search_movies_partial_if_omdb_fails(self, app, client, monkeypatch):
+        add_movie(app, "Rocky", "tt0075148")
+        monkeypatch.setattr(omdb_client, "error", RuntimeError("OMDB is down"))
+
+        response = client.get("/api/search?title=roc")
+
+        assert [movie["title"] for movie in response.json["results"]] == ["Rocky"]
+        assert response.json["partial"] is True
+
+    def test_search_movies_requires_title(self, client):
+        assert client.get("/api/search").status_code == 400
+
+    def test_get_omdb_movies_past_deadline(self, client, monkeypatch):
+        monkeypatch.setattr(omdb_client, "delay", 0.1)
+        assert client.get("/api/omdb-movies?title=heat").status_code == 504
+
+    def test_get_stats(self, client):
+        response = client.get("/api/stats")
+        assert response.status_code == 200
+        assert set(response.json) == {"gemini_prompts", "gemini_coalescing", "rate_controllers",
+                                      "omdb", "repository_caches"}
+        assert set(response.json["rate_controllers"]) == {"omdb", "gemini"}
+        assert "coalescing" in response.json["omdb"]
+
+    def test_stream_recommendations(self, app, client, monkeypatch):
+        user_id = add_user(app, "streamer", favourite_count=3)
+        resolver = FakeRecommendationResolver([(1, {"title": "Alien"}), (0, {"title": "Heat"})])
+        monkeypatch.setattr(api_routes, "find_gemini_recommendations",
+                            lambda user_id: ["Heat", "Alien"])
+        monkeypatch.setitem(app.extensions, "recommendation_resolver", resolver)
+
+        response = client.get(f"/api/users/{user_id}/recommendations/stream")
+
+        assert response.mimetype == "text/event-stream"
+        assert response.headers["Cache-Control"] == "no-cache"
+        assert response.get_data(as_text=True) == (
+            sse_event("movie", '{"title": "Alien"}') + sse_event("movie", '{"title": "Heat"}')
+            + sse_event("done", '{"total_results": 2, "partial": false}'))
+
+        response = client.get(f"/api/users/{user_id}/recommendations/stream")
+
+        assert response.get_data(as_text=True) == (
+            sse_event("movie", '{"title": "Heat"}') + sse_event("movie", '{"title": "Alien"}')
+            + sse_event("done", '{"total_results": 2}'))
+        assert resolver.calls == 1
+
+    def test_stream_recommendations_partial(self, app, client, monkeypatch):
+        user_id = add_user(app, "partial streamer", favourite_count=3)
+        resolver = FakeRecommendationResolver([(1, {"title": "Alien"}), (0, None)])
+        monkeypatch.setattr(api_routes, "find_gemini_recommendations",
+                            lambda user_id: ["Heat", "Alien"])
+        monkeypatch.setitem(app.extensions, "recommendation_resolver", resolver)
+
+        for _ in range(2):
+            response = client.get(f"/api/users/{user_id}/recommendations/stream")
+            assert response.get_data(as_text=True) == (
+                sse_event("movie", '{"title": "Alien"}')
+                + sse_event("done", '{"total_results": 1, "partial": true}'))
+
+        assert resolver.calls == 2
+
+    def test_stream_recommendations_unknown_user(self, client):
+        assert client.get("/api/users/999/recommendations/stream").status_code == 404
+
+
+class TestMainRoutes:
+    def test_add_user_movie_enqueues_job_once(self, app, client):
+        user_id = add_user(app, "collector")
+
+        for _ in range(2):
+            response = client.post(f"/users/{user_id}", json={"title": "Unknown Movie"})
+            assert response.status_code == 302
+
+        with app.app_context():
+            jobs = job_queue.find_unfinished_jobs(user_id, ADD_USER_MOVIE)
+            assert [job.payload for job in jobs] == [{"user_id": user_id,
+                                                      "title": "Unknown Movie"}]
+
+    def test_add_user_movie_requires_title(self, app, client):
+        user_id = add_user(app, "untitled")
+        assert client.post(f"/users/{user_id}", json={}).status_code == 400
@@ -0,0 +1,170 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event
+from time import sleep
+import pytest
+from main.concurrency.deadline import DeadlineExceededError, deadline_scope
+from main.concurrency.single_flight import SingleFlight
+from main.omdb.coalescing_omdb_client import CoalescingOmdbClient
+from main.gemini.coalescing_gemini_client import CoalescingGeminiClient
+
+
+class BlockingCall:
+    def __init__(self, result=None, error=None):
+        self.calls = 0
+        self.release = Event()
+        self._result = result
+        self._error = error
+
+    def __call__(self, *args):
+        self.calls += 1
+        self.release.wait(timeout=5)
+
+        if self._error:
+            raise self._error
+
+        return self._result
+
+
+def wait_for_coalesced(single_flight, count):
+    for _ in range(500):
+        if single_flight.stats()["coalesced"] >= count:
+            return
+
+        sleep(0.01)
+
+    raise TimeoutError("Calls were not coalesced")
+
+
+@pytest.fixture(scope="function")
+def single_flight():
+    return SingleFlight()
+
+
+class TestSingleFlight:
+    def test_do(self, single_flight):
+        assert single_flight.do("key", lambda: 42) == 42
+        assert single_flight.stats() == {"calls": 1, "coalesced": 0, "in_flight": 0}
+
+    def test_do_coalesces_concurrent_calls(self, single_flight):
+        call = BlockingCall(result={"title": "Inception"})
+
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = [executor.submit(single_flight.do, "key", call) for _ in range(3)]
+            wait_for_coalesced(single_flight, 2)
+            call.release.set()
+
+        assert [future.result() for future in futures] == [{"title": "Inception"}] * 3
+        assert call.calls == 1
+        assert single_flight.stats() == {"calls": 3, "coalesced": 2, "in_flight": 0}
+
+    def test_do_shares_exceptions(self, single_flight):
+        call = BlockingCall(error=ValueError("not found"))
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            futures = [executor.submit(single_flight.do, "key", call) for _ in range(2)]
+            wait_for_coalesced(single_flight, 1)
+            call.release.set()
+
+        for future in futures:
+            with pytest.raises(ValueError):
+                future.result()
+
+        assert call.calls == 1
+
+    def test_do_waiting_gives_up_at_deadline(self, single_flight):
+        call = BlockingCall(result="ok")
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            leader = executor.submit(single_flight.do, "key", call)
+
+            while single_flight.stats()["in_flight"] == 0:
+                sleep(0.01)
+
+            try:
+                with deadline_scope(0.05):
+                    with pytest.raises(DeadlineExceededError):
+                        single_flight.do("key", call)
+            finally:
+                call.release.set()
+
+        assert leader.result() == "ok"
+        assert call.calls == 1
+
+    def test_do_calls_again_if_leader_missed_its_deadline(self, single_flight):
+        call = BlockingCall(error=DeadlineExceededError())
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            leader = executor.submit(single_flight.do, "key", call)
+
+            while single_flight.stats()["in_flight"] == 0:
+                sleep(0.01)
+
+            follower = executor.submit(single_flight.do, "key", lambda: "ok")
+            wait_for_coalesced(single_flight, 1)
+            call.release.set()
+
+        with pytest.raises(DeadlineExceededError):
+            leader.result()
+
+        assert follower.result() == "ok"
+        assert call.calls == 1
+        assert single_flight.stats() == {"calls": 2, "coalesced": 1, "in_flight": 0}
+
+    def test_do_executes_again_after_finish(self, single_flight):
+        single_flight.do("key", lambda: 1)
+        assert single_flight.do("key", lambda: 2) == 2
+        assert single_flight.stats()["coalesced"] == 0
+
+    def test_do_separates_keys(self, single_flight):
+        assert single_flight.do("a", lambda: single_flight.do("b", lambda: "b")) == "b"
+
+
+class TestCoalescingClients:
+    def test_omdb_client_coalesces_normalized_titles(self, single_flight):
+        call = BlockingCall(result={"title": "Inception"})
+
+        class FakeOmdbClient:
+            find_movie_by_title = call
+
+        client = CoalescingOmdbClient(client=FakeOmdbClient(), single_flight=single_flight)
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            first = executor.submit(client.find_movie_by_title, "Inception")
+            second = executor.submit(client.find_movie_by_title, "  inception ")
+            wait_for_coalesced(single_flight, 1)
+            call.release.set()
+
+        assert first.result() == second.result() == {"title": "Inception"}
+        assert call.calls == 1
+        assert client.stats() == {"coalescing": {"calls": 2, "coalesced": 1, "in_flight": 0}}
+
+    def test_omdb_client_separates_kinds(self, single_flight):
+        class FakeOmdbClient:
+            def find_movie_by_title(self, title):
+                return "movie"
+
+            def search_movies(self, title):
+                return "search"
+
+        client = CoalescingOmdbClient(client=FakeOmdbClient(), single_flight=single_flight)
+        assert client.find_movie_by_title("Inception") == "movie"
+        assert client.search_movies("Inception") == "search"
+
+    def test_gemini_client_coalesces_favourites_in_any_order(self, single_flight):
+        call = BlockingCall(result=["Interstellar"])
+
+        class FakeGeminiClient:
+            find_recommendations = call
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            first = executor.submit(
+                CoalescingGeminiClient(client=FakeGeminiClient(), single_flight=single_flight)
+                .find_recommendations, ["A", "B"])
+            second = executor.submit(
+                CoalescingGeminiClient(client=FakeGeminiClient(), single_flight=single_flight)
+                .find_recommendations, ["B", "A"])
+            wait_for_coalesced(single_flight, 1)
+            call.release.set()
+
+        assert first.result() == second.result() == ["Interstellar"]
+        assert call.calls == 1
@@ -0,0 +1,145 @@
+from contextlib import nullcontext
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from main.repository import Base
+from main.repository.entities import Job
+from main.repository.sqlite_job_queue import SQLiteJobQueue
+from main.jobs.job_workers import JobWorkers, PermanentJobError
+
+TEST_DB_URI = "sqlite:///:memory:"
+
+engine = create_engine(TEST_DB_URI)
+Session = sessionmaker(bind=engine)
+
+
+@pytest.fixture(scope="function")
+def session():
+    Base.metadata.create_all(engine)
+    session_ = Session()
+
+    try:
+        yield session_
+    finally:
+        session_.rollback()
+        session_.close()
+        Base.metadata.drop_all(engine)
+
+
+@pytest.fixture(scope="function")
+def queue(session, clock):
+    return SQLiteJobQueue(session=session, clock=clock)
+
+
+def create_workers(queue, handler):
+    return JobWorkers(queue=queue, handlers={"test": handler}, context=nullcontext,
+                      max_attempts=3, backoff_base=2)
+
+
+class TestSQLiteJobQueue:
+    def test_enqueue(self, queue):
+        job = queue.enqueue("test", {"title": "Inception"}, user_id=1)
+        assert queue.find_job_by_id(job.id).to_dict() == {
+            "id": 1,
+            "kind": "test",
+            "payload": {"title": "Inception"},
+            "status": Job.PENDING,
+            "attempts": 0,
+            "error": None,
+        }
+
+    def test_claim(self, queue):
+        first = queue.enqueue("test", {})
+        queue.enqueue("test", {})
+        job = queue.claim()
+        assert (job.id, job.status, job.attempts) == (first.id, Job.RUNNING, 1)
+
+    def test_claim_nothing_due(self, queue, clock):
+        assert queue.claim() is None
+        queue.enqueue("test", {})
+        queue.retry(queue.claim().id, "error", delay=10)
+        assert queue.claim() is None
+        clock.now += 10
+        assert queue.claim().attempts == 2
+
+    def test_claim_once(self, queue):
+        queue.enqueue("test", {})
+        assert queue.claim() is not None
+        assert queue.claim() is None
+
+    def test_complete_and_fail(self, queue):
+        first = queue.enqueue("test", {})
+        second = queue.enqueue("test", {})
+        queue.complete(first.id)
+        queue.fail(second.id, "error")
+        assert queue.find_job_by_id(first.id).status == Job.DONE
+        assert queue.find_job_by_id(second.id).to_dict()["error"] == "error"
+
+    def test_resume_interrupted(self, queue):
+        queue.enqueue("test", {})
+        queue.claim()
+        assert queue.resume_interrupted() == 1
+        assert queue.claim().attempts == 2
+
+    def test_find_unfinished_jobs(self, session, queue):
+        session.execute(text("INSERT INTO users (username) VALUES ('user')"))
+        running = queue.enqueue("test", {}, user_id=1)
+        queue.claim()
+        pending = queue.enqueue("test", {}, user_id=1)
+        queue.complete(queue.enqueue("test", {}, user_id=1).id)
+        queue.enqueue("other", {}, user_id=1)
+        jobs = queue.find_unfinished_jobs(1, "test")
+        assert [job.id for job in jobs] == [running.id, pending.id]
+
+
+class TestJobWorkers:
+    def test_run_next(self, queue):
+        payloads = []
+        workers = create_workers(queue, payloads.append)
+        job = queue.enqueue("test", {"title": "Inception"})
+        assert workers.run_next()
+        assert payloads == [{"title": "Inception"}]
+        assert queue.find_job_by_id(job.id).status == Job.DONE
+        assert not workers.run_next()
+
+    def test_retries_with_backoff(self, queue, clock):
+        def handler(payload):
+            raise RuntimeError("OMDB unavailable")
+
+        workers = create_workers(queue, handler)
+        job = queue.enqueue("test", {})
+        workers.run_next()
+        assert queue.find_job_by_id(job.id).to_dict()["error"] == "RuntimeError: OMDB unavailable"
+        clock.now += 1.9
+        assert not workers.run_next()
+        clock.now += 0.1
+        assert workers.run_next()
+        clock.now += 4
+        assert workers.run_next()
+        assert queue.find_job_by_id(job.id).status == Job.FAILED
+        assert queue.find_job_by_id(job.id).attempts == 3
+
+    def test_permanent_failure(self, queue):
+        def handler(payload):
+            raise PermanentJobError("Movie not found")
+
+        workers = create_workers(queue, handler)
+        job = queue.enqueue("test", {})
+        workers.run_next()
+        assert queue.find_job_by_id(job.id).status == Job.FAILED
+
+    def test_unknown_kind_fails(self, queue):
+        workers = create_workers(queue, lambda payload: None)
+        job = queue.enqueue("unknown", {})
+        workers.run_next()
+        assert queue.find_job_by_id(job.id).status == Job.FAILED
+
+    def test_start_resumes_interrupted_jobs(self, queue):
+        payloads = []
+        workers = JobWorkers(queue=queue, handlers={"test": payloads.append}, context=nullcontext,
+                             threads=0)
+        queue.enqueue("test", {"title": "Interrupted"})
+        queue.claim()
+        workers.start()
+        assert workers.run_next()
+        assert payloads == [{"title": "Interrupted"}]
@@ -0,0 +1,232 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from main.repository import Base
+from main.repository.entities import Movie, Genre, MovieGenreAssociation
+from main.repository.migrations import migrate
+from main.repository.sqlite_projections import SQLiteProjections
+from main.repository.sqlite_repository import SQLiteRepository
+
+TEST_DB_URI = "sqlite:///:memory:"
+
+engine = create_engine(TEST_DB_URI)
+Session = sessionmaker(bind=engine)
+
+
+@pytest.fixture(scope="function")
+def session():
+    Base.metadata.create_all(engine)
+    session_ = Session()
+
+    try:
+        yield session_
+    finally:
+        session_.rollback()
+        session_.close()
+        Base.metadata.drop_all(engine)
+        with engine.begin() as connection:
+            connection.execute(text("DROP TABLE IF EXISTS movies_fts"))
+            connection.execute(text("DROP TABLE IF EXISTS movies_fts_deferred"))
+
+
+@pytest.fixture(scope="function")
+def repo(session):
+    return SQLiteRepository(session=session)
+
+
+@pytest.fixture(scope="function")
+def projections(session):
+    return SQLiteProjections(session=session)
+
+
+def add_movies(repo, count):
+    repo.add_movies_bulk({"title": f"Movie {i}", "release_year": 2000 + i, "rating": 7.0,
+                          "poster_url": "", "imdb_id": f"tt{i}",
+                          "genre_names": ["Drama", f"Genre {i}"]} for i in range(count))
+
+
+class TestSQLiteProjections:
+    def test_find_movies_like(self, repo, projections):
+        add_movies(repo, 3)
+        movies = projections.find_movies_like("movie 1")
+        assert [movie.to_dict() for movie in movies] == [{
+            "id": 2,
+            "imdb_id": "tt1",
+            "title": "Movie 1",
+            "release_year": 2001,
+            "rating": 7.0,
+            "poster_url": "",
+            "genres": [{"id": 1, "name": "Drama"}, {"id": 3, "name": "Genre 1"}]
+        }]
+
+    def test_find_movies_like_limit(self, repo, projections):
+        add_movies(repo, 3)
+        assert len(projections.find_movies_like("movie", limit=2)) == 2
+
+    def test_find_movies_like_matches_entity_to_dict(self, repo, projections):
+        add_movies(repo, 2)
+        assert [movie.to_dict() for movie in projections.find_movies_like("movie")] == [
+            movie.to_dict() for movie in repo.find_movies_like("movie")]
+
+    def test_search_movies(self, session, repo, projections):
+        migrate(engine)
+        add_movies(repo, 3)
+        assert [movie.title for movie in projections.search_movies("genre 2")] == ["Movie 2"]
+        assert projections.search_movies("!") == []
+
+    def test_search_movies_matches_crew_members(self, repo, projections):
+        migrate(engine)
+        repo.add_movie(title="The Dark Knight", release_year=2008, rating=9.0, poster_url="",
+                       imdb_id="tt1", genre_names=["Action"], directors=["Christopher Nolan"],
+                       writers=[], actors=["Christian Bale"])
+        repo.add_movie(title="Knight and Day", release_year=2010, rating=6.3, poster_url="",
+                       imdb_id="tt2", genre_names=["Comedy"], directors=[], writers=[],
+                       actors=["Tom Cruise"])
+        repo.add_movie(title="Memento", release_year=2000, rating=8.4, poster_url="",
+                       imdb_id="tt3", genre_names=["Thriller"], directors=["Christopher Nolan"],
+                       writers=[], actors=[])
+
+        assert [movie.title for movie in projections.search_movies("dark kni")] == [
+            "The Dark Knight"]
+        assert {movie.title for movie in projections.search_movies("knight")} == {
+            "The Dark Knight", "Knight and Day"}
+        assert {movie.title for movie in projections.search_movies("nolan")} == {
+            "The Dark Knight", "Memento"}
+        assert len(projections.search_movies("knight", limit=1)) == 1
+
+    def test_search_movies_ranks_title_matches_first(self, repo, projections):
+        migrate(engine)
+        repo.add_movie(title="Some Film", release_year=2000, rating=7.0, poster_url="",
+                       imdb_id="tt1", genre_names=[], directors=["Drama Director"], writers=[],
+                       actors=[])
+        repo.add_movie(title="Drama", release_year=2000, rating=7.0, poster_url="",
+                       imdb_id="tt2", genre_names=[], directors=[], writers=[], actors=[])
+        assert [movie.title for movie in projections.search_movies("drama")] == ["Drama",
+                                                                                "Some Film"]
+
+    def test_search_movies_indexes_movies_added_by_session(self, session, projections):
+        migrate(engine)
+        session.add_all([Movie(id=1, title="Heat"), Genre(id=1, name="Crime")])
+        session.flush()
+        session.add(MovieGenreAssociation(movie_id=1, genre_id=1))
+        session.flush()
+        assert [movie.title for movie in projections.search_movies("crime")] == ["Heat"]
+
+    def test_search_movies_indexes_repository_movies_once(self, session, repo, projections):
+        migrate(engine)
+        add_movies(repo, 2)
+        assert session.execute(text("SELECT COUNT(*) FROM movies_fts_deferred")).scalar() == 0
+        assert [movie.title for movie in projections.search_movies("drama")] == ["Movie 0",
+                                                                                "Movie 1"]
+
+    def test_search_movies_indexes_existing_movies(self, session, repo, projections):
+        add_movies(repo, 2)
+        session.commit()
+        migrate(engine)
+        assert [movie.title for movie in projections.search_movies("movie 1")] == ["Movie 1"]
+
+    def test_find_movies_page(self, repo, projections):
+        add_movies(repo, 3)
+        first_page, cursor = projections.find_movies_page(limit=2)
+        last_page, last_cursor = projections.find_movies_page(after_id=cursor, limit=2)
+        assert [movie.title for movie in first_page + last_page] == ["Movie 0", "Movie 1",
+                                                                     "Movie 2"]
+        assert last_cursor is None
+
+    def test_find_movies_page_exact_fit(self, repo, projections):
+        add_movies(repo, 2)
+        movies, cursor = projections.find_movies_page(limit=2)
+        assert len(movies) == 2
+        assert cursor is None
+
+    def test_stream_all_movies(self, repo, projections):
+        add_movies(repo, 5)
+        movies = list(projections.stream_all_movies(batch_size=2))
+        assert [movie.title for movie in movies] == [f"Movie {i}" for i in range(5)]
+        assert all(movie.genres[0].name == "Drama" for movie in movies)
+
+    def test_find_movies_by_ids(self, repo, projections):
+        add_movies(repo, 3)
+        movies = projections.find_movies_by_ids([3, 99, 1])
+        assert [movie.title for movie in movies] == ["Movie 2", "Movie 0"]
+        assert [genre.name for genre in movies[0].genres] == ["Drama", "Genre 2"]
+        assert projections.find_movies_by_ids([]) == []
+
+    def test_find_movie_titles(self, repo, projections):
+        first = repo.add_user("first", None)
+        second = repo.add_user("second", None)
+        add_movies(repo, 2)
+        repo.add_user_movie(first.id, 2)
+        repo.add_user_movie(second.id, 2)
+        assert sorted(projections.find_movie_titles()) == [(1, "Movie 0", 0), (2, "Movie 1", 2)]
+
+    def test_find_all_users(self, repo, projections):
+        repo.add_user("user", "pic.png")
+        users = projections.find_all_users()
+        assert [(user.id, user.username, user.profile_picture) for user in users] == [
+            (1, "user", "pic.png")]
+        assert users[0].to_dict() == {"id": 1, "username": "user", "profile_picture": "pic.png"}
+
+    def test_find_movie_details_by_titles(self, repo, projections):
+        repo.add_movie("Inception", 2010, 8.8, "poster.jpg", "tt1375666", ["Action", "Sci-Fi"],
+                       ["Christopher Nolan"], ["Christopher Nolan"],
+                       ["Leonardo DiCaprio", "Elliot Page"])
+        add_movies(repo, 1)
+        details = projections.find_movie_details_by_titles(["Inception", "Unknown"])
+        assert details == {"Inception": {
+            "title": "Inception",
+            "release_year": 2010,
+            "rating": 8.8,
+            "poster_url": "poster.jpg",
+            "imdb_id": "tt1375666",
+            "genres": ["Action", "Sci-Fi"],
+            "directors": ["Christopher Nolan"],
+            "writers": ["Christopher Nolan"],
+            "actors": ["Leonardo DiCaprio", "Elliot Page"]
+        }}
+
+    def test_find_movie_details_by_titles_empty(self, projections):
+        assert projections.find_movie_details_by_titles([]) == {}
+
+    def test_find_favourites(self, repo, projections):
+        user = repo.add_user("user", None)
+        add_movies(repo, 3)
+        repo.add_user_movie(user.id, 3)
+        repo.add_user_movie(user.id, 1)
+        assert projections.find_favourites(user.id) == [(1, "Movie 0"), (3, "Movie 2")]
+
+    def test_find_favourite_summaries(self, repo, projections):
+        user = repo.add_user("user", None)
+        add_movies(repo, 3)
+        repo.add_user_movie(user.id, 3)
+        repo.add_user_movie(user.id, 1)
+        repo.update_user_movie(user.id, 1, 9.0)
+        favourites = projections.find_favourite_summaries(user.id)
+        assert [(favourite.id, favourite.title, favourite.personal_rating)
+                for favourite in favourites] == [(3, "Movie 2", None), (1, "Movie 0", 9.0)]
+        assert [genre.name for genre in favourites[0].genres] == ["Drama", "Genre 2"]
+
+    def test_find_movie_details_by_ids(self, repo, projections):
+        add_movies(repo, 3)
+        details = projections.find_movie_details_by_ids([3, 99, 1])
+        assert [movie["title"] for movie in details] == ["Movie 2", "Movie 0"]
+        assert details[0]["genres"] == ["Drama", "Genre 2"]
+
+    def test_find_favourite_ratings(self, repo, projections):
+        first = repo.add_user("first", None)
+        second = repo.add_user("second", None)
+        add_movies(repo, 2)
+        repo.add_user_movie(first.id, 1)
+        repo.add_user_movie(second.id, 2)
+        repo.update_user_movie(second.id, 2, 8.5)
+        assert sorted(projections.find_favourite_ratings()) == [(1, 1, None), (2, 2, 8.5)]
+        assert projections.find_favourite_ratings(second.id) == [(2, 2, 8.5)]
+
+    def test_find_movie_features(self, repo, projections):
+        repo.add_movie("Inception", 2010, 8.8, "", "tt1375666", ["Action"],
+                       ["Christopher Nolan"], [], ["Elliot Page"])
+        add_movies(repo, 1)
+        genres, crew_members = projections.find_movie_features([1])
+        assert genres == [(1, 1)]
+        assert sorted(crew_members) == [(1, 1, "director"), (1, 2, "actor")]
+        assert len(projections.find_movie_features()[0]) == 3
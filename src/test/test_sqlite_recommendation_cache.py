@@ -0,0 +1,110 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from main.repository import Base
+from main.repository.sqlite_recommendation_cache import SQLiteRecommendationCache, \
+    favourites_fingerprint
+from main.repository.sqlite_repository import SQLiteRepository
+
+TEST_DB_URI = "sqlite:///:memory:"
+
+engine = create_engine(TEST_DB_URI)
+Session = sessionmaker(bind=engine)
+
+MOVIES = [{"title": "Interstellar", "imdb_id": "tt0816692"}]
+
+
+@pytest.fixture(scope="function")
+def session():
+    Base.metadata.create_all(engine)
+    session_ = Session()
+
+    try:
+        yield session_
+    finally:
+        session_.rollback()
+        session_.close()
+        Base.metadata.drop_all(engine)
+
+
+@pytest.fixture(scope="function")
+def repo(session):
+    return SQLiteRepository(session=session)
+
+
+@pytest.fixture(scope="function")
+def cache(session, clock):
+    return SQLiteRecommendationCache(session=session, ttl=100, clock=clock)
+
+
+@pytest.fixture(scope="function")
+def user_id(repo):
+    user = repo.add_user("user", None)
+    for i in range(2):
+        movie = repo.add_movie(f"Movie {i}", 2000, 7.0, "", f"tt{i}", [], [], [], [])
+        repo.add_user_movie(user.id, movie.id)
+    return user.id
+
+
+class TestFavouritesFingerprint:
+    def test_ignores_order(self):
+        assert favourites_fingerprint([3, 1, 2]) == favourites_fingerprint([1, 2, 3])
+
+    def test_differs_for_other_favourites(self):
+        assert favourites_fingerprint([1, 2]) != favourites_fingerprint([1, 2, 3])
+        assert favourites_fingerprint([1, 23]) != favourites_fingerprint([12, 3])
+
+
+class TestSQLiteRecommendationCache:
+    def test_get_and_set(self, cache, user_id):
+        assert cache.get(user_id, "fingerprint") is None
+        cache.set(user_id, "fingerprint", MOVIES)
+        assert cache.get(user_id, "fingerprint") == MOVIES
+
+    def test_set_replaces(self, cache, user_id):
+        cache.set(user_id, "old", MOVIES)
+        cache.set(user_id, "new", [])
+        assert cache.get(user_id, "old") is None
+        assert cache.get(user_id, "new") == []
+
+    def test_expires(self, cache, clock, user_id):
+        cache.set(user_id, "fingerprint", MOVIES)
+        clock.now += 100
+        assert cache.get(user_id, "fingerprint") is None
+
+    def test_find_fingerprints(self, repo, cache, clock, user_id):
+        other = repo.add_user("other", None)
+        cache.set(user_id, "expired", MOVIES)
+        clock.now += 60
+        cache.set(other.id, "fingerprint", MOVIES)
+        assert cache.find_fingerprints() == {user_id: "expired", other.id: "fingerprint"}
+        clock.now += 50
+        assert cache.find_fingerprints() == {other.id: "fingerprint"}
+
+    def test_invalidate(self, cache, user_id):
+        cache.set(user_id, "fingerprint", MOVIES)
+        cache.invalidate(user_id)
+        assert cache.get(user_id, "fingerprint") is None
+
+    def test_persists(self, session, cache, clock, user_id):
+        cache.set(user_id, "fingerprint", MOVIES)
+        session.close()
+        restarted = SQLiteRecommendationCache(session=Session(), ttl=100, clock=clock)
+        assert restarted.get(user_id, "fingerprint") == MOVIES
+
+    def test_add_user_movie_invalidates(self, repo, cache, user_id):
+        cache.set(user_id, "fingerprint", MOVIES)
+        movie = repo.add_movie("Movie 2", 2000, 7.0, "", "tt2", [], [], [], [])
+        repo.add_user_movie(user_id, movie.id)
+        assert cache.get(user_id, "fingerprint") is None
+
+    def test_delete_user_movie_invalidates(self, repo, cache, user_id):
+        cache.set(user_id, "fingerprint", MOVIES)
+        assert repo.delete_user_movie(user_id, 1)
+        assert cache.get(user_id, "fingerprint") is None
+
+    def test_other_users_unaffected(self, repo, cache, user_id):
+        other = repo.add_user("other", None)
+        cache.set(other.id, "fingerprint", MOVIES)
+        repo.delete_user_movie(user_id, 1)
+        assert cache.get(other.id, "fingerprint") == MOVIES
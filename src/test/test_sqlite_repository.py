@@ -1,7 +1,10 @@
 import pytest
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, select, func, text
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import sessionmaker
 from main.repository import Base
+from main.repository.entities import Genre, CrewMember, Movie
+from main.repository.migrations import migrate
 from main.repository.sqlite_repository import SQLiteRepository
 
 TEST_DB_URI = "sqlite:///:memory:"
@@ -28,6 +31,54 @@ def repo(session):
     return SQLiteRepository(session=session)
 
 
+@pytest.fixture(scope="function")
+def full_text_search(session):
+    migrate(engine)
+
+    try:
+        yield
+    finally:
+        with engine.begin() as connection:
+            connection.execute(text("DROP TABLE IF EXISTS movies_fts"))
+            connection.execute(text("DROP TABLE IF EXISTS movies_fts_deferred"))
+
+
+@pytest.fixture(scope="function")
+def statements():
+    executed = []
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count_statement)
+
+    try:
+        yield executed
+    finally:
+        event.remove(engine, "before_cursor_execute", count_statement)
+
+
+def add_user_with_movies(repo, username, movie_count):
+    user = repo.add_user(username, None)
+
+    for i in range(movie_count):
+        movie = repo.add_movie(title=f"{username} Movie {i}", release_year=2000 + i, rating=7.0,
+                               poster_url="", imdb_id=f"tt{username}{i}",
+                               genre_names=[f"Genre {i}", "Drama"],
+                               directors=[f"Director {i}"], writers=[f"Writer {i}"],
+                               actors=[f"Actor {i}", "Shared Actor"])
+        repo.add_user_movie(user.id, movie.id)
+
+    return user
+
+
+def render_user_library(user):
+    return [(user_movie.movie.title,
+             [genre.name for genre in user_movie.movie.genres],
+             [mcm.crew_member.full_name for mcm in user_movie.movie.crew_members])
+            for user_movie in user.movie_associations]
+
+
 class TestSQLiteRepository:
     def test_find_all_movies_empty(self, repo):
         assert repo.find_all_movies() == []
@@ -276,3 +327,140 @@ class TestSQLiteRepository:
 
     def test_has_user_not_exists(self, repo):
         assert repo.has_user(99) is False
+
+    def test_find_user_library(self, repo):
+        user = add_user_with_movies(repo, "library", 2)
+        library = repo.find_user_library(user.id)
+        assert library is not None
+        assert len(library.movie_associations) == 2
+        assert sorted(render_user_library(library)[0][1]) == ["Drama", "Genre 0"]
+        assert len(render_user_library(library)[0][2]) == 4
+
+    def test_find_user_library_not_found(self, repo):
+        assert repo.find_user_library(1) is None
+
+    def test_find_user_library_constant_query_count(self, repo, session, statements):
+        small_user = add_user_with_movies(repo, "small", 1)
+        large_user = add_user_with_movies(repo, "large", 20)
+
+        session.expire_all()
+        statements.clear()
+        render_user_library(repo.find_user_library(small_user.id))
+        small_library_queries = len(statements)
+
+        session.expire_all()
+        statements.clear()
+        render_user_library(repo.find_user_library(large_user.id))
+        large_library_queries = len(statements)
+
+        assert small_library_queries == large_library_queries
+
+    def test_add_movie_commits_once(self, repo, session):
+        commits = []
+        event.listen(session, "after_commit", commits.append)
+        repo.add_movie(title="Single Commit", release_year=2020, rating=7.0, poster_url="",
+                       imdb_id="tt1", genre_names=["Action", "Drama", "Action"],
+                       directors=["Jane Doe"], writers=["Jane Doe", "John Doe"],
+                       actors=["John Doe", "Someone Else"])
+        assert len(commits) == 1
+
+    def test_add_movie_resolves_names_once(self, repo, session):
+        repo.add_genre("Action")
+        added_movie = repo.add_movie(title="Shared Names", release_year=2020, rating=7.0,
+                                     poster_url="", imdb_id="tt1", genre_names=["Action", "Drama"],
+                                     directors=["Jane Doe"], writers=["Jane Doe"],
+                                     actors=["Jane Doe"])
+        assert session.scalar(select(func.count()).select_from(Genre)) == 2
+        assert session.scalar(select(func.count()).select_from(CrewMember)) == 1
+        assert len(added_movie.crew_members) == 3
+
+    def test_add_movie_rolls_back_on_failure(self, repo, session, monkeypatch):
+        def failing_commit():
+            raise SQLAlchemyError("commit failed")
+
+        monkeypatch.setattr(session, "commit", failing_commit)
+
+        with pytest.raises(SQLAlchemyError):
+            repo.add_movie(title="Rolled Back", release_year=2020, rating=7.0, poster_url="",
+                           imdb_id="tt1", genre_names=["Action"], directors=["Jane Doe"],
+                           writers=[], actors=[])
+
+        monkeypatch.undo()
+        assert session.scalar(select(func.count()).select_from(Movie)) == 0
+        assert session.scalar(select(func.count()).select_from(Genre)) == 0
+        assert session.scalar(select(func.count()).select_from(CrewMember)) == 0
+
+    def test_add_movies_bulk(self, repo):
+        repo.add_genre("Drama")
+        movies = ({"title": f"Bulk Movie {i}", "release_year": 2000 + i, "rating": 7.0,
+                   "poster_url": "", "imdb_id": f"tt{i}",
+                   "genre_names": ["Drama", f"Genre {i % 2}"],
+                   "directors": ["Bulk Director"], "writers": ["Bulk Director"],
+                   "actors": [f"Actor {i}"]} for i in range(5))
+
+        stats = repo.add_movies_bulk(movies, batch_size=2)
+
+        assert [batch["movies"] for batch in stats] == [2, 2, 1]
+        assert len(repo.find_all_movies()) == 5
+        movie = repo.find_movie_by_title("Bulk Movie 3")
+        assert sorted(genre.name for genre in movie.genres) == ["Drama", "Genre 1"]
+        assert sorted((mcm.member_type, mcm.crew_member.full_name)
+                      for mcm in movie.crew_members) == [("actor", "Actor 3"),
+                                                         ("director", "Bulk Director"),
+                                                         ("writer", "Bulk Director")]
+        assert repo.find_genre_by_name("Drama") is not None
+        assert repo.find_crew_member_by_name("Bulk Director") is not None
+
+    def test_add_movies_bulk_empty(self, repo):
+        assert repo.add_movies_bulk([]) == []
+
+    def test_add_genre_existing_name(self, repo, session):
+        added_genre = repo.add_genre("Western")
+        assert repo.add_genre("Western").id == added_genre.id
+        assert session.scalar(select(func.count()).select_from(Genre)) == 1
+
+    def test_add_crew_member_existing_name(self, repo, session):
+        added_crew_member = repo.add_crew_member("Clint Eastwood")
+        assert repo.add_crew_member("Clint Eastwood").id == added_crew_member.id
+        assert session.scalar(select(func.count()).select_from(CrewMember)) == 1
+
+    def test_add_movie_existing_imdb_id(self, repo, session):
+        added_movie = repo.add_movie(title="Original", release_year=2020, rating=7.0,
+                                     poster_url="", imdb_id="tt42", genre_names=["Drama"],
+                                     directors=["Jane Doe"], writers=[], actors=[])
+        duplicate_movie = repo.add_movie(title="Duplicate", release_year=2020, rating=7.0,
+                                         poster_url="", imdb_id="tt42", genre_names=["Action"],
+                                         directors=["John Doe"], writers=[], actors=[])
+        assert duplicate_movie.id == added_movie.id
+        assert duplicate_movie.title == "Original"
+        assert [genre.name for genre in duplicate_movie.genres] == ["Drama"]
+        assert session.scalar(select(func.count()).select_from(Movie)) == 1
+        assert repo.find_genre_by_name("Action") is None
+        assert repo.find_crew_member_by_name("John Doe") is None
+
+    def test_add_movies_bulk_skips_existing_imdb_ids(self, repo):
+        repo.add_movie(title="Existing", release_year=2020, rating=7.0, poster_url="",
+                       imdb_id="tt1", genre_names=[], directors=[], writers=[], actors=[])
+        movies = [{"title": title, "imdb_id": imdb_id} for title, imdb_id in
+                  [("Existing Again", "tt1"), ("New", "tt2"), ("New Again", "tt2"), ("Other", "")]]
+
+        stats = repo.add_movies_bulk(movies)
+
+        assert stats[0]["movies"] == 2
+        assert stats[0]["skipped"] == 2
+        assert sorted(movie.title for movie in repo.find_all_movies()) == ["Existing", "New",
+                                                                            "Other"]
+
+    def test_add_movies_bulk_skips_names_of_existing_imdb_ids(self, repo):
+        repo.add_movie(title="Existing", release_year=2020, rating=7.0, poster_url="",
+                       imdb_id="tt1", genre_names=[], directors=[], writers=[], actors=[])
+        repo.add_movies_bulk([{"title": "Existing Again", "imdb_id": "tt1",
+                               "genre_names": ["Action"], "directors": ["John Doe"]}])
+        assert repo.find_genre_by_name("Action") is None
+        assert repo.find_crew_member_by_name("John Doe") is None
+
+    def test_has_full_text_search(self, repo):
+        assert repo.has_full_text_search() is False
+
+    def test_has_full_text_search_after_migration(self, full_text_search, repo):
+        assert repo.has_full_text_search() is True
@@ -0,0 +1,48 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from main.concurrency.deadline import current_deadline, deadline_scope
+from main.repository.sqlite_tuning import WAL_PROFILE, apply_pragmas, interrupt_on_deadline
+
+COUNT_QUERY = text("WITH RECURSIVE n(i) AS "
+                   "(SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 100000) "
+                   "SELECT count(*) FROM n")
+
+
+def pragma(engine, name):
+    with engine.connect() as connection:
+        return connection.execute(text(f"PRAGMA {name}")).scalar()
+
+
+class TestSQLiteTuning:
+    def test_apply_pragmas(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'tuning.sqlite'}")
+        apply_pragmas(engine, WAL_PROFILE)
+        assert pragma(engine, "journal_mode") == "wal"
+        assert pragma(engine, "synchronous") == 1  # NORMAL
+        assert pragma(engine, "busy_timeout") == 5000
+        assert pragma(engine, "cache_size") == -64000
+        assert pragma(engine, "temp_store") == 2  # MEMORY
+        engine.dispose()
+
+    def test_apply_pragmas_none(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'tuning.sqlite'}")
+        apply_pragmas(engine, None)
+        assert pragma(engine, "journal_mode") == "delete"
+        engine.dispose()
+
+    def test_interrupt_on_deadline(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'tuning.sqlite'}")
+        interrupt_on_deadline(engine, current_deadline)
+
+        with engine.connect() as connection:
+            assert connection.execute(COUNT_QUERY).scalar() == 100000
+
+            with deadline_scope(5):
+                assert connection.execute(COUNT_QUERY).scalar() == 100000
+
+            with deadline_scope(0):
+                with pytest.raises(OperationalError, match="interrupted"):
+                    connection.execute(COUNT_QUERY)
+
+        engine.dispose()
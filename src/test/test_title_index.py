@@ -0,0 +1,116 @@
+import pytest
+from main.repository.title_index import TitleIndex, normalize_for_index, title_trigrams
+
+TITLES = [(1, "The Dark Knight", 5), (2, "Amélie", 2), (3, "Spider-Man", 1),
+          (4, "The Dark Knight", 9), (5, "Dark City", 0), (6, "Knight and Day", 0)]
+
+
+class FakeLoader:
+    def __init__(self, titles):
+        self.titles = list(titles)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.titles
+
+
+@pytest.fixture(scope="function")
+def loader():
+    return FakeLoader(TITLES)
+
+
+@pytest.fixture(scope="function")
+def index(loader):
+    return TitleIndex(load_titles=loader)
+
+
+class TestNormalizeForIndex:
+    def test_strips_accents_case_and_punctuation(self):
+        assert normalize_for_index("  Amélie: Spider-Man ") == "amelie spider man"
+
+
+class TestTitleTrigrams:
+    def test_pads_words(self):
+        assert title_trigrams("heat 2") == {"  h", " he", "hea", "eat", "at ", "  2", " 2 "}
+
+    def test_empty(self):
+        assert title_trigrams("") == set()
+
+
+class TestTitleIndex:
+    def test_builds_on_first_use(self, index, loader):
+        index.search("dark")
+        index.search("dark")
+        assert loader.calls == 1
+        assert len(index) == 6
+
+    def test_search_by_title_prefix(self, index):
+        assert index.search("AME") == [2]
+        assert index.search("spider m") == [3]
+        assert index.search("spiderman") == []
+
+    def test_search_ties_broken_by_popularity(self, index):
+        assert index.search("the dark") == [4, 1]
+
+    def test_search_title_matches_before_word_matches(self, index):
+        assert index.search("knight") == [6, 4, 1]
+        assert index.search("dark") == [5, 4, 1]
+
+    def test_search_limit(self, index):
+        assert index.search("d", limit=2) == [5, 4]
+
+    def test_search_empty_prefix(self, index):
+        assert index.search(" - ") == []
+
+    def test_add(self, index):
+        index.rebuild()
+        index.add(7, "Darkman")
+        index.add(7, "Darkman")
+        assert index.search("dark") == [5, 7, 4, 1]
+        assert len(index) == 7
+
+    def test_add_after_equal_titles(self, index):
+        index.rebuild()
+        index.add(8, "The Dark Knight")
+        assert index.search("the dark knight") == [4, 1, 8]
+
+    def test_find_similar_tolerates_typos(self, index):
+        assert index.find_similar("Spiderman") == [(3, 8 / 13)]
+        assert [movie_id for movie_id, _ in index.find_similar("the dark knigt")] == [1, 4]
+        assert [movie_id for movie_id, _ in index.find_similar("Amelei", threshold=0.4)] == [2]
+
+    def test_find_similar_ranked_by_similarity(self, index):
+        assert index.find_similar("dark knight", threshold=0.3) == [(1, 0.75), (4, 0.75),
+                                                                    (6, 0.5)]
+
+    def test_find_similar_threshold_and_limit(self, index):
+        assert index.find_similar("Amelei") == []
+        assert index.find_similar("dark knight", limit=1) == [(1, 0.75)]
+        assert index.find_similar(" - ") == []
+
+    def test_find_similar_after_add(self, index):
+        index.rebuild()
+        index.add(7, "Darkman")
+        assert index.find_similar("Darkmann") == [(7, 0.7)]
+
+    def test_find_corrections_skips_movies_of_same_series(self):
+        index = TitleIndex(load_titles=lambda: [(1, "Toy Story 2", 0), (2, "Aliens", 0),
+                                                (3, "Heat", 0), (4, "Rocky II", 0)])
+        assert [movie_id for movie_id, _ in index.find_similar("Toy Story", threshold=0.6)] == [1]
+        assert index.find_corrections("Toy Story", threshold=0.6) == []
+        assert [movie_id for movie_id, _ in index.find_similar("Alien", threshold=0.6)] == [2]
+        assert index.find_corrections("Alien", threshold=0.6) == []
+        assert index.find_corrections("Heat 2", threshold=0.6) == []
+        assert index.find_corrections("Rocky", threshold=0.6) == []
+
+    def test_find_corrections_keeps_typos(self, index):
+        assert index.find_corrections("Spider-Mna") == [(3, 4 / 7)]
+        assert [movie_id for movie_id, _ in index.find_corrections("the dark knigth")] == [1, 4]
+
+    def test_invalidate_rebuilds(self, index, loader):
+        index.rebuild()
+        loader.titles.append((9, "Darkest Hour", 0))
+        index.invalidate()
+        assert 9 in index.search("darkest")
+        assert loader.calls == 2
@@ -1,8 +1,5 @@
-const API_MOVIES = "movies";
-const OMDB_MOVIES = "omdb-movies";
-
-const searchMoviesByTitle = async (endpoint, title) => {
-    const url = `${API_URL}/${endpoint}?title=${title}`;
+const searchMoviesByTitle = async (title) => {
+    const url = `${API_URL}/search?title=${encodeURIComponent(title)}`;
     const res = await fetch(url);
 
     if (res.ok) {
@@ -91,20 +88,8 @@ const searchMovies = async () => {
         return;
     }
 
-    const apiRes = await searchMoviesByTitle(API_MOVIES, inputTitle);
-    const omdbRes = await searchMoviesByTitle(OMDB_MOVIES, inputTitle);
-
-    const combinedResults = [ ...apiRes.results, ...omdbRes.results ];
-    const filteredResults = removeDuplicates(combinedResults);
-    createResults({
-        results: filteredResults,
-        total_results: filteredResults.length
-    });
-};
-
-const removeDuplicates = (movies) => {
-    const titles = new Set();
-    return movies.filter(({ title }) => !titles.has(title) && titles.add(title));
+    // Local and OMDb results are merged and deduplicated by the server
+    createResults(await searchMoviesByTitle(inputTitle));
 };
 
 const debounce = (callback, delay) => {
@@ -0,0 +1,46 @@
+const JOB_POLL_INTERVAL = 1000;
+const FINISHED_JOB_STATES = ["done", "failed"];
+
+const fetchJob = async (jobId) => {
+    const url = `${API_URL}/jobs/${jobId}`;
+    const res = await fetch(url);
+
+    if (res.ok) {
+        return await res.json();
+    }
+
+    throw Error(`Unexpected error while fetching job at ${url}`);
+};
+
+const reloadWithMessage = (msg, msgLvl) => {
+    const url = new URL(window.location.href);
+    url.searchParams.set("msg", msg);
+    url.searchParams.set("msg_lvl", msgLvl);
+    window.location.replace(url.toString());
+};
+
+const pollPendingMovies = async () => {
+    const pendingMovies = document.querySelectorAll("#favourites-movie-grid .movie.pending");
+
+    if (pendingMovies.length === 0) {
+        return;
+    }
+
+    const jobs = await Promise.all(
+        [...pendingMovies].map(movie => fetchJob(movie.dataset.jobId))
+    );
+    const finishedJobs = jobs.filter(({ status }) => FINISHED_JOB_STATES.includes(status));
+
+    if (finishedJobs.length === 0) {
+        setTimeout(pollPendingMovies, JOB_POLL_INTERVAL);
+        return;
+    }
+
+    if (finishedJobs.some(({ status }) => status === "failed")) {
+        reloadWithMessage("Failed to add movie!", "error");
+    } else {
+        reloadWithMessage("Movie added successfully!", "success");
+    }
+};
+
+setTimeout(pollPendingMovies, JOB_POLL_INTERVAL);
@@ -1,13 +1,17 @@
-const getRecommendations = async () => {
+const streamRecommendations = (onMovie, onError) => {
     const pathname = new URL(window.location.href).pathname;
-    const url = `${API_URL}${pathname}/recommendations`;
-    const res = await fetch(url);
+    const source = new EventSource(`${API_URL}${pathname}/recommendations/stream`);
 
-    if (res.ok) {
-        return await res.json();
-    }
+    source.addEventListener("movie", (event) => onMovie(JSON.parse(event.data)));
+
+    source.addEventListener("done", () => source.close());
 
-    throw Error(`Unexpected error while getting recommendations ${res.statusText}`);
+    // Fired for error events of the server and for connection errors, which carry no data.
+    // Closing the source keeps the browser from reconnecting and requesting Gemini again.
+    source.addEventListener("error", (event) => {
+        source.close();
+        onError(event.data ? JSON.parse(event.data) : { message: "Connection lost" });
+    });
 };
 
 const handleAddClick = async (title) => {
@@ -130,17 +134,19 @@ const createMovieElement = ({ title, release_year, imdb_id, poster_url, rating,
     return createNode("div", [poster, details], ["movie", "compact"]);
 };
 
-const createMovieGrid = (recommendations) => {
+const addToMovieGrid = (recommendation) => {
     const movieGrid = document.querySelector("#recommendations-movie-grid");
-    const movieElements = recommendations.map(recommendation => createMovieElement(recommendation));
-    movieElements.forEach(element => movieGrid.appendChild(element));
+    movieGrid.appendChild(createMovieElement(recommendation));
 };
 
-const handleRecommendations = async () => {
+const handleRecommendations = () => {
     if (fetchRecommendations) {
-        const recommendations = await getRecommendations();
-        createMovieGrid(recommendations);
         fetchRecommendations = false;
+        streamRecommendations(addToMovieGrid, ({ message }) => {
+            document.querySelector("#recommendations-movie-grid").replaceChildren();
+            fetchRecommendations = true;
+            console.error(`Unexpected error while getting recommendations ${message}`);
+        });
     }
 
     showModal("recommendations-modal");